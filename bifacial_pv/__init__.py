@@ -0,0 +1,53 @@
+"""
+Bifacial PV modeling and ABC optimization core.
+
+Pure-Python/NumPy code shared by the Streamlit pages. Nothing in this
+package imports streamlit, so it can be used from scripts and batch jobs.
+
+The names below are imported from their submodules on first access, so
+`import bifacial_pv.cli` (or any other submodule) loads only what that
+submodule needs, not jobs' multiprocessing and sqlite3 as well.
+"""
+
+import importlib
+
+# Submodule → public names re-exported here
+_EXPORTS = {
+    "analytic":    ("AnalyticFit", "reachable_range", "solve_closest"),
+    "cache":       ("ResultCache", "default_cache", "make_key"),
+    "colony":      ("BOUNDS", "abc_minimize_batch", "abc_optimize", "abc_optimize_batch"),
+    "dataset":     ("MeasurementDataset", "csv_to_dataset", "fit_dataset", "open_dataset", "write_dataset"),
+    "ensemble":    ("EnsembleResult", "abc_ensemble"),
+    "jobs":        ("JobInfo", "JobManager", "JobStore", "default_manager"),
+    "lifetime":    ("LifetimeResult", "Soiling", "lifetime_simulation", "lifetime_yield", "weather_profile"),
+    "model":       ("ModuleSTC", "Outputs", "TempCoeffs", "TempFactors", "aging_factor", "cleaning_factor",
+                    "compute_outputs", "compute_pmax", "electrical_outputs", "irradiance_factor",
+                    "temperature_factors"),
+    "multi":       ("MultiFit", "fit_multi", "fit_multi_batch"),
+    "optimizers":  ("METHODS", "compare_methods", "fit_pmax_batch", "minimize_batch"),
+    "plant":       ("PlantLayout", "PlantResult", "plant_pmax"),
+    "profiling":   ("RunStats", "profile_call"),
+    "rear":        ("RearIrradiance", "RowGeometry", "bifacial_gain", "rear_irradiance", "solar_position",
+                    "view_factors"),
+    "sensitivity": ("Uncertainty", "grid_sweep", "monte_carlo", "sobol", "tornado"),
+    "session":     ("AbcResult", "ComputeResult", "get_result"),
+    "space":       ("VARIABLES", "SearchSpace", "fit_space_batch", "search_space"),
+    "stream":      ("IncrementalFitter", "StreamFit"),
+    "timeseries":  ("EnergyYield", "energy_yield", "iter_weather_chunks"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
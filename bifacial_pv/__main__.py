@@ -0,0 +1,3 @@
+from bifacial_pv.cli import main
+
+main()
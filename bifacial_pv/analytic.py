@@ -0,0 +1,99 @@
+"""
+Closed-form solver for the under-determined Pmax fit.
+
+Pmax = K × (1 + BG) × (100 − dirt)/100 × Fmm × Fshade with
+K = Pmax_stc × Ftemp_P × Fg × Fage, so one measured Pmax fixes only the
+product of four factors. In log space,
+
+    u = (ln(1 + BG), ln(1 − dirt/100), ln Fmm, ln Fshade)
+
+the exact-match set is the hyperplane Σu = ln(Pmax_meas / K) intersected
+with the BOUNDS box. solve_closest returns the point of that set nearest
+to a prior (distance measured in log space, each axis scaled by its box
+width) by exact breakpoint search on the Lagrange multiplier — no
+iteration, vectorized over problems. If the measurement lies outside
+the reachable Pmax range the nearest box corner is returned instead and
+`reachable` is False.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.colony import BOUNDS, compute_pmax
+
+# Nominal operating point (Computation Tool defaults)
+DEFAULT_PRIOR = (0.15, 5.0, 0.98, 0.95)
+
+
+class AnalyticFit(NamedTuple):
+    solution: np.ndarray    # (P, 4) [BG, dirt, Fmm, Fshade]
+    pmax: np.ndarray        # (P,)
+    error: np.ndarray       # (P,) |pmax − Pmax_meas|
+    reachable: np.ndarray   # (P,) bool
+    pmax_min: np.ndarray    # (P,) reachable range within BOUNDS
+    pmax_max: np.ndarray    # (P,)
+
+
+def _to_log(X):
+    BG, dirt, Fmm, Fshade = np.moveaxis(np.asarray(X, dtype=float), -1, 0)
+    return np.stack([np.log1p(BG), np.log1p(-dirt / 100), np.log(Fmm), np.log(Fshade)], axis=-1)
+
+
+def _from_log(U):
+    u_bg, u_clean, u_mm, u_shade = np.moveaxis(U, -1, 0)
+    return np.stack([np.expm1(u_bg), -100 * np.expm1(u_clean), np.exp(u_mm), np.exp(u_shade)], axis=-1)
+
+
+# Box in log space; dirt is decreasing in u, so its bounds swap
+U_LO = np.minimum(_to_log(BOUNDS[:, 0]), _to_log(BOUNDS[:, 1]))
+U_HI = np.maximum(_to_log(BOUNDS[:, 0]), _to_log(BOUNDS[:, 1]))
+
+
+def reachable_range(Pmax_stc, Ftemp_P, Fg, Fage):
+    """(min, max) Pmax attainable with the controllable factors inside BOUNDS."""
+    K = np.asarray(Pmax_stc * Ftemp_P * Fg * Fage, dtype=float)
+    return K * np.exp(U_LO.sum()), K * np.exp(U_HI.sum())
+
+
+def solve_closest(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, prior=DEFAULT_PRIOR):
+    """
+    Exact-match solution closest to `prior` for one or many problems.
+
+    Inputs broadcast to a common length P like abc_optimize_batch;
+    prior is a 4-vector or (P, 4) array.
+    """
+    Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float))
+          for a in (Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas))
+    )
+    K = Pmax_stc * Ftemp_P * Fg * Fage
+    pmax_min, pmax_max = K * np.exp(U_LO.sum()), K * np.exp(U_HI.sum())
+    reachable = (Pmax_meas >= pmax_min) & (Pmax_meas <= pmax_max)
+
+    # Target sum in log space, clamped so unreachable problems land on a corner
+    with np.errstate(divide="ignore"):
+        c = np.log(np.clip(Pmax_meas, pmax_min, pmax_max) / K)
+
+    u0 = np.clip(_to_log(np.broadcast_to(prior, (len(K), 4))), U_LO, U_HI)
+    width = U_HI - U_LO
+
+    # u(λ) = clip(u0 + λ·width², lo, hi) — g(λ) = Σu(λ) is piecewise linear and
+    # non-decreasing; its breakpoints are where a coordinate meets a bound.
+    scale = width ** 2
+    breaks = np.sort(np.concatenate([(U_LO - u0) / scale, (U_HI - u0) / scale], axis=1), axis=1)
+    g = np.clip(u0[:, None, :] + breaks[..., None] * scale, U_LO, U_HI).sum(axis=2)
+
+    # Segment [breaks[k-1], breaks[k]] containing c, then interpolate linearly
+    k = np.clip((g < c[:, None]).sum(axis=1), 1, breaks.shape[1] - 1)
+    rows = np.arange(len(K))
+    b0, b1 = breaks[rows, k - 1], breaks[rows, k]
+    g0, g1 = g[rows, k - 1], g[rows, k]
+    slope = np.where(g1 > g0, g1 - g0, 1.0)
+    lam = b0 + (b1 - b0) * np.clip((c - g0) / slope, 0.0, 1.0)
+
+    U = np.clip(u0 + lam[:, None] * scale, U_LO, U_HI)
+    solution = np.clip(_from_log(U), BOUNDS[:, 0], BOUNDS[:, 1])
+    pmax = compute_pmax(solution, Pmax_stc, Ftemp_P, Fg, Fage)
+
+    return AnalyticFit(solution, pmax, np.abs(pmax - Pmax_meas), reachable, pmax_min, pmax_max)
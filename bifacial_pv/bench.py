@@ -0,0 +1,217 @@
+"""
+Benchmark suite for the PV model and the ABC optimizer.
+
+Cases:
+    model_scalar      — compute_outputs called once per operating point
+    model_vectorized  — compute_outputs over one array of operating points
+    fit_batch         — abc_optimize_batch over many problems
+    scale_bees_*      — one problem, growing colony size
+    scale_cycles_*    — one problem, growing cycle count
+    scale_problems_*  — growing number of stacked problems (batch dimension)
+    scale_dim_*       — growing number of free variables D (space.SearchSpace),
+                        the rest pinned at a fixed operating point
+
+Each case records wall time (best of `repeat`), throughput (model points
+or nominal objective evaluations per second), peak traced memory and,
+for fits, the median final error. Runs are appended to a JSON history
+file and compared against a stored baseline; a case regresses when its
+wall time or peak memory grows, or its throughput drops, by more than
+`tolerance` (relative). Final errors are not compared. A baseline only
+compares with runs of the same suite size (quick or full); environment
+differences are reported by environment_changes.
+
+Everything runs offline with NumPy only.
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from bifacial_pv.colony import abc_optimize_batch
+from bifacial_pv.model import compute_outputs
+from bifacial_pv.space import VARIABLES, fit_space_batch, search_space
+
+# Operating point for the variables a scale_dim case leaves pinned
+DIM_NOMINAL = {"BG": 0.15, "dirt": 5.0, "Fmm": 0.98, "Fshade": 0.95, "Tcell": 30.0, "G_front": 800.0,
+               "Fage": 0.96}
+
+
+def _model_inputs(n, rng):
+    return rng.uniform(0, 1200, n), rng.uniform(10, 70, n)
+
+
+def _scalar_case(n):
+    def run(rng):
+        G, T = _model_inputs(n, rng)
+        for g, t in zip(G.tolist(), T.tolist()):
+            compute_outputs(g, t, 5.0, 10, 0.98, 0.95)
+        return n, None
+    return run
+
+
+def _vector_case(n):
+    def run(rng):
+        G, T = _model_inputs(n, rng)
+        compute_outputs(G, T, 5.0, 10, 0.98, 0.95)
+        return n, None
+    return run
+
+
+def _fit_case(problems, bees, cycles, limit=5):
+    def run(rng):
+        meas = rng.uniform(400, 560, problems)
+        _, _, history, _ = abc_optimize_batch(610.0, 0.986, 0.8, 0.96, meas, bees, cycles, limit, rng)
+        # Nominal evaluations: initial colony + employed bees + ~1 onlooker per problem per cycle
+        evals = problems * (bees + history.shape[1] * (bees + 1))
+        return evals, float(np.median(history[:, -1]))
+    return run
+
+
+def _space_case(dim, problems, bees, cycles, limit=5):
+    space = search_space(DIM_NOMINAL, free=VARIABLES[:dim])
+
+    def run(rng):
+        meas = rng.uniform(400, 560, problems)
+        fit = fit_space_batch(space, meas, cycles, options={"num_bees": bees, "limit": limit}, rng=rng)
+        evals = problems * (bees + fit.error_history.shape[1] * (bees + 1))
+        return evals, float(np.median(fit.error_history[:, -1]))
+    return run
+
+
+def suite(quick=False):
+    """Ordered dict of case name → callable(rng) returning (work units, final error)."""
+    scale = 0.1 if quick else 1.0
+
+    def n(x):
+        return max(1, int(x * scale))
+
+    cases = {
+        "model_scalar":     _scalar_case(n(20_000)),
+        "model_vectorized": _vector_case(n(2_000_000)),
+        "fit_batch":        _fit_case(n(2_000), 30, 100),
+    }
+    for bees in (10, 30, 100, 300, 1000):
+        cases[f"scale_bees_{bees}"] = _fit_case(1, bees, n(200))
+    for cycles in (100, 300, 1000, 3000):
+        cases[f"scale_cycles_{cycles}"] = _fit_case(1, 30, n(cycles))
+    for problems in (1, 10, 100, 1000, 10000):
+        cases[f"scale_problems_{problems}"] = _fit_case(n(problems), 30, 50)
+    for dim in range(1, len(VARIABLES) + 1):
+        cases[f"scale_dim_{dim}"] = _space_case(dim, n(1000), 30, 50)
+    return cases
+
+
+def run_case(fn, repeat=3, seed=0):
+    """Time fn (best of repeat), then rerun once under tracemalloc for peak memory."""
+    best = float("inf")
+    for _ in range(repeat):
+        rng = np.random.default_rng(seed)
+        t0 = time.perf_counter()
+        work, error = fn(rng)
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn(np.random.default_rng(seed))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_time": best,
+        "throughput": work / best if best > 0 else float("inf"),
+        "peak_mem_mb": peak / 1e6,
+        "final_error": error,
+    }
+
+
+def run_suite(quick=False, repeat=3, seed=0, only=None, progress=None):
+    results = {}
+    for name, fn in suite(quick).items():
+        if only and not any(pat in name for pat in only):
+            continue
+        results[name] = run_case(fn, repeat, seed)
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def append_history(path, results, quick=False):
+    history = []
+    if os.path.exists(path):
+        with open(path) as f:
+            history = json.load(f)
+    history.append({
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+        "environment": environment(),
+        "results": results,
+    })
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2)
+
+
+# Metrics compare checks: name → True if larger is better
+METRICS = {"wall_time": False, "throughput": True, "peak_mem_mb": False}
+
+
+def save_baseline(path, results, quick=False):
+    with open(path, "w") as f:
+        json.dump({"quick": quick, "environment": environment(), "results": results}, f, indent=2)
+
+
+def _load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def environment_changes(baseline_path):
+    """["numpy: 1.26.4 → 2.1.0", ...] for environment entries that differ from the baseline's."""
+    before = _load_baseline(baseline_path).get("environment", {})
+    now = environment()
+    return [f"{k}: {before.get(k)} → {now[k]}" for k in now if before.get(k) != now[k]]
+
+
+def compare(results, baseline_path, tolerance=0.2, quick=False):
+    """
+    List of (case, metric, baseline, current, ratio) for regressed metrics.
+
+    ratio is how many times worse the current value is. Raises
+    ValueError if the baseline was recorded with a different quick flag
+    (or before the flag was stored), since case sizes differ.
+    """
+    baseline = _load_baseline(baseline_path)
+    if baseline.get("quick") != quick:
+        raise ValueError(
+            f"Baseline {baseline_path} was recorded with quick={baseline.get('quick')}, "
+            f"this run used quick={quick}; re-save the baseline or match the flag"
+        )
+
+    regressions = []
+    for name, cur in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric, larger_is_better in METRICS.items():
+            b, c = base.get(metric), cur[metric]
+            if not b or not c or not np.isfinite(b) or not np.isfinite(c):
+                continue
+            ratio = b / c if larger_is_better else c / b
+            if ratio > 1 + tolerance:
+                regressions.append((name, metric, b, c, ratio))
+    return regressions
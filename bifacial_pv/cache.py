@@ -0,0 +1,175 @@
+"""
+Bounded LRU result cache with TTL eviction and an optional on-disk store.
+
+Entries live in memory (an OrderedDict in LRU order) and, when a
+directory is given, are also written as one pickle file per key so they
+survive restarts and are shared between processes. Keys are SHA-256
+digests of the canonicalised inputs, see make_key.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+MISSING = object()
+
+
+def _canonical(value):
+    # NumPy scalars/arrays → plain Python so 1.0 and np.float64(1.0) hash alike
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, dict):
+        return tuple(sorted((k, _canonical(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    return value
+
+
+def make_key(*parts):
+    """Stable hex key for a tuple of inputs."""
+    return hashlib.sha256(repr(_canonical(parts)).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache.
+
+    maxsize — maximum entries kept (memory and disk each)
+    ttl     — seconds an entry stays valid (None = forever)
+    path    — directory for the persistent store (None = memory only)
+    """
+
+    def __init__(self, maxsize=256, ttl=None, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()   # key → (timestamp, value)
+        self._lock = threading.Lock()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self):
+        return len(self._data)
+
+    def _expired(self, stamp):
+        return self.ttl is not None and time.time() - stamp > self.ttl
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def _load(self, key):
+        # Unreadable, truncated or stale files (e.g. pickled classes that no
+        # longer import) are misses; the next put overwrites them
+        try:
+            with open(self._file(key), "rb") as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None
+        if not (isinstance(entry, tuple) and len(entry) == 2 and isinstance(entry[0], float)):
+            return None
+        return entry
+
+    def _store(self, key, entry):
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._file(key))
+
+        files = [e for e in os.scandir(self.path) if e.name.endswith(".pkl")]
+        if len(files) > self.maxsize:
+            files.sort(key=lambda e: e.stat().st_mtime)
+            for e in files[:len(files) - self.maxsize]:
+                try:
+                    os.remove(e.path)
+                except OSError:
+                    pass
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None and self.path is not None:
+                entry = self._load(key)
+            if entry is not None and self._expired(entry[0]):
+                self._data.pop(key, None)
+                if self.path is not None:
+                    try:
+                        os.remove(self._file(key))
+                    except OSError:
+                        pass
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            self._evict()
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        entry = (time.time(), value)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            self._evict()
+            if self.path is not None:
+                self._store(key, entry)
+
+    def _evict(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, key, fn, *args, **kwargs):
+        """Return the cached value for key, computing and storing fn(*args, **kwargs) on a miss."""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = fn(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+            if self.path is not None:
+                for e in os.scandir(self.path):
+                    if e.name.endswith(".pkl"):
+                        os.remove(e.path)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """
+    Process-wide cache shared by every Streamlit session.
+
+    Configured from the environment on first use:
+        BIFACIAL_PV_CACHE_DIR   — persist entries here (unset = memory only)
+        BIFACIAL_PV_CACHE_SIZE  — max entries (default 256)
+        BIFACIAL_PV_CACHE_TTL   — entry lifetime in seconds (unset = no expiry)
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            ttl = os.environ.get("BIFACIAL_PV_CACHE_TTL")
+            _default = ResultCache(
+                maxsize=int(os.environ.get("BIFACIAL_PV_CACHE_SIZE", 256)),
+                ttl=float(ttl) if ttl else None,
+                path=os.environ.get("BIFACIAL_PV_CACHE_DIR") or None,
+            )
+        return _default
@@ -0,0 +1,108 @@
+"""
+Chart data helpers for long optimizer histories.
+
+downsample keeps the first and last point plus the minimum and maximum
+of every bucket, so spikes, plateaus and the final value survive while
+the payload sent to the browser stays bounded (O(n) and fully
+vectorized, unlike sequential LTTB). convergence_chart turns an error
+history into Vega-Lite data and convergence_spec into a log-scale line
+chart spec; comparison_chart/comparison_spec do the same for the
+error-vs-evaluations curves of several optimizers. None of them imports
+streamlit.
+"""
+
+import numpy as np
+
+MAX_POINTS = 1000
+
+
+def downsample(y, max_points=MAX_POINTS):
+    """
+    Min/max-preserving decimation of a 1-D series.
+
+    Returns (idx, y[idx]) with at most max_points sorted indices.
+    Series that already fit are returned whole. max_points must be at
+    least 4 (both endpoints plus one minimum and one maximum).
+    """
+    if max_points < 4:
+        raise ValueError(f"max_points must be at least 4, got {max_points}")
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n), y
+
+    interior = y[1:-1]
+    buckets  = max(1, (max_points - 2) // 2)
+    size     = -(-len(interior) // buckets)
+    # Pad with the last value; argmin/argmax return the first occurrence,
+    # so padding never displaces a real point
+    padded = np.pad(interior, (0, buckets * size - len(interior)), mode="edge").reshape(buckets, size)
+    offset = np.arange(buckets) * size
+    picks  = np.concatenate([offset + padded.argmin(axis=1), offset + padded.argmax(axis=1)])
+    idx    = np.unique(np.concatenate([[0], 1 + np.minimum(picks, len(interior) - 1), [n - 1]]))
+    return idx, y[idx]
+
+
+def convergence_chart(history, max_points=MAX_POINTS):
+    """
+    {"Cycle": [...], "Error": [...]} for a best-error-per-cycle history.
+
+    Non-positive errors (exact matches) are raised to a tenth of the
+    smallest positive error so they stay visible on a log axis.
+    """
+    idx, err = downsample(history, max_points)
+    positive = err[err > 0]
+    floor = positive.min() / 10 if len(positive) else 1e-12
+    return {"Cycle": (idx + 1).tolist(), "Error": np.maximum(err, floor).tolist()}
+
+
+def convergence_spec(title):
+    """Vega-Lite spec for convergence_chart data with a log error axis."""
+    return {
+        "mark": {"type": "line", "interpolate": "step-after"},
+        "encoding": {
+            "x": {"field": "Cycle", "type": "quantitative"},
+            "y": {"field": "Error", "type": "quantitative", "title": title,
+                  "scale": {"type": "log"}},
+            "tooltip": [
+                {"field": "Cycle", "type": "quantitative"},
+                {"field": "Error", "type": "quantitative", "format": ".6g"},
+            ],
+        },
+    }
+
+
+def comparison_chart(comparisons, max_points=MAX_POINTS):
+    """
+    {"Method", "Evaluations", "Error"} long-form data for the curves of
+    optimizers.compare_methods, each downsampled to max_points and
+    floored like convergence_chart.
+    """
+    data = {"Method": [], "Evaluations": [], "Error": []}
+    positive = [c.curve[1][c.curve[1] > 0] for c in comparisons]
+    positive = np.concatenate(positive) if positive else np.array([])
+    floor = positive.min() / 10 if len(positive) else 1e-12
+    for c in comparisons:
+        idx, err = downsample(c.curve[1], max_points)
+        data["Method"] += [c.method] * len(idx)
+        data["Evaluations"] += c.curve[0][idx].tolist()
+        data["Error"] += np.maximum(err, floor).tolist()
+    return data
+
+
+def comparison_spec(title):
+    """Vega-Lite spec for comparison_chart data: log-log error vs evaluations per problem."""
+    return {
+        "mark": {"type": "line", "interpolate": "step-after"},
+        "encoding": {
+            "x": {"field": "Evaluations", "type": "quantitative", "title": "Evaluations per problem",
+                  "scale": {"type": "log"}},
+            "y": {"field": "Error", "type": "quantitative", "title": title, "scale": {"type": "log"}},
+            "color": {"field": "Method", "type": "nominal"},
+            "tooltip": [
+                {"field": "Method", "type": "nominal"},
+                {"field": "Evaluations", "type": "quantitative", "format": ",.0f"},
+                {"field": "Error", "type": "quantitative", "format": ".6g"},
+            ],
+        },
+    }
@@ -0,0 +1,198 @@
+"""
+Headless command-line entry point.
+
+    python -m bifacial_pv compute  weather.csv  -o outputs.csv  [--module module.json]
+    python -m bifacial_pv fit      measured.csv -o fits.npz     [--bees 30 --cycles 100 ...]
+    python -m bifacial_pv benchmark [--quick] [--history bench_history.json]
+
+Only NumPy is imported (no streamlit or matplotlib), and each subcommand
+imports the solvers or benchmark suite it needs itself, so the tools
+start quickly on compute nodes and in cron jobs. Input and output formats
+follow bifacial_pv.tables (CSV, JSON, .npz or a column directory).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from bifacial_pv.dataset import REQUIRED_COLUMNS
+from bifacial_pv.model import ModuleSTC, TempCoeffs, compute_outputs
+from bifacial_pv.tables import read_table, write_table
+
+# compute: optional per-row inputs and their defaults
+COMPUTE_DEFAULTS = {"dirt": 0.0, "years": 0.0, "Fmm": 1.0, "Fshade": 1.0, "BG": 0.0}
+
+# fit --solver choices served by bifacial_pv.optimizers
+SOLVERS = {"de": "DE", "pso": "PSO", "nelder-mead": "Nelder-Mead", "quasi-newton": "Quasi-Newton"}
+
+
+def _load_module(path):
+    """ModuleSTC and TempCoeffs from a JSON file of datasheet values (defaults for missing keys)."""
+    if path is None:
+        return ModuleSTC(), TempCoeffs()
+    with open(path) as f:
+        spec = json.load(f)
+    stc = ModuleSTC(**{k: spec[k] for k in ModuleSTC._fields if k in spec})
+    coeffs = TempCoeffs(**{k: spec[k] for k in TempCoeffs._fields if k in spec})
+    return stc, coeffs
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def _require(table, names, what):
+    missing = [n for n in names if n not in table]
+    if missing:
+        raise SystemExit(f"error: {what} is missing column(s): {', '.join(missing)}")
+
+
+# ------------------ SUBCOMMANDS ------------------
+def cmd_compute(args):
+    table = read_table(args.input)
+    _require(table, ("G_front", "Tcell"), args.input)
+    stc, coeffs = _load_module(args.module)
+
+    inputs = {n: table.get(n, default) for n, default in COMPUTE_DEFAULTS.items()}
+    out = compute_outputs(table["G_front"], table["Tcell"], inputs["dirt"], inputs["years"],
+                          inputs["Fmm"], inputs["Fshade"], stc, coeffs, inputs["BG"])
+
+    rows = len(table["G_front"])
+    columns = {n: table[n] for n in table}
+    columns.update({n: np.broadcast_to(v, (rows,)) for n, v in out._asdict().items()})
+    write_table(args.output, columns)
+    print(f"computed {rows} rows → {args.output}", file=sys.stderr)
+
+
+def cmd_fit(args):
+    from bifacial_pv.analytic import solve_closest
+    from bifacial_pv.colony import abc_optimize_batch
+    from bifacial_pv.optimizers import POPULATION_OPTION, fit_pmax_batch
+
+    table = read_table(args.input)
+    _require(table, REQUIRED_COLUMNS, args.input)
+    rows = len(table["Pmax_meas"])
+    rng = np.random.default_rng(args.seed)
+    stopping = dict(abs_tol=args.abs_tol, rel_tol=args.rel_tol,
+                    stall_cycles=args.stall_cycles, time_budget=args.time_budget)
+
+    sol    = np.empty((rows, 4))
+    pmax   = np.empty(rows)
+    error  = np.empty(rows)
+    reason = np.empty(rows, dtype=object)
+    cycle  = np.empty(rows, dtype=np.int64)
+
+    # Fit in chunks of rows so colony memory stays bounded
+    for start in range(0, rows, args.chunk):
+        stop = min(start + args.chunk, rows)
+        cols = [np.asarray(table[n][start:stop]) for n in ("Pmax_STC", "Ftemp_P", "Fg", "Fage", "Pmax_meas")]
+        if args.solver == "analytic":
+            fit = solve_closest(*cols)
+            sol[start:stop], pmax[start:stop], error[start:stop] = fit.solution, fit.pmax, fit.error
+            reason[start:stop] = np.where(fit.reachable, "analytic", "unreachable")
+            cycle[start:stop] = 0
+        elif args.solver == "abc":
+            s, p, h, info = abc_optimize_batch(*cols, args.bees, args.cycles, args.limit, rng, **stopping)
+        else:
+            method = SOLVERS[args.solver]
+            options = {POPULATION_OPTION[method]: args.bees} if method in POPULATION_OPTION else None
+            s, p, h, info = fit_pmax_batch(method, *cols, args.cycles, rng, options, **stopping)
+        if args.solver != "analytic":
+            sol[start:stop], pmax[start:stop], error[start:stop] = s, p, h[:, -1]
+            reason[start:stop], cycle[start:stop] = info.reason, info.cycle
+
+    write_table(args.output, {
+        "Pmax_meas": table["Pmax_meas"],
+        "BG": sol[:, 0], "dirt": sol[:, 1], "Fmm": sol[:, 2], "Fshade": sol[:, 3],
+        "Pmax_fit": pmax,
+        "error": error,
+        "stop_reason": reason.astype(str),
+        "stop_cycle": cycle,
+    })
+    print(f"fitted {rows} rows (seed {args.seed}) → {args.output}", file=sys.stderr)
+
+
+def cmd_benchmark(args):
+    from bifacial_pv import bench
+
+    def progress(name, r):
+        err = f"  error {r['final_error']:.4g} W" if r["final_error"] is not None else ""
+        print(f"{name:<22} {r['wall_time']:10.4f} s  {r['throughput']:14,.0f}/s  "
+              f"{r['peak_mem_mb']:8.1f} MB{err}")
+
+    results = bench.run_suite(args.quick, args.repeat, args.seed, args.only, progress)
+
+    if args.history:
+        bench.append_history(args.history, results, args.quick)
+    if args.save_baseline:
+        bench.save_baseline(args.baseline, results, args.quick)
+        print(f"baseline saved → {args.baseline}", file=sys.stderr)
+    elif args.baseline and os.path.exists(args.baseline):
+        try:
+            regressions = bench.compare(results, args.baseline, args.tolerance, args.quick)
+        except ValueError as e:
+            raise SystemExit(f"error: {e}")
+        for change in bench.environment_changes(args.baseline):
+            print(f"warning: environment differs from the baseline — {change}", file=sys.stderr)
+        for name, metric, base, cur, ratio in regressions:
+            print(f"REGRESSION {name} {metric}: {base:.4g} → {cur:.4g} ({ratio:.2f}× worse)")
+        if regressions:
+            sys.exit(1)
+
+
+# ------------------ PARSER ------------------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bifacial_pv", description=__doc__.split("\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("compute", help="run the datasheet model over a table of operating points")
+    p.add_argument("input", help="table with G_front, Tcell and optional dirt, years, Fmm, Fshade, BG")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--module", help="JSON file with STC values and temperature coefficients")
+    p.set_defaults(func=cmd_compute)
+
+    p = sub.add_parser("fit", help="fit BG, dirt, Fmm and Fshade to measured Pmax values")
+    p.add_argument("input", help=f"table or dataset directory with {', '.join(REQUIRED_COLUMNS)}")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--solver", choices=("abc", "analytic", *SOLVERS), default="abc",
+                   help="analytic: exact match closest to the nominal prior, no iterations; "
+                        "the others are alternative optimizer backends (see bifacial_pv.optimizers)")
+    p.add_argument("--bees", type=_positive_int, default=30, help="population size for abc, de and pso")
+    p.add_argument("--cycles", type=_positive_int, default=100, help="iterations (cycles, generations or steps)")
+    p.add_argument("--limit", type=int, default=5)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--chunk", type=_positive_int, default=10_000, help="problems per stacked colony")
+    p.add_argument("--abs-tol", type=float)
+    p.add_argument("--rel-tol", type=float)
+    p.add_argument("--stall-cycles", type=int)
+    p.add_argument("--time-budget", type=float)
+    p.set_defaults(func=cmd_fit)
+
+    p = sub.add_parser("benchmark", help="run the benchmark suite and check for regressions")
+    p.add_argument("--quick", action="store_true", help="10%% problem sizes for smoke runs")
+    p.add_argument("--repeat", type=_positive_int, default=3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--only", nargs="+", help="run only cases whose name contains one of these")
+    p.add_argument("--history", help="append results to this JSON history file")
+    p.add_argument("--baseline", default="bench_baseline.json")
+    p.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    p.add_argument("--tolerance", type=float, default=0.2,
+                   help="allowed relative worsening of wall time, throughput or peak memory")
+    p.set_defaults(func=cmd_benchmark)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
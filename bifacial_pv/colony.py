@@ -0,0 +1,348 @@
+"""
+Artificial Bee Colony (ABC) optimizer for the controllable PV factors.
+
+Variables (solution vector):
+    x[0] = BG      — bifacial gain       [0.00, 0.35]
+    x[1] = dirt    — dirt level %        [0.00, 20.0]
+    x[2] = Fmm     — mismatch factor     [0.95,  1.0]
+    x[3] = Fshade  — shading factor      [0.70,  1.0]
+
+Fixed (per problem):
+    Pmax_stc, Ftemp_P, Fg, Fage
+
+Objective: minimise |Pmax_calc - Pmax_meas|
+
+Colonies are stored as (P, N, D) arrays — P independent problems with
+N bees each — and every phase updates all problems in one batched step.
+abc_minimize_batch is the generic engine over any vectorized objective
+and box; abc_optimize_batch applies it to the Pmax fit above.
+"""
+
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv import model
+from bifacial_pv.model import cleaning_factor, irradiance_factor
+from bifacial_pv.profiling import NULL_STATS
+
+BOUNDS = np.array([
+    (0.00, 0.35),
+    (0.00, 20.0),
+    (0.95, 1.00),
+    (0.70, 1.00),
+])
+LO, HI = BOUNDS[:, 0], BOUNDS[:, 1]
+DIM = len(BOUNDS)
+
+
+def compute_pmax(X, Pmax_stc, Ftemp_P, Fg, Fage):
+    """Pmax for solution vectors X (..., 4); fixed factors broadcast against X[..., 0]."""
+    BG, dirt, Fmm, Fshade = X[..., 0], X[..., 1], X[..., 2], X[..., 3]
+    Fg_eff = irradiance_factor(Fg * 1000, BG)
+    return model.compute_pmax(Pmax_stc, Ftemp_P, Fg_eff, cleaning_factor(dirt), Fshade, Fmm, Fage)
+
+
+class StopInfo(NamedTuple):
+    reason: object   # str (single problem) or (P,) array of str
+    cycle: object    # cycles run: int or (P,) int array
+
+
+# Stop reasons, in the order they are checked each cycle
+STOP_REASONS = {
+    "abs_tol":     "absolute error tolerance reached",
+    "rel_tol":     "relative error tolerance reached",
+    "stalled":     "no improvement within the stall window",
+    "time_budget": "wall-clock budget exhausted",
+    "max_evals":   "objective evaluation budget exhausted",
+    "max_cycles":  "maximum number of cycles reached",
+}
+
+
+class EarlyStopping:
+    """
+    Per-problem stopping rules and best-error history shared by every optimizer.
+
+    Call update(cycle, act, best) once per iteration with the indices of
+    the still-active problems and their best errors; problems that meet
+    a rule are marked inactive. With max_evals set, call count(p) with
+    the problem index of every objective evaluation. finish(cycles_run) returns the padded
+    history and the StopInfo. See abc_minimize_batch for the rules.
+    """
+
+    def __init__(self, num_problems, max_cycles, abs_tol=None, rel_tol=None, rel_scale=1.0,
+                 stall_cycles=None, stall_tol=0.0, time_budget=None, max_evals=None):
+        if max_cycles < 1:
+            raise ValueError(f"max_cycles must be at least 1, got {max_cycles}")
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+        self.rel_scale = np.broadcast_to(np.asarray(rel_scale, dtype=float), (num_problems,))
+        self.stall_cycles = stall_cycles
+        self.stall_tol = stall_tol
+        self.deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        self.max_evals = max_evals
+        self.evals = np.zeros(num_problems, dtype=np.int64)
+
+        self.active = np.ones(num_problems, dtype=bool)
+        self.reason = np.full(num_problems, "max_cycles", dtype=object)
+        self.cycle  = np.full(num_problems, max_cycles, dtype=np.int64)
+        self.history = np.empty((num_problems, max_cycles))
+
+    def _stop(self, rows, reason, cycles_run):
+        self.reason[rows] = reason
+        self.cycle[rows]  = cycles_run
+        self.active[rows] = False
+
+    def count(self, p):
+        if self.max_evals is not None:
+            self.evals += np.bincount(p, minlength=len(self.evals))
+
+    def update(self, cycle, act, best):
+        cycles_run = cycle + 1
+        self.history[act, cycle] = best
+        active = self.active
+
+        if self.abs_tol is not None:
+            self._stop(act[best <= self.abs_tol], "abs_tol", cycles_run)
+        if self.rel_tol is not None:
+            self._stop(act[active[act] & (best <= self.rel_tol * self.rel_scale[act])], "rel_tol", cycles_run)
+        if self.stall_cycles is not None and cycle >= self.stall_cycles:
+            gain = self.history[act, cycle - self.stall_cycles] - best
+            self._stop(act[active[act] & (gain <= self.stall_tol)], "stalled", cycles_run)
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self._stop(act[active[act]], "time_budget", cycles_run)
+        if self.max_evals is not None:
+            self._stop(act[active[act] & (self.evals[act] >= self.max_evals)], "max_evals", cycles_run)
+
+    def finish(self, cycles_run):
+        # Pad each stopped row with its final value
+        error_history = self.history[:, :cycles_run]
+        rows = np.arange(len(error_history))
+        final = error_history[rows, self.cycle.clip(1, cycles_run) - 1]
+        after = np.arange(cycles_run) >= self.cycle[:, None]
+        error_history[after] = np.broadcast_to(final[:, None], after.shape)[after]
+        return error_history, StopInfo(self.reason, self.cycle)
+
+
+def abc_minimize_batch(objective, bounds, num_problems, num_bees, max_cycles, limit,
+                       rng=None, abs_tol=None, rel_tol=None, rel_scale=1.0, stall_cycles=None,
+                       stall_tol=0.0, time_budget=None, max_evals=None, stats=None, progress=None, init=None):
+    """
+    Minimise a vectorized objective for P independent problems at once.
+
+    objective(X, p) takes candidates X (n, D) and their problem indices
+    p (n,) and returns n non-negative errors. bounds is a (D, 2) array.
+
+    rng is a seed or np.random.Generator; every random draw (initial
+    colony, partner k, dimension j, phi, onlooker acceptance, scouts)
+    comes from it, so equal seeds give identical runs and concurrent
+    runs never share state.
+
+    Early stopping (all optional, None disables):
+        abs_tol      — stop a problem once its best error ≤ abs_tol
+        rel_tol      — stop once best error ≤ rel_tol × rel_scale[p]
+        stall_cycles — stop once the best error improved by ≤ stall_tol
+                       over the last stall_cycles cycles
+        time_budget  — stop every remaining problem after this many seconds
+        max_evals    — stop a problem once it used this many objective
+                       evaluations (checked after each cycle)
+
+    Stopped problems are frozen and drop out of all later phases; the
+    run ends when no problem is left or max_cycles (at least 1) is reached.
+
+    stats is an optional bifacial_pv.profiling.RunStats that collects
+    per-phase timings, objective counts, scout resets and acceptance rates.
+
+    progress is an optional callable progress(cycles_run, best) invoked
+    after every cycle with the (P,) best error of every problem so far,
+    e.g. to stream a live convergence chart.
+
+    init is an optional (P, num_bees, D) starting colony, e.g. a warm
+    start around earlier solutions (see stream.IncrementalFitter); it is
+    clipped to the bounds. None draws the colony uniformly from the box.
+    Scouts always restart uniformly.
+
+    Returns:
+        best_sol      — (P, D) array
+        best_fit      — (P,) objective value at best_sol
+        error_history — (P, cycles_run) array of best error per cycle;
+                        rows are padded with their final value after they stop
+        stop          — StopInfo of (P,) reasons and (P,) cycles run
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    lo, hi = bounds[:, 0], bounds[:, 1]
+    dim = len(bounds)
+    rng = np.random.default_rng(rng)
+    rules = EarlyStopping(num_problems, max_cycles, abs_tol, rel_tol, rel_scale,
+                          stall_cycles, stall_tol, time_budget, max_evals)
+    started = time.perf_counter()
+    stats = stats if stats is not None else NULL_STATS
+
+    def evaluate(X, p):
+        with stats.timer("objective"):
+            fit = objective(X, p)
+        stats.count_objective(len(p))
+        rules.count(p)
+        return fit
+
+    def random_solutions(n):
+        return rng.uniform(lo, hi, size=(n, dim))
+
+    def neighbours(p, i):
+        # Partner k != i (same problem), dimension j and phi for every (p, i)
+        with stats.timer("candidates"):
+            n = len(i)
+            k = rng.integers(0, num_bees - 1, size=n)
+            k += k >= i
+            j = rng.integers(0, dim, size=n)
+            phi = rng.uniform(-1, 1, size=n)
+            new_sol = solutions[p, i]
+            x_ij = new_sol[np.arange(n), j]
+            new_sol[np.arange(n), j] = x_ij + phi * (x_ij - solutions[p, k, j])
+        with stats.timer("clip"):
+            return np.clip(new_sol, lo, hi)
+
+    def greedy_select(p, i, new_sol):
+        new_fit = evaluate(new_sol, p)
+        with stats.timer("selection"):
+            better = new_fit < fitness[p, i]
+            wp, wi = p[better], i[better]
+            solutions[wp, wi] = new_sol[better]
+            fitness[wp, wi]   = new_fit[better]
+            trial[wp, wi]     = 0
+            trial[p[~better], i[~better]] += 1
+        return len(wp), len(p)
+
+    # ---- Initialise ----
+    if init is None:
+        solutions = random_solutions(num_problems * num_bees)
+    else:
+        solutions = np.clip(np.asarray(init, dtype=float), lo, hi).reshape(num_problems * num_bees, dim)
+    fitness   = evaluate(solutions, np.repeat(np.arange(num_problems), num_bees))
+    solutions = solutions.reshape(num_problems, num_bees, dim)
+    fitness   = fitness.reshape(num_problems, num_bees)
+    trial     = np.zeros((num_problems, num_bees), dtype=np.int64)
+    cycles_run = 0
+
+    for cycle in range(max_cycles):
+        act = np.flatnonzero(rules.active)
+        if len(act) == 0:
+            break
+        cycles_run = cycle + 1
+
+        # ---- Employed Bees ----
+        p = np.repeat(act, num_bees)
+        i = np.tile(np.arange(num_bees), len(act))
+        employed = greedy_select(p, i, neighbours(p, i))
+
+        # ---- Onlooker Bees ----
+        with stats.timer("probabilities"):
+            prob = 1 / (1 + fitness[act])
+            prob /= prob.sum(axis=1, keepdims=True)
+            p, i = np.nonzero(rng.random(prob.shape) < prob)
+
+        onlooker = (0, 0)
+        if len(p):
+            p = act[p]
+            onlooker = greedy_select(p, i, neighbours(p, i))
+
+        # ---- Scout Bees ----
+        p, i = np.nonzero(trial[act] > limit)
+        if len(p):
+            p = act[p]
+            with stats.timer("scouts"):
+                solutions[p, i] = random_solutions(len(p))
+            fitness[p, i]   = evaluate(solutions[p, i], p)
+            trial[p, i]     = 0
+        stats.record_cycle(employed, onlooker, len(p))
+
+        # ---- Stopping rules ----
+        with stats.timer("stopping"):
+            rules.update(cycle, act, fitness[act].min(axis=1))
+
+        if progress is not None:
+            progress(cycles_run, fitness.min(axis=1))
+
+    error_history, stop = rules.finish(cycles_run)
+
+    rows = np.arange(num_problems)
+    best_idx = np.argmin(fitness, axis=1)
+    best_sol = solutions[rows, best_idx]
+    best_fit = fitness[rows, best_idx]
+
+    if stats is not NULL_STATS:
+        stats.total_time += time.perf_counter() - started
+
+    return best_sol, best_fit, error_history, stop
+
+
+def pmax_objective(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas):
+    """
+    Batched |Pmax_calc − Pmax_meas| objective over BOUNDS for P problems.
+
+    Inputs are scalars or 1-D arrays broadcasting to length P. Returns
+    (objective(X, p), Pmax_meas as a (P,) array).
+    """
+    Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float))
+          for a in (Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas))
+    )
+    if Pmax_meas.ndim != 1:
+        raise ValueError("Batch inputs must be scalars or 1-D arrays")
+
+    def objective(X, p):
+        pmax = compute_pmax(X, Pmax_stc[p], Ftemp_P[p], Fg[p], Fage[p])
+        return np.abs(pmax - Pmax_meas[p])
+
+    return objective, Pmax_meas
+
+
+def abc_optimize_batch(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, num_bees, max_cycles, limit,
+                       rng=None, stats=None, progress=None, **stopping):
+    """
+    Solve many independent Pmax-fitting problems in one stacked colony.
+
+    Pmax_stc, Ftemp_P, Fg, Fage and Pmax_meas are scalars or 1-D arrays
+    that broadcast to a common length P (one entry per measured module).
+    rng, stats, progress and the early-stopping keywords are as for
+    abc_minimize_batch; rel_tol is relative to Pmax_meas.
+
+    Returns:
+        best_sol      — (P, 4) array of [BG, dirt, Fmm, Fshade]
+        best_pmax     — (P,) array of Pmax at best_sol
+        error_history — (P, cycles_run) array of best |error| per cycle
+        stop          — StopInfo of (P,) reasons and (P,) cycles run
+    """
+    objective, Pmax_meas = pmax_objective(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas)
+    best_sol, _, error_history, stop = abc_minimize_batch(
+        objective, BOUNDS, len(Pmax_meas), num_bees, max_cycles, limit,
+        rng, rel_scale=Pmax_meas, stats=stats, progress=progress, **stopping
+    )
+    best_pmax = compute_pmax(best_sol, *(np.asarray(a, dtype=float) for a in (Pmax_stc, Ftemp_P, Fg, Fage)))
+
+    return best_sol, best_pmax, error_history, stop
+
+
+def abc_optimize(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, num_bees, max_cycles, limit, rng=None,
+                 stats=None, progress=None, **stopping):
+    """
+    Optimize 4 controllable factors to minimise |Pmax_calc - Pmax_meas|.
+
+    Single-problem form of abc_optimize_batch; `stopping` takes the same
+    early-stopping keywords, `stats` an optional RunStats and `progress`
+    an optional per-cycle callback. Returns
+    plain Python values (best_sol list, best_pmax float, error_history
+    list, StopInfo(reason str, cycle int)) as stored in session state for
+    the Results page. error_history has one entry per cycle actually run.
+    """
+    best_sol, best_pmax, error_history, stop = abc_optimize_batch(
+        Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, num_bees, max_cycles, limit, rng,
+        stats=stats, progress=progress, **stopping
+    )
+    return (
+        best_sol[0].tolist(),
+        float(best_pmax[0]),
+        error_history[0].tolist(),
+        StopInfo(str(stop.reason[0]), int(stop.cycle[0])),
+    )
@@ -0,0 +1,180 @@
+"""
+Columnar, memory-mapped measurement datasets for fleet-scale fitting.
+
+A dataset is a directory holding one .npy file per column plus a small
+meta.json:
+
+    measurements/
+        meta.json        {"version": 1, "rows": N, "columns": [...]}
+        Pmax_meas.npy    float64[N]
+        Pmax_STC.npy     float64[N]
+        ...
+
+Columns are opened with np.load(mmap_mode="r"), so slicing a dataset
+reads only the touched pages and hands NumPy views straight to
+abc_optimize_batch without copying. Column dtypes and lengths are
+validated once when the dataset is opened, not per row.
+
+The same layout stores any column table (tables.write_table with no
+extension): measurement COLUMNS are always float64, other columns such
+as fit results keep their own dtype.
+"""
+
+import csv
+import json
+import os
+from itertools import islice
+
+import numpy as np
+
+from bifacial_pv.colony import abc_optimize_batch
+
+FORMAT_VERSION = 1
+DTYPE = np.dtype("<f8")
+
+# Fixed factors (names as stored in session state) + measured Pmax
+REQUIRED_COLUMNS = ("Pmax_meas", "Pmax_STC", "Ftemp_P", "Fg", "Fage")
+OPTIONAL_COLUMNS = ("Vmp_meas", "Imp_meas", "Voc_meas", "Isc_meas")
+COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+META_FILE = "meta.json"
+
+
+def _column_path(path, name):
+    return os.path.join(path, f"{name}.npy")
+
+
+def _write_meta(path, rows, columns):
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump({"version": FORMAT_VERSION, "rows": rows, "columns": list(columns)}, f)
+
+
+def csv_to_dataset(csv_path, out_dir, chunk_rows=100_000):
+    """
+    Convert a measurement CSV into a columnar dataset directory.
+
+    The CSV header must contain every REQUIRED_COLUMNS name; any
+    OPTIONAL_COLUMNS present are converted too, other columns are ignored.
+    The file is read twice (row count, then chunked fill) so memory stays
+    bounded by chunk_rows. Blank lines are skipped.
+    """
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        rows = sum(1 for row in reader if row)
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    columns = [c for c in COLUMNS if c in header]
+    indices = [header.index(c) for c in columns]
+
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = [
+        np.lib.format.open_memmap(_column_path(out_dir, c), mode="w+", dtype=DTYPE, shape=(rows,))
+        for c in columns
+    ]
+
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        records = (row for row in reader if row)
+        start = 0
+        while True:
+            chunk = list(islice(records, chunk_rows))
+            if not chunk:
+                break
+            data = np.array([[row[i] for i in indices] for row in chunk], dtype=DTYPE)
+            stop = start + len(chunk)
+            for k, out in enumerate(outputs):
+                out[start:stop] = data[:, k]
+            start = stop
+
+    for out in outputs:
+        out.flush()
+    del outputs
+
+    _write_meta(out_dir, rows, columns)
+    return open_dataset(out_dir)
+
+
+def write_dataset(out_dir, columns):
+    """
+    Write a dict of equal-length 1-D arrays as a dataset directory.
+
+    Measurement COLUMNS are stored as float64; other columns keep their
+    dtype. No column is required, so open the result with
+    open_dataset(out_dir, required=()) unless it holds measurements.
+    """
+    arrays = {n: np.asarray(v, dtype=DTYPE if n in COLUMNS else None) for n, v in columns.items()}
+    rows = len(next(iter(arrays.values()))) if arrays else 0
+    for name, a in arrays.items():
+        if a.shape != (rows,):
+            raise ValueError(f"Column {name!r} has shape {a.shape}, expected ({rows},)")
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, a in arrays.items():
+        np.save(_column_path(out_dir, name), a)
+    _write_meta(out_dir, rows, arrays)
+
+
+class MeasurementDataset:
+    """Read-only view over a columnar dataset; columns are np.memmap arrays."""
+
+    def __init__(self, path, columns, rows):
+        self.path = path
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def slice(self, start=None, stop=None):
+        """Dict of zero-copy column views for rows [start, stop)."""
+        return {name: col[start:stop] for name, col in self.columns.items()}
+
+
+def open_dataset(path, required=REQUIRED_COLUMNS):
+    """
+    Open a dataset directory, validating version, dtypes and lengths once.
+
+    required lists the columns that must be present; measurement COLUMNS
+    must be float64, every column must have one entry per row.
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset version: {meta.get('version')}")
+    missing = [c for c in required if c not in meta["columns"]]
+    if missing:
+        raise ValueError(f"Dataset is missing column(s): {', '.join(missing)}")
+
+    rows = meta["rows"]
+    columns = {}
+    for name in meta["columns"]:
+        col = np.load(_column_path(path, name), mmap_mode="r")
+        if (name in COLUMNS and col.dtype != DTYPE) or col.shape != (rows,):
+            expected = f"{DTYPE} and ({rows},)" if name in COLUMNS else f"shape ({rows},)"
+            raise ValueError(
+                f"Column {name!r} has dtype {col.dtype} and shape {col.shape}, expected {expected}"
+            )
+        columns[name] = col
+
+    return MeasurementDataset(path, columns, rows)
+
+
+def fit_dataset(dataset, num_bees, max_cycles, limit, start=None, stop=None, rng=None,
+                **stopping):
+    """Run abc_optimize_batch over rows [start, stop) of a dataset."""
+    cols = dataset.slice(start, stop)
+    return abc_optimize_batch(
+        cols["Pmax_STC"], cols["Ftemp_P"], cols["Fg"], cols["Fage"], cols["Pmax_meas"],
+        num_bees, max_cycles, limit, rng, **stopping,
+    )
@@ -0,0 +1,72 @@
+"""
+Ensemble ABC: K independent colonies run across worker processes.
+
+Each restart gets its own seed derived from one base seed through
+np.random.SeedSequence, so an ensemble is reproducible and restarts
+never share a random stream. The spread of the fitted factors across
+restarts shows how well-identified BG, dirt, Fmm and Fshade are for a
+given measurement.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.colony import abc_optimize
+
+
+class EnsembleResult(NamedTuple):
+    best_sol: list            # [BG, dirt, Fmm, Fshade] of the best restart
+    best_pmax: float
+    error_history: list       # per-cycle best error across all restarts
+    solutions: np.ndarray     # (K, 4) best solution of each restart
+    errors: np.ndarray        # (K,) final error of each restart
+    histories: np.ndarray     # (K, cycles) padded with each restart's final error
+    stops: list               # StopInfo of each restart
+    spread: np.ndarray        # (4,) std of each factor across restarts
+    seeds: list
+
+
+def restart_seeds(seed, restarts):
+    """Distinct, reproducible per-restart seeds derived from one base seed."""
+    return [int(s) for s in np.random.SeedSequence(seed).generate_state(restarts)]
+
+
+def _run_restart(seed, args, stopping):
+    return abc_optimize(*args, rng=seed, **stopping)
+
+
+def abc_ensemble(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, num_bees, max_cycles, limit,
+                 restarts=8, seed=0, max_workers=None, **stopping):
+    """
+    Run `restarts` independent abc_optimize colonies on a process pool.
+
+    max_workers defaults to the CPU count (ProcessPoolExecutor default).
+    `stopping` takes abc_optimize's early-stopping keywords; histories of
+    restarts that stopped early are padded with their final error.
+    """
+    seeds = restart_seeds(seed, restarts)
+    args = (Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, num_bees, max_cycles, limit)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(_run_restart, seeds, [args] * restarts, [stopping] * restarts))
+
+    solutions = np.array([r[0] for r in results])
+    pmaxes    = np.array([r[1] for r in results])
+    cycles    = max(len(r[2]) for r in results)
+    histories = np.array([r[2] + r[2][-1:] * (cycles - len(r[2])) for r in results])
+    errors    = histories[:, -1]
+    best      = int(np.argmin(errors))
+
+    return EnsembleResult(
+        best_sol=solutions[best].tolist(),
+        best_pmax=float(pmaxes[best]),
+        error_history=histories.min(axis=0).tolist(),
+        solutions=solutions,
+        errors=errors,
+        histories=histories,
+        spread=solutions.std(axis=0),
+        stops=[r[3] for r in results],
+        seeds=seeds,
+    )
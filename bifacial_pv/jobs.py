@@ -0,0 +1,335 @@
+"""
+Background optimization jobs run in worker processes.
+
+JobManager.submit hands any picklable optimizer call (abc_optimize,
+fit_multi_batch, abc_ensemble, ...) to a process pool and returns a job
+id at once. The worker records status, per-cycle progress and the
+pickled result in a SQLite file (JobStore), so every Streamlit session
+and server thread can poll, attach to or cancel any job by id.
+
+Cancellation is cooperative: functions that take a `progress` callback
+are interrupted at their next progress report; others run to the end
+and their result is discarded.
+
+Job states: queued → running → done | failed | cancelled.
+"""
+
+import inspect
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from typing import NamedTuple
+
+import numpy as np
+
+# Seconds between progress writes (and cancel checks) from a worker
+PROGRESS_INTERVAL = 0.5
+
+FINISHED = ("done", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,
+    kind     TEXT NOT NULL,
+    status   TEXT NOT NULL,
+    owner    INTEGER,
+    created  REAL,
+    started  REAL,
+    finished REAL,
+    total    INTEGER,
+    cycle    INTEGER DEFAULT 0,
+    best     REAL,
+    history  BLOB,
+    context  BLOB,
+    result   BLOB,
+    error    TEXT,
+    cancel   INTEGER DEFAULT 0
+)
+"""
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobInfo(NamedTuple):
+    id: str
+    kind: str
+    status: str
+    created: float
+    started: float
+    finished: float
+    cycle: int
+    total: int              # expected cycles (None if unknown)
+    best: float             # best error reported so far
+    history: np.ndarray     # best error per reported cycle (None before the first report)
+    error: str              # failure message
+
+
+def _dumps(value):
+    return None if value is None else pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(blob):
+    return None if blob is None else pickle.loads(blob)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    """
+    SQLite-backed job table shared between processes.
+
+    Every call opens its own short-lived connection, so a store is safe
+    to use from any thread or process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:            # commit on success, roll back on error
+                yield db
+        finally:
+            db.close()
+
+    def create(self, job_id, kind, context=None, total=None, owner=None):
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, kind, status, owner, created, total, context) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, owner, time.time(), total, _dumps(context)),
+            )
+
+    def start(self, job_id):
+        """Mark a queued job running; False if it was cancelled meanwhile."""
+        with self._connect() as db:
+            cur = db.execute(
+                "UPDATE jobs SET status = 'running', started = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            return cur.rowcount == 1
+
+    def report(self, job_id, cycle, history):
+        """Record progress; returns True if cancellation was requested."""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET cycle = ?, best = ?, history = ? WHERE id = ?",
+                (int(cycle), float(history[-1]), _dumps(np.asarray(history, dtype=float)), job_id),
+            )
+            row = db.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def finish(self, job_id, status, result=None, history=None, error=None):
+        progress = (None, None, None)
+        if history:
+            progress = (len(history), float(history[-1]), _dumps(np.asarray(history, dtype=float)))
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, finished = ?, result = ?, error = ?, cycle = COALESCE(?, cycle), "
+                "best = COALESCE(?, best), history = COALESCE(?, history) WHERE id = ?",
+                (status, time.time(), _dumps(result), error, *progress, job_id),
+            )
+
+    def cancel(self, job_id):
+        """Request cancellation; queued jobs are cancelled immediately."""
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET cancel = 1 WHERE id = ?", (job_id,))
+            db.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+
+    def cancel_requested(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def _info(self, row):
+        (job_id, kind, status, created, started, finished,
+         cycle, total, best, history, error) = row
+        return JobInfo(job_id, kind, status, created, started, finished,
+                       cycle, total, best, _loads(history), error)
+
+    _INFO_COLUMNS = "id, kind, status, created, started, finished, cycle, total, best, history, error"
+
+    def info(self, job_id):
+        with self._connect() as db:
+            row = db.execute(f"SELECT {self._INFO_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._info(row) if row else None
+
+    def jobs(self, limit=20):
+        """Most recent jobs first."""
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT {self._INFO_COLUMNS} FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._info(r) for r in rows]
+
+    def result(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def context(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT context FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def recover(self):
+        """Fail unfinished jobs whose owning process has exited (e.g. a server restart)."""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, owner FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            for job_id, owner in rows:
+                if owner is None or not _alive(owner):
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', finished = ?, error = ? WHERE id = ?",
+                        (time.time(), "interrupted: the server process exited", job_id),
+                    )
+
+    def purge(self, older_than):
+        """Delete finished jobs created more than older_than seconds ago."""
+        with self._connect() as db:
+            db.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED))}) AND created < ?",
+                (*FINISHED, time.time() - older_than),
+            )
+
+
+def run_job(path, job_id, fn, args, kwargs):
+    """Worker entry point: run fn(*args, **kwargs) and record the outcome in the store."""
+    store = JobStore(path)
+    if not store.start(job_id):
+        return
+
+    history = []
+    last = [time.perf_counter()]
+
+    def progress(cycles_run, best):
+        history.append(float(np.min(best)))
+        now = time.perf_counter()
+        if now - last[0] >= PROGRESS_INTERVAL:
+            last[0] = now
+            if store.report(job_id, cycles_run, history):
+                raise JobCancelled
+
+    if "progress" in inspect.signature(fn).parameters:
+        kwargs = {**kwargs, "progress": progress}
+
+    try:
+        result = fn(*args, **kwargs)
+    except JobCancelled:
+        store.finish(job_id, "cancelled", history=history)
+        return
+    except Exception as e:
+        store.finish(job_id, "failed", history=history, error=f"{type(e).__name__}: {e}")
+        return
+
+    if store.cancel_requested(job_id):
+        store.finish(job_id, "cancelled", history=history)
+    else:
+        store.finish(job_id, "done", result=result, history=history)
+
+
+class JobManager:
+    """
+    Process pool plus JobStore.
+
+    path        — SQLite file for the job table
+    max_workers — concurrent jobs (default: CPU count)
+
+    Workers are started with the "spawn" method so they never inherit
+    the server's threads or open connections.
+    """
+
+    def __init__(self, path, max_workers=None):
+        self.store = JobStore(path)
+        self.store.recover()
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context("spawn"))
+
+    def submit(self, kind, fn, *args, context=None, total=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) and return its job id.
+
+        kind is a short label, context any picklable value kept with the
+        job (e.g. what the caller needs to interpret the result later),
+        total the expected number of cycles for progress display.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        self.store.create(job_id, kind, context, total, owner=os.getpid())
+        future = self._pool.submit(run_job, self.store.path, job_id, fn, args, kwargs)
+        future.add_done_callback(lambda f: self._crashed(job_id, f))
+        return job_id
+
+    def _crashed(self, job_id, future):
+        # run_job records its own outcome; this only catches dead workers
+        if future.cancelled() or future.exception() is None:
+            return
+        info = self.store.info(job_id)
+        if info is not None and info.status not in FINISHED:
+            self.store.finish(job_id, "failed", error=f"worker crashed: {future.exception()!r}")
+
+    def poll(self, job_id):
+        return self.store.info(job_id)
+
+    def result(self, job_id):
+        return self.store.result(job_id)
+
+    def context(self, job_id):
+        return self.store.context(job_id)
+
+    def cancel(self, job_id):
+        self.store.cancel(job_id)
+
+    def jobs(self, limit=20):
+        return self.store.jobs(limit)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_manager():
+    """
+    Process-wide job manager shared by every Streamlit session.
+
+    Configured from the environment on first use:
+        BIFACIAL_PV_JOB_DB       — SQLite file (default: bifacial_pv_jobs.sqlite in the temp dir)
+        BIFACIAL_PV_JOB_WORKERS  — concurrent jobs (default: CPU count)
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            workers = os.environ.get("BIFACIAL_PV_JOB_WORKERS")
+            _default = JobManager(
+                os.environ.get("BIFACIAL_PV_JOB_DB")
+                or os.path.join(tempfile.gettempdir(), "bifacial_pv_jobs.sqlite"),
+                max_workers=int(workers) if workers else None,
+            )
+        return _default
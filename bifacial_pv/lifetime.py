@@ -0,0 +1,174 @@
+"""
+Degradation-aware multi-year simulation from a typical-year weather file.
+
+Pmax factorises into a weather part and a part that changes with time in
+service:
+
+    Pmax(t) = [Pmax_stc × Ftemp_Pmp(t) × Fg(t) × Fshade × Fmm] × Fclean(day) × Fage(year)
+
+weather_profile() streams the CSV once (see timeseries.iter_weather_chunks)
+and keeps only the bracketed term reduced per day: the day's energy and
+its peak Pmax at Fclean = Fage = 1. lifetime_yield() then replays that
+profile for every year in service, scaling each day by its soiling
+factor and each year by its aging factor. The model is not re-evaluated
+per year, so 25 years cost one weather pass plus (years × days)
+multiplications.
+
+Soiling accumulates by whole days. Dirt rises by rate %/day up to
+max_dirt and drops to zero on each cleaning, which happens every
+interval_days and/or on fixed days of the (weather) year. Fage for
+service year n (1-based) is model.aging_factor(start_age + n): 1.5% in
+year one, then 0.5% per year.
+
+The weather file is taken as one typical year and repeated: a "year"
+is however many days the file covers.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.model import (
+    ModuleSTC, TempCoeffs, aging_factor, cleaning_factor, compute_pmax, irradiance_factor,
+    temperature_factors,
+)
+from bifacial_pv.timeseries import iter_weather_chunks
+
+
+class Soiling(NamedTuple):
+    rate: float = 0.05            # dirt accumulation, % per day
+    max_dirt: float = 20.0        # % at which accumulation saturates
+    interval_days: int = None     # clean every interval_days days in service; None = never
+    days_of_year: tuple = ()      # also clean on these (0-based) days of every weather year
+    initial: float = 0.0          # dirt % at commissioning
+
+    def dirt(self, days, days_per_year):
+        """Dirt % for each of `days` consecutive days in service."""
+        day = np.arange(days)
+        cleaned = np.zeros(days, dtype=bool)
+        if self.interval_days:
+            cleaned[self.interval_days::self.interval_days] = True
+        for d in self.days_of_year:
+            if 0 <= d < days_per_year:
+                cleaned[d::days_per_year] = True
+
+        last = np.maximum.accumulate(np.where(cleaned, day, -1))
+        dirt = np.where(last < 0, self.initial + self.rate * day, self.rate * (day - last))
+        return np.minimum(dirt, self.max_dirt)
+
+
+class WeatherProfile(NamedTuple):
+    first_day: np.datetime64
+    daily_Wh: np.ndarray          # (D,) energy per day at Fclean = Fage = 1
+    daily_peak: np.ndarray        # (D,) peak Pmax per day at Fclean = Fage = 1 (W)
+    rows: int
+    step_hours: float
+
+    @property
+    def days(self):
+        return len(self.daily_Wh)
+
+
+class LifetimeResult(NamedTuple):
+    year: np.ndarray              # (N,) service year, 1-based
+    Fage: np.ndarray              # (N,)
+    energy_Wh: np.ndarray         # (N,) annual energy
+    peak_Pmax: np.ndarray         # (N,) highest Pmax of the year (W)
+    rated_Pmax: np.ndarray        # (N,) Pmax_stc × Fage, the nameplate trajectory (W)
+    mean_Fclean: np.ndarray       # (N,) energy-weighted mean soiling factor
+    soiling_loss_Wh: np.ndarray   # (N,) energy lost to soiling
+    daily_Wh: np.ndarray          # (N, D) energy per day
+
+    @property
+    def cumulative_Wh(self):
+        return np.cumsum(self.energy_Wh)
+
+
+def _grow(a, size, fill):
+    if len(a) >= size:
+        return a
+    out = np.full(size, fill)
+    out[:len(a)] = a
+    return out
+
+
+def weather_profile(source, Fmm=1.0, Fshade=1.0, stc=ModuleSTC(), coeffs=TempCoeffs(), BG=0.0,
+                    step_hours=None, chunk_rows=100_000, **columns):
+    """
+    Per-day energy and peak Pmax of one module without soiling or aging.
+
+    Streams the CSV in chunk_rows chunks like timeseries.energy_yield;
+    extra keyword arguments select column names. Days are counted from
+    the first timestamp's date.
+    """
+    daily_Wh   = np.zeros(0)
+    daily_peak = np.zeros(0)
+    first_day  = None
+    rows       = 0
+
+    for chunk in iter_weather_chunks(source, chunk_rows, **columns):
+        if step_hours is None:
+            if len(chunk.time) < 2:
+                raise ValueError("Need at least two rows to infer the time step")
+            step_hours = (chunk.time[1] - chunk.time[0]) / np.timedelta64(1, "h")
+        if first_day is None:
+            first_day = chunk.time[0].astype("datetime64[D]")
+
+        pmax = compute_pmax(stc.Pmax, temperature_factors(chunk.Tcell, coeffs).Pmp,
+                            irradiance_factor(chunk.G_front, BG), 1.0, Fshade, Fmm, 1.0)
+        pmax = np.maximum(pmax, 0.0)  # night-time sensor offsets can give G < 0
+
+        day = (chunk.time.astype("datetime64[D]") - first_day).astype(np.int64)
+        if day.min() < 0:
+            raise ValueError("Timestamps must be in ascending order")
+        size = int(day.max()) + 1
+        daily_Wh   = _grow(daily_Wh, size, 0.0)
+        daily_peak = _grow(daily_peak, size, 0.0)
+        daily_Wh[:size] += np.bincount(day, weights=pmax, minlength=size) * step_hours
+        np.maximum.at(daily_peak, day, pmax)
+        rows += len(pmax)
+
+    if rows == 0:
+        raise ValueError("CSV contains no data rows")
+
+    return WeatherProfile(first_day, daily_Wh, daily_peak, rows, float(step_hours))
+
+
+def lifetime_yield(profile, years=25, start_age=0, soiling=Soiling(), Pmax_stc=ModuleSTC().Pmax):
+    """
+    Year-by-year energy and Pmax over `years` years in service.
+
+    profile comes from weather_profile and is repeated every year;
+    start_age is the module's age in years at the start of the
+    simulation. Pmax_stc only scales rated_Pmax.
+    """
+    D = profile.days
+    Fclean = cleaning_factor(soiling.dirt(years * D, D)).reshape(years, D)
+    year = np.arange(1, years + 1)
+    Fage = np.asarray(aging_factor(start_age + year), dtype=float)
+
+    clean_Wh = profile.daily_Wh * Fage[:, None]
+    daily_Wh = clean_Wh * Fclean
+    energy = daily_Wh.sum(axis=1)
+    clean_energy = clean_Wh.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_Fclean = np.where(clean_energy > 0, energy / clean_energy, 1.0)
+
+    return LifetimeResult(
+        year=year,
+        Fage=Fage,
+        energy_Wh=energy,
+        peak_Pmax=(profile.daily_peak * Fclean).max(axis=1) * Fage,
+        rated_Pmax=Pmax_stc * Fage,
+        mean_Fclean=mean_Fclean,
+        soiling_loss_Wh=clean_energy - energy,
+        daily_Wh=daily_Wh,
+    )
+
+
+def lifetime_simulation(source, years=25, start_age=0, soiling=Soiling(), Fmm=1.0, Fshade=1.0,
+                        stc=ModuleSTC(), coeffs=TempCoeffs(), BG=0.0, step_hours=None,
+                        chunk_rows=100_000, **columns):
+    """weather_profile followed by lifetime_yield."""
+    profile = weather_profile(source, Fmm, Fshade, stc, coeffs, BG, step_hours, chunk_rows, **columns)
+    return lifetime_yield(profile, years, start_age, soiling, stc.Pmax)
@@ -0,0 +1,134 @@
+"""
+Datasheet-based bifacial PV module model.
+
+Pmax, Vmp, Imp, Voc and Isc are computed from STC datasheet values and
+multiplicative correction factors:
+
+    Isc  = Isc_stc  × Ftemp_Isc × Fg × Fclean × Fshade
+    Imp  = Imp_stc  × Ftemp_Imp × Fg × Fclean × Fshade
+    Voc  = Voc_stc  × Ftemp_Voc
+    Vmp  = Vmp_stc  × Ftemp_Vmp
+    Pmax = Pmax_stc × Ftemp_Pmp × Fg × Fclean × Fshade × Fmm × Fage
+
+Every function accepts scalars or NumPy arrays and broadcasts over them.
+Scalar inputs give scalar outputs.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class ModuleSTC(NamedTuple):
+    """Module electrical data at STC."""
+    Pmax: float = 610.0
+    Vmp: float = 40.51
+    Imp: float = 15.06
+    Voc: float = 48.38
+    Isc: float = 15.95
+
+
+class TempCoeffs(NamedTuple):
+    """Datasheet temperature coefficients (%/°C)."""
+    alphasc: float = 0.045
+    betaoc: float = -0.230
+    alphamp: float = 0.045
+    betamp: float = -0.280
+    gamma: float = -0.280
+
+
+class TempFactors(NamedTuple):
+    Isc: float
+    Imp: float
+    Voc: float
+    Vmp: float
+    Pmp: float
+
+
+class Outputs(NamedTuple):
+    Pmax: float
+    Vmp: float
+    Imp: float
+    Voc: float
+    Isc: float
+
+
+def _unwrap(a):
+    # 0-d arrays → NumPy scalars so scalar callers get plain numbers back
+    return np.asarray(a)[()]
+
+
+# ------------------ CORRECTION FACTORS ------------------
+def irradiance_factor(G_front, BG=0.0):
+    """Fg = G_front × (1 + BG) / 1000."""
+    return _unwrap(np.asarray(G_front, dtype=float) * (1 + np.asarray(BG, dtype=float)) / 1000)
+
+
+def cleaning_factor(dirt):
+    """Fclean = (100 − dirt) / 100."""
+    return _unwrap((100 - np.asarray(dirt, dtype=float)) / 100)
+
+
+def aging_factor(years):
+    """Fage: 1.5% degradation in year one, then 0.5% per year."""
+    years = np.asarray(years, dtype=float)
+    return _unwrap(np.where(years <= 0, 1.0, 1 - 0.015 - 0.005 * (years - 1)))
+
+
+def temperature_factors(Tcell, coeffs=TempCoeffs()):
+    """
+    Ftemp,X = 1 + (coeff/100)(Tcell − 25) for each output.
+
+    Fallback rules:
+    - If alphamp not given (0) → use alphasc
+    - If betamp not given (0) → use gamma
+    """
+    alphasc, betaoc, alphamp, betamp, gamma = (np.asarray(c, dtype=float) for c in coeffs)
+    alphamp = np.where(alphamp == 0, alphasc, alphamp)
+    betamp  = np.where(betamp == 0, gamma, betamp)
+
+    dT = np.asarray(Tcell, dtype=float) - 25
+    return TempFactors(
+        Isc=_unwrap(1 + (alphasc / 100) * dT),
+        Imp=_unwrap(1 + (alphamp / 100) * dT),
+        Voc=_unwrap(1 + (betaoc  / 100) * dT),
+        Vmp=_unwrap(1 + (betamp  / 100) * dT),
+        Pmp=_unwrap(1 + (gamma   / 100) * dT),
+    )
+
+
+# ------------------ ELECTRICAL OUTPUTS ------------------
+def compute_pmax(Pmax_stc, Ftemp_P, Fg, Fclean, Fshade, Fmm, Fage):
+    """Pmax = Pmax_stc × Ftemp_Pmp × Fg × Fclean × Fshade × Fmm × Fage."""
+    return Pmax_stc * Ftemp_P * Fg * Fclean * Fshade * Fmm * Fage
+
+
+def electrical_outputs(stc, Ftemp, Fg, Fclean, Fshade, Fmm, Fage):
+    """All five outputs from STC data and already-computed factors."""
+    return Outputs(
+        Pmax=compute_pmax(stc.Pmax, Ftemp.Pmp, Fg, Fclean, Fshade, Fmm, Fage),
+        Vmp=stc.Vmp * Ftemp.Vmp,
+        Imp=stc.Imp * Ftemp.Imp * Fg * Fclean * Fshade,
+        Voc=stc.Voc * Ftemp.Voc,
+        Isc=stc.Isc * Ftemp.Isc * Fg * Fclean * Fshade,
+    )
+
+
+def compute_outputs(G_front, Tcell, dirt, years, Fmm, Fshade,
+                    stc=ModuleSTC(), coeffs=TempCoeffs(), BG=0.0):
+    """
+    All five outputs from environmental inputs and loss factors.
+
+    G_front, Tcell, dirt, years, Fmm, Fshade and BG may be arrays of
+    any broadcast-compatible shape. Each output has the broadcast shape
+    of the inputs it depends on (Voc and Vmp depend on Tcell only).
+    """
+    return electrical_outputs(
+        stc,
+        temperature_factors(Tcell, coeffs),
+        irradiance_factor(G_front, BG),
+        cleaning_factor(dirt),
+        Fshade,
+        Fmm,
+        aging_factor(years),
+    )
@@ -0,0 +1,142 @@
+"""
+Multi-output ABC fit: match Pmax, Vmp, Imp, Voc and Isc together.
+
+Variables (solution vector):
+    x[0] = BG      — bifacial gain       [0.00, 0.35]
+    x[1] = dirt    — dirt level %        [0.00, 20.0]
+    x[2] = Fmm     — mismatch factor     [0.95,  1.0]
+    x[3] = Fshade  — shading factor      [0.70,  1.0]
+    x[4] = Tcell   — cell temperature °C [-10.0, 85.0]
+    x[5] = G_front — front irradiance    [50.0, 1400.0]
+    x[6] = Fage    — aging factor        [0.865,  1.0]   (fit_age=True only)
+
+Fixed (shared by all problems):
+    stc, coeffs — module datasheet values and temperature coefficients
+
+Objective: weighted mean relative error over the measured outputs,
+
+    Σ w_k |X_calc,k − X_meas,k| / X_meas,k  /  Σ w_k
+
+Outputs measured as 0 or NaN get zero weight, so a problem with only
+Pmax measured reduces to the Pmax-only fit (with Tcell and G_front free).
+Voc and Vmp pin Tcell; the currents and Pmax then constrain G_front and
+the loss factors.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.colony import BOUNDS, StopInfo, abc_minimize_batch
+from bifacial_pv.model import (
+    ModuleSTC, Outputs, TempCoeffs,
+    cleaning_factor, electrical_outputs, irradiance_factor, temperature_factors,
+)
+
+MULTI_BOUNDS = np.vstack([BOUNDS, [(-10.0, 85.0), (50.0, 1400.0)]])
+AGE_BOUNDS = (0.865, 1.0)   # aging_factor over 0–25 years
+
+DEFAULT_WEIGHTS = Outputs(Pmax=1.0, Vmp=1.0, Imp=1.0, Voc=1.0, Isc=1.0)
+
+
+def multi_bounds(fit_age=False):
+    """(D, 2) search box: 6 dims, or 7 with Fage free."""
+    return np.vstack([MULTI_BOUNDS, [AGE_BOUNDS]]) if fit_age else MULTI_BOUNDS
+
+
+class MultiFit(NamedTuple):
+    best_sol: np.ndarray        # (P, D)
+    outputs: Outputs            # (P,) arrays at best_sol
+    error: np.ndarray           # (P,) weighted mean relative error
+    error_history: np.ndarray   # (P, cycles_run)
+    stop: StopInfo
+
+
+def outputs_at(X, stc=ModuleSTC(), coeffs=TempCoeffs(), Fage=1.0):
+    """All five outputs for solution vectors X (..., 6) or (..., 7)."""
+    X = np.asarray(X, dtype=float)
+    if X.shape[-1] > 6:
+        Fage = X[..., 6]
+    return electrical_outputs(
+        stc,
+        temperature_factors(X[..., 4], coeffs),
+        irradiance_factor(X[..., 5], X[..., 0]),
+        cleaning_factor(X[..., 1]),
+        X[..., 3],
+        X[..., 2],
+        Fage,
+    )
+
+
+def measured_matrix(measured, weights):
+    """(P, 5) measured values and normalised weights, 0 where not measured."""
+    measured = Outputs(*(np.atleast_1d(np.asarray(m, dtype=float)) for m in measured))
+    meas = np.column_stack(np.broadcast_arrays(*measured))
+    w = np.broadcast_to(np.asarray(weights, dtype=float), meas.shape).copy()
+    w[~(meas > 0)] = 0.0
+    total = w.sum(axis=1, keepdims=True)
+    if np.any(total == 0):
+        raise ValueError("Every problem needs at least one measured output with a non-zero weight")
+    return np.where(meas > 0, meas, 1.0), w / total
+
+
+def weighted_error(outputs, meas, w):
+    """Weighted relative error of outputs against measured_matrix rows meas and weights w."""
+    calc = np.stack(np.broadcast_arrays(*outputs), axis=-1)
+    return (np.abs(calc - meas) / meas * w).sum(axis=-1)
+
+
+def multi_objective(measured, stc=ModuleSTC(), coeffs=TempCoeffs(), Fage=1.0, weights=DEFAULT_WEIGHTS):
+    """
+    Batched weighted relative error over multi_bounds for P problems.
+
+    Returns (objective(X, p), P, Fage as a (P,) array); X may carry the
+    7th (Fage) column, see outputs_at.
+    """
+    meas, w = measured_matrix(measured, weights)
+    Fage = np.broadcast_to(np.asarray(Fage, dtype=float), (len(meas),))
+
+    def objective(X, p):
+        return weighted_error(outputs_at(X, stc, coeffs, Fage[p]), meas[p], w[p])
+
+    return objective, len(meas), Fage
+
+
+def fit_multi_batch(measured, num_bees, max_cycles, limit, stc=ModuleSTC(), coeffs=TempCoeffs(),
+                    Fage=1.0, weights=DEFAULT_WEIGHTS, fit_age=False, rng=None, stats=None,
+                    progress=None, **stopping):
+    """
+    Fit P problems to their measured outputs in one stacked colony.
+
+    measured is an Outputs (or 5-sequence in Outputs order) of scalars or
+    1-D arrays broadcasting to length P; weights is a 5-sequence in the
+    same order. Fage is a scalar or (P,) array, ignored when fit_age=True.
+    rng, stats, progress and the early-stopping keywords are as for
+    abc_minimize_batch; abs_tol and rel_tol both apply to the relative
+    objective.
+    """
+    objective, num_problems, Fage = multi_objective(measured, stc, coeffs, Fage, weights)
+    best_sol, best_fit, error_history, stop = abc_minimize_batch(
+        objective, multi_bounds(fit_age), num_problems, num_bees, max_cycles, limit,
+        rng, stats=stats, progress=progress, **stopping
+    )
+    return MultiFit(best_sol, outputs_at(best_sol, stc, coeffs, Fage), best_fit, error_history, stop)
+
+
+def fit_multi(measured, num_bees, max_cycles, limit, stc=ModuleSTC(), coeffs=TempCoeffs(),
+              Fage=1.0, weights=DEFAULT_WEIGHTS, fit_age=False, rng=None, stats=None, progress=None,
+              **stopping):
+    """
+    Single-problem form of fit_multi_batch with plain Python results:
+    (best_sol list, Outputs of floats, error float, error_history list,
+    StopInfo(reason str, cycle int)).
+    """
+    fit = fit_multi_batch(measured, num_bees, max_cycles, limit, stc, coeffs, Fage, weights,
+                          fit_age, rng, stats, progress, **stopping)
+    return (
+        fit.best_sol[0].tolist(),
+        Outputs(*(float(o[0]) for o in fit.outputs)),
+        float(fit.error[0]),
+        fit.error_history[0].tolist(),
+        StopInfo(str(fit.stop.reason[0]), int(fit.stop.cycle[0])),
+    )
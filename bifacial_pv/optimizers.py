@@ -0,0 +1,470 @@
+"""
+Pluggable optimizer backends over one batched objective interface.
+
+Every backend minimises objective(X, p) — candidates X (n, D) with
+problem indices p (n,), returning n non-negative errors — for P
+independent problems inside a (D, 2) box, exactly like
+abc_minimize_batch, and shares its rng, stats, progress and
+early-stopping keywords (colony.EarlyStopping) and its return value:
+
+    best_sol (P, D), best_fit (P,), error_history (P, iterations), StopInfo
+
+Backends (METHODS):
+    ABC           — artificial bee colony (colony.abc_minimize_batch)
+    DE            — differential evolution, rand/1/bin with bounce-back
+    PSO           — particle swarm, inertia weight with velocity clamp
+    Nelder-Mead   — simplex per problem, restarted around the best vertex when it collapses
+    Quasi-Newton  — projected BFGS with forward-difference gradients,
+                    restarted at a random point when the line search fails
+
+Nelder–Mead and Quasi-Newton work in box-normalised coordinates so every
+variable has the same scale. An iteration is one ABC cycle, DE/PSO
+generation, simplex step or quasi-Newton step; these cost different
+numbers of evaluations, so compare_methods ranks backends by
+evaluations-to-tolerance and wall time on identical problems.
+"""
+
+import math
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.colony import BOUNDS, EarlyStopping, abc_minimize_batch, compute_pmax, pmax_objective
+from bifacial_pv.profiling import NULL_STATS
+
+
+class _Run:
+    """Shared set-up: box, generator, stopping rules and counted evaluation."""
+
+    def __init__(self, objective, bounds, num_problems, max_cycles, rng, stats, stopping):
+        bounds = np.asarray(bounds, dtype=float)
+        self.lo, self.hi = bounds[:, 0], bounds[:, 1]
+        self.dim = len(bounds)
+        self.rng = np.random.default_rng(rng)
+        self.rules = EarlyStopping(num_problems, max_cycles, **stopping)
+        self.stats = stats if stats is not None else NULL_STATS
+        self.objective = objective
+        self.started = time.perf_counter()
+
+    def evaluate(self, X, p):
+        with self.stats.timer("objective"):
+            fit = self.objective(X, p)
+        self.stats.count_objective(len(p))
+        self.rules.count(p)
+        return fit
+
+    def to_box(self, U):
+        return self.lo + U * (self.hi - self.lo)
+
+    def finish(self, cycles_run, best_sol, best_fit):
+        error_history, stop = self.rules.finish(cycles_run)
+        if self.stats is not NULL_STATS:
+            self.stats.total_time += time.perf_counter() - self.started
+        return best_sol, best_fit, error_history, stop
+
+
+# ------------------ DIFFERENTIAL EVOLUTION ------------------
+def de_minimize_batch(objective, bounds, num_problems, max_cycles, population=30, F=0.7, CR=0.9,
+                      rng=None, stats=None, progress=None, **stopping):
+    """DE/rand/1/bin; population ≥ 4 per problem, mutants leaving the box bounce back."""
+    if population < 4:
+        raise ValueError("DE needs a population of at least 4")
+    run = _Run(objective, bounds, num_problems, max_cycles, rng, stats, stopping)
+    lo, hi, dim, rng = run.lo, run.hi, run.dim, run.rng
+    N = population
+
+    X   = rng.uniform(lo, hi, size=(num_problems, N, dim))
+    fit = run.evaluate(X.reshape(-1, dim), np.repeat(np.arange(num_problems), N)).reshape(num_problems, N)
+    cycles_run = 0
+
+    for cycle in range(max_cycles):
+        act = np.flatnonzero(run.rules.active)
+        if len(act) == 0:
+            break
+        cycles_run = cycle + 1
+
+        p = np.repeat(act, N)
+        i = np.tile(np.arange(N), len(act))
+        n = len(p)
+        rows = np.arange(n)
+
+        # Three distinct partners ≠ i per target
+        keys = rng.random((n, N))
+        keys[rows, i] = np.inf
+        r = np.argpartition(keys, 3, axis=1)[:, :3]
+        base = X[p, r[:, 0]]
+        mutant = base + F * (X[p, r[:, 1]] - X[p, r[:, 2]])
+
+        cross = rng.random((n, dim)) < CR
+        cross[rows, rng.integers(0, dim, n)] = True
+        trial = np.where(cross, mutant, X[p, i])
+
+        # Bounce back: land between the base vector and the violated bound
+        u = rng.random((n, dim))
+        trial = np.where(trial < lo, lo + u * (base - lo), trial)
+        trial = np.where(trial > hi, hi - u * (hi - base), trial)
+
+        f = run.evaluate(trial, p)
+        better = f <= fit[p, i]
+        X[p[better], i[better]] = trial[better]
+        fit[p[better], i[better]] = f[better]
+
+        with run.stats.timer("stopping"):
+            run.rules.update(cycle, act, fit[act].min(axis=1))
+        if progress is not None:
+            progress(cycles_run, fit.min(axis=1))
+
+    best = fit.argmin(axis=1)
+    rows = np.arange(num_problems)
+    return run.finish(cycles_run, X[rows, best], fit[rows, best])
+
+
+# ------------------ PARTICLE SWARM ------------------
+def pso_minimize_batch(objective, bounds, num_problems, max_cycles, particles=30, inertia=0.72,
+                       cognitive=1.49, social=1.49, rng=None, stats=None, progress=None, **stopping):
+    """Global-best PSO; velocities are clamped to 20% of each range, positions to the box."""
+    run = _Run(objective, bounds, num_problems, max_cycles, rng, stats, stopping)
+    lo, hi, dim, rng = run.lo, run.hi, run.dim, run.rng
+    N = particles
+    vmax = 0.2 * (hi - lo)
+
+    X = rng.uniform(lo, hi, size=(num_problems, N, dim))
+    V = rng.uniform(-vmax, vmax, size=(num_problems, N, dim))
+    fit = run.evaluate(X.reshape(-1, dim), np.repeat(np.arange(num_problems), N)).reshape(num_problems, N)
+    pbest, pfit = X.copy(), fit.copy()
+    cycles_run = 0
+
+    for cycle in range(max_cycles):
+        act = np.flatnonzero(run.rules.active)
+        if len(act) == 0:
+            break
+        cycles_run = cycle + 1
+
+        gbest = pbest[act, pfit[act].argmin(axis=1)][:, None, :]
+        r1 = rng.random((len(act), N, dim))
+        r2 = rng.random((len(act), N, dim))
+        V[act] = np.clip(
+            inertia * V[act] + cognitive * r1 * (pbest[act] - X[act]) + social * r2 * (gbest - X[act]),
+            -vmax, vmax,
+        )
+        X[act] = np.clip(X[act] + V[act], lo, hi)
+
+        f = run.evaluate(X[act].reshape(-1, dim), np.repeat(act, N)).reshape(len(act), N)
+        a, k = np.nonzero(f < pfit[act])
+        pbest[act[a], k] = X[act[a], k]
+        pfit[act[a], k] = f[a, k]
+
+        with run.stats.timer("stopping"):
+            run.rules.update(cycle, act, pfit[act].min(axis=1))
+        if progress is not None:
+            progress(cycles_run, pfit.min(axis=1))
+
+    best = pfit.argmin(axis=1)
+    rows = np.arange(num_problems)
+    return run.finish(cycles_run, pbest[rows, best], pfit[rows, best])
+
+
+# ------------------ NELDER–MEAD ------------------
+def nelder_mead_batch(objective, bounds, num_problems, max_cycles, step=0.1, restart_size=1e-9,
+                      rng=None, stats=None, progress=None, **stopping):
+    """
+    One Nelder–Mead simplex per problem, started at a random point.
+
+    step is the initial edge length as a fraction of each range; a
+    simplex smaller than restart_size is rebuilt around its best vertex.
+    Trial points are clipped to the box.
+    """
+    run = _Run(objective, bounds, num_problems, max_cycles, rng, stats, stopping)
+    dim, rng = run.dim, run.rng
+    alpha, gamma, rho, sigma = 1.0, 2.0, 0.5, 0.5
+
+    def evaluate(U, p):
+        return run.evaluate(run.to_box(U), p)
+
+    def simplex_around(u0):
+        # Vertices u0 and u0 ± step·e_j, stepping inward near the upper bound
+        offsets = np.where(u0[:, None, :] + step <= 1, step, -step) * np.eye(dim)
+        return np.concatenate([u0[:, None, :], u0[:, None, :] + offsets], axis=1)
+
+    def evaluate_simplex(rows, S):
+        p = np.repeat(rows, dim + 1)
+        return evaluate(S.reshape(-1, dim), p).reshape(len(rows), dim + 1)
+
+    all_rows = np.arange(num_problems)
+    S = simplex_around(rng.random((num_problems, dim)))
+    Fs = evaluate_simplex(all_rows, S)
+    cycles_run = 0
+
+    for cycle in range(max_cycles):
+        act = np.flatnonzero(run.rules.active)
+        if len(act) == 0:
+            break
+        cycles_run = cycle + 1
+
+        order = np.argsort(Fs[act], axis=1)
+        S[act] = np.take_along_axis(S[act], order[:, :, None], axis=1)
+        Fs[act] = np.take_along_axis(Fs[act], order, axis=1)
+        s, f = S[act], Fs[act]
+        best, worst = s[:, 0], s[:, -1]
+        f_best, f_second, f_worst = f[:, 0], f[:, -2], f[:, -1]
+        centroid = s[:, :-1].mean(axis=1)
+
+        xr = np.clip(centroid + alpha * (centroid - worst), 0, 1)
+        fr = evaluate(xr, act)
+        new_x, new_f = xr.copy(), fr.copy()
+
+        # Expansion
+        m = fr < f_best
+        if m.any():
+            xe = np.clip(centroid[m] + gamma * (xr[m] - centroid[m]), 0, 1)
+            fe = evaluate(xe, act[m])
+            take = fe < fr[m]
+            idx = np.flatnonzero(m)[take]
+            new_x[idx], new_f[idx] = xe[take], fe[take]
+
+        # Contraction (outside if the reflection beat the worst vertex, else inside), then shrink
+        m = fr >= f_second
+        shrink = np.zeros(len(act), dtype=bool)
+        if m.any():
+            outside = fr[m] < f_worst[m]
+            target = np.where(outside[:, None], xr[m], worst[m])
+            xc = centroid[m] + rho * (target - centroid[m])
+            fc = evaluate(xc, act[m])
+            ok = fc < np.where(outside, fr[m], f_worst[m])
+            idx = np.flatnonzero(m)
+            new_x[idx[ok]], new_f[idx[ok]] = xc[ok], fc[ok]
+            shrink[idx[~ok]] = True
+
+        keep = ~shrink
+        S[act[keep], -1] = new_x[keep]
+        Fs[act[keep], -1] = new_f[keep]
+        if shrink.any():
+            rows = act[shrink]
+            shrunk = best[shrink, None, :] + sigma * (S[rows, 1:] - best[shrink, None, :])
+            S[rows, 1:] = shrunk
+            Fs[rows, 1:] = evaluate(shrunk.reshape(-1, dim), np.repeat(rows, dim)).reshape(len(rows), dim)
+
+        # Rebuild collapsed simplices around their best vertex
+        size = np.ptp(S[act], axis=1).max(axis=1)
+        collapsed = act[size < restart_size]
+        if len(collapsed):
+            b = Fs[collapsed].argmin(axis=1)
+            S[collapsed] = simplex_around(S[collapsed, b])
+            Fs[collapsed] = evaluate_simplex(collapsed, S[collapsed])
+
+        with run.stats.timer("stopping"):
+            run.rules.update(cycle, act, Fs[act].min(axis=1))
+        if progress is not None:
+            progress(cycles_run, Fs.min(axis=1))
+
+    b = Fs.argmin(axis=1)
+    return run.finish(cycles_run, run.to_box(S[all_rows, b]), Fs[all_rows, b])
+
+
+# ------------------ BOUNDED QUASI-NEWTON ------------------
+def quasi_newton_batch(objective, bounds, num_problems, max_cycles, fd_step=1e-6, max_backtracks=20,
+                       rng=None, stats=None, progress=None, **stopping):
+    """
+    Projected BFGS on the box with forward-difference gradients.
+
+    Variables on a bound whose gradient points outward are held fixed;
+    steps are projected onto the box and accepted by Armijo
+    backtracking. When no step decreases the error (a kink or a flat
+    region) the problem restarts from a random point; the best point
+    over all restarts is kept.
+    """
+    run = _Run(objective, bounds, num_problems, max_cycles, rng, stats, stopping)
+    dim, rng = run.dim, run.rng
+    eye = np.eye(dim)
+
+    def evaluate(U, p):
+        return run.evaluate(run.to_box(U), p)
+
+    def gradient(U, f, rows):
+        # Forward differences, stepping inward at the upper bound
+        h = np.where(U + fd_step <= 1, fd_step, -fd_step)
+        probes = U[:, None, :] + h[:, None, :] * eye
+        fp = evaluate(probes.reshape(-1, dim), np.repeat(rows, dim)).reshape(len(rows), dim)
+        return (fp - f[:, None]) / h
+
+    all_rows = np.arange(num_problems)
+    U = rng.random((num_problems, dim))
+    f = evaluate(U, all_rows)
+    g = gradient(U, f, all_rows)
+    H = np.broadcast_to(eye, (num_problems, dim, dim)).copy()
+    best_u, best_f = U.copy(), f.copy()
+    cycles_run = 0
+
+    for cycle in range(max_cycles):
+        act = np.flatnonzero(run.rules.active)
+        if len(act) == 0:
+            break
+        cycles_run = cycle + 1
+
+        u, fa, ga = U[act], f[act], g[act]
+        free = ~(((u <= 0) & (ga > 0)) | ((u >= 1) & (ga < 0)))
+        d = -np.einsum("pij,pj->pi", H[act], ga) * free
+        uphill = (d * ga).sum(axis=1) >= 0
+        d[uphill] = -ga[uphill] * free[uphill]
+        H[act[uphill]] = eye
+
+        # Armijo backtracking along the projected path
+        t = np.ones(len(act))
+        accepted = np.zeros(len(act), dtype=bool)
+        u_new, f_new = u.copy(), fa.copy()
+        for _ in range(max_backtracks):
+            todo = np.flatnonzero(~accepted)
+            if len(todo) == 0:
+                break
+            trial = np.clip(u[todo] + t[todo, None] * d[todo], 0, 1)
+            ft = evaluate(trial, act[todo])
+            ok = ft <= fa[todo] + 1e-4 * (ga[todo] * (trial - u[todo])).sum(axis=1)
+            ok &= ft < fa[todo]
+            u_new[todo[ok]], f_new[todo[ok]] = trial[ok], ft[ok]
+            accepted[todo[ok]] = True
+            t[todo[~ok]] *= 0.5
+
+        moved = act[accepted]
+        if len(moved):
+            g_new = gradient(u_new[accepted], f_new[accepted], moved)
+            s = u_new[accepted] - U[moved]
+            y = g_new - g[moved]
+            sy = (s * y).sum(axis=1)
+            upd = sy > 1e-12
+            if upd.any():
+                r = moved[upd]
+                rho_ = 1 / sy[upd]
+                V = eye - rho_[:, None, None] * s[upd, :, None] * y[upd, None, :]
+                H[r] = V @ H[r] @ V.transpose(0, 2, 1) + rho_[:, None, None] * s[upd, :, None] * s[upd, None, :]
+            U[moved], f[moved], g[moved] = u_new[accepted], f_new[accepted], g_new
+
+        stuck = act[~accepted]
+        if len(stuck):
+            U[stuck] = rng.random((len(stuck), dim))
+            f[stuck] = evaluate(U[stuck], stuck)
+            g[stuck] = gradient(U[stuck], f[stuck], stuck)
+            H[stuck] = eye
+
+        improved = act[f[act] < best_f[act]]
+        best_u[improved], best_f[improved] = U[improved], f[improved]
+
+        with run.stats.timer("stopping"):
+            run.rules.update(cycle, act, best_f[act])
+        if progress is not None:
+            progress(cycles_run, best_f)
+
+    return run.finish(cycles_run, run.to_box(best_u), best_f)
+
+
+# ------------------ REGISTRY ------------------
+def _abc(objective, bounds, num_problems, max_cycles, num_bees=30, limit=5, rng=None, **kwargs):
+    return abc_minimize_batch(objective, bounds, num_problems, num_bees, max_cycles, limit, rng, **kwargs)
+
+
+class Method(NamedTuple):
+    minimize: object          # backend(objective, bounds, num_problems, max_cycles, **options, rng, stats, progress, **stopping)
+    options: dict             # default hyperparameters
+    evals_per_cycle: object   # (options, dim) → nominal evaluations per iteration and problem
+
+
+METHODS = {
+    # ABC: employed bees + on average one onlooker per problem (scouts are rare)
+    "ABC":          Method(_abc, {"num_bees": 30, "limit": 5}, lambda o, d: o["num_bees"] + 1),
+    "DE":           Method(de_minimize_batch, {"population": 30, "F": 0.7, "CR": 0.9},
+                           lambda o, d: o["population"]),
+    "PSO":          Method(pso_minimize_batch, {"particles": 30, "inertia": 0.72, "cognitive": 1.49,
+                                                "social": 1.49}, lambda o, d: o["particles"]),
+    "Nelder-Mead":  Method(nelder_mead_batch, {"step": 0.1}, lambda o, d: 2),
+    "Quasi-Newton": Method(quasi_newton_batch, {"fd_step": 1e-6}, lambda o, d: d + 2),
+}
+
+# Hyperparameter that sets the population size, for methods that have one
+POPULATION_OPTION = {"ABC": "num_bees", "DE": "population", "PSO": "particles"}
+
+
+def minimize_batch(method, objective, bounds, num_problems, max_cycles, rng=None, options=None,
+                   stats=None, progress=None, **stopping):
+    """Run any METHODS backend; options override its default hyperparameters."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown optimizer {method!r}; choose from {', '.join(METHODS)}")
+    m = METHODS[method]
+    return m.minimize(objective, bounds, num_problems, max_cycles, rng=rng, stats=stats,
+                      progress=progress, **{**m.options, **(options or {})}, **stopping)
+
+
+def fit_pmax_batch(method, Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, max_cycles, rng=None,
+                   options=None, stats=None, progress=None, **stopping):
+    """
+    abc_optimize_batch with any backend: fit [BG, dirt, Fmm, Fshade] to
+    measured Pmax for P problems. Returns the same four values.
+    """
+    Pmax_stc, Ftemp_P, Fg, Fage = (np.asarray(a, dtype=float) for a in (Pmax_stc, Ftemp_P, Fg, Fage))
+    objective, Pmax_meas = pmax_objective(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas)
+    best_sol, _, error_history, stop = minimize_batch(
+        method, objective, BOUNDS, len(Pmax_meas), max_cycles, rng, options, stats, progress,
+        rel_scale=Pmax_meas, **stopping
+    )
+    return best_sol, compute_pmax(best_sol, Pmax_stc, Ftemp_P, Fg, Fage), error_history, stop
+
+
+# ------------------ COMPARISON ------------------
+class MethodComparison(NamedTuple):
+    method: str
+    solved: float             # share of problems reaching tol within the evaluation budget
+    evals_to_tol: float       # median evaluations to reach tol over solved problems (NaN if none)
+    final_error: float        # median best error at the end
+    evals: int                # evaluations spent, all problems
+    wall_time: float          # seconds, all problems
+    curve: tuple              # (evaluations per problem, median best error) after each iteration
+
+
+def compare_methods(objective, bounds, num_problems, tol, max_evals, methods=None, options=None, seed=0):
+    """
+    Run each method on the same num_problems problems from the same seed.
+
+    Problems stop once their best error ≤ tol or once they used
+    max_evals evaluations (counted, so every method gets the same
+    budget up to one iteration); ceil(max_evals / evals_per_cycle)
+    iterations only cap the run. A problem counts as solved only if it
+    reached tol within max_evals evaluations.
+    options maps method name → hyperparameter overrides.
+    """
+    results = []
+    for name in methods or METHODS:
+        m = METHODS[name]
+        opts = {**m.options, **(options or {}).get(name, {})}
+        dim = len(bounds)
+        max_cycles = max(1, math.ceil(max_evals / m.evals_per_cycle(opts, dim)))
+
+        evals = np.zeros(num_problems, dtype=np.int64)
+        reached = np.full(num_problems, -1, dtype=np.int64)
+        curve_evals, curve_error = [], []
+
+        def counted(X, p):
+            evals[:] += np.bincount(p, minlength=num_problems)
+            return objective(X, p)
+
+        def progress(cycles_run, best):
+            hit = (reached < 0) & (best <= tol)
+            reached[hit] = evals[hit]
+            curve_evals.append(float(np.mean(evals)))
+            curve_error.append(float(np.median(best)))
+
+        started = time.perf_counter()
+        _, best_fit, _, _ = minimize_batch(name, counted, bounds, num_problems, max_cycles, rng=seed,
+                                           options=opts, progress=progress, abs_tol=tol,
+                                           max_evals=max_evals)
+        wall = time.perf_counter() - started
+
+        solved = (reached >= 0) & (reached <= max_evals)
+        results.append(MethodComparison(
+            method=name,
+            solved=float(solved.mean()),
+            evals_to_tol=float(np.median(reached[solved])) if solved.any() else float("nan"),
+            final_error=float(np.median(best_fit)),
+            evals=int(evals.sum()),
+            wall_time=wall,
+            curve=(np.array(curve_evals), np.array(curve_error)),
+        ))
+    return results
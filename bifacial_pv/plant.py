@@ -0,0 +1,138 @@
+"""
+Array-level plant model: modules → series strings → inverters.
+
+Every module is evaluated with the page-1 equations from its own
+irradiance, temperature, soiling, shading and age. The module's Pmax is
+taken at its Vmp, so each module delivers I = Pmax / Vmp:
+
+    string current  = min(I) over the string's modules (weakest module limits)
+    string voltage  = Σ Vmp over the string's modules
+    inverter power  = min(string voltage) × Σ string current
+
+Parallel strings on one inverter share a single DC bus voltage. Taking
+the lowest string voltage is a conservative stand-in for the common MPP
+and never exceeds the sum of the string powers. Mismatch is then
+computed rather than assumed:
+
+    Fmm = plant Pmax / Σ module Pmax
+
+Modules are indexed inverter-major, then string, then position in the
+string, i.e. flat module k sits at
+    (k // (S × M), (k // M) % S, k % M)
+for S strings per inverter and M modules per string. Per-module inputs
+have shape (..., n_modules) with any leading (e.g. time) axes; scalars
+broadcast to every module. Everything is a handful of NumPy reductions,
+so 100k+ modules take milliseconds. For long time series, feed time
+chunks (see timeseries.iter_weather_chunks) rather than one
+(steps × modules) array.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.model import (
+    ModuleSTC,
+    TempCoeffs,
+    aging_factor,
+    cleaning_factor,
+    compute_pmax,
+    irradiance_factor,
+    temperature_factors,
+)
+
+
+class PlantLayout(NamedTuple):
+    modules_per_string: int = 28
+    strings_per_inverter: int = 20
+    inverters: int = 10
+
+    @property
+    def n_modules(self):
+        return self.modules_per_string * self.strings_per_inverter * self.inverters
+
+    @property
+    def shape(self):
+        return (self.inverters, self.strings_per_inverter, self.modules_per_string)
+
+
+class PlantResult(NamedTuple):
+    Pmax: np.ndarray            # (...) plant DC Pmax after inverter clipping (W)
+    Pmax_modules: np.ndarray    # (...) Σ module Pmax, i.e. the plant with no mismatch (W)
+    Fmm: np.ndarray             # (...) effective mismatch factor before clipping
+    clipped: np.ndarray         # (...) power lost to inverter limits (W)
+    string_I: np.ndarray        # (..., inverters, strings) string current (A)
+    string_V: np.ndarray        # (..., inverters, strings) string voltage (V)
+    inverter_P: np.ndarray      # (..., inverters) inverter DC power before clipping (W)
+
+
+def module_operating_points(G_front, Tcell, dirt, years, Fshade=1.0,
+                            stc=ModuleSTC(), coeffs=TempCoeffs(), BG=0.0):
+    """
+    Per-module (Pmax, I, V) at the maximum power point, without mismatch.
+
+    Same equations as model.compute_outputs with Fmm = 1; I = Pmax / Vmp
+    so that I × V reproduces the module Pmax including Fage.
+    """
+    Ftemp = temperature_factors(Tcell, coeffs)
+    pmax = compute_pmax(stc.Pmax, Ftemp.Pmp, irradiance_factor(G_front, BG),
+                        cleaning_factor(dirt), np.asarray(Fshade, dtype=float), 1.0,
+                        aging_factor(years))
+    pmax = np.maximum(pmax, 0.0)
+    V = np.asarray(stc.Vmp * Ftemp.Vmp, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        I = np.where(V > 0, pmax / V, 0.0)
+    return pmax, I, V
+
+
+def _per_module(a, layout):
+    # (..., n_modules) → (..., inverters, strings, modules); scalars and
+    # size-1 module axes broadcast to every module
+    a = np.asarray(a, dtype=float)
+    if a.ndim == 0:
+        return a
+    if a.shape[-1] == 1:
+        return a[..., None, None]
+    if a.shape[-1] != layout.n_modules:
+        raise ValueError(f"Per-module inputs have {a.shape[-1]} modules, layout has {layout.n_modules}")
+    return a.reshape(*a.shape[:-1], *layout.shape)
+
+
+def plant_pmax(layout, G_front, Tcell, dirt=0.0, years=0, Fshade=1.0,
+               stc=ModuleSTC(), coeffs=TempCoeffs(), BG=0.0, inverter_limit=None):
+    """
+    Plant Pmax and effective mismatch from per-module conditions.
+
+    G_front, Tcell, dirt, years, Fshade and BG are scalars or arrays of
+    shape (..., layout.n_modules). inverter_limit caps each inverter's
+    DC input (W); None means no clipping.
+    """
+    pmax, I, V = (_per_module(a, layout) for a in
+                  module_operating_points(G_front, Tcell, dirt, years, Fshade, stc, coeffs, BG))
+    shape = np.broadcast_shapes(pmax.shape, I.shape, V.shape, layout.shape)
+    pmax, I, V = (np.broadcast_to(a, shape) for a in (pmax, I, V))
+
+    string_I = I.min(axis=-1)
+    string_V = V.sum(axis=-1)
+    inverter_P = string_V.min(axis=-1) * string_I.sum(axis=-1)
+
+    P_dc = inverter_P.sum(axis=-1)
+    if inverter_limit is None:
+        P = P_dc
+    else:
+        P = np.minimum(inverter_P, inverter_limit).sum(axis=-1)
+
+    P_modules = pmax.sum(axis=(-3, -2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Fmm = np.where(P_modules > 0, P_dc / P_modules, 1.0)
+
+    # 0-d results → NumPy scalars for scalar inputs, as the model functions return
+    return PlantResult(
+        Pmax=np.asarray(P)[()],
+        Pmax_modules=np.asarray(P_modules)[()],
+        Fmm=np.asarray(Fmm)[()],
+        clipped=np.asarray(P_dc - P)[()],
+        string_I=string_I,
+        string_V=string_V,
+        inverter_P=inverter_P,
+    )
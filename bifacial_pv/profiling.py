@@ -0,0 +1,122 @@
+"""
+Optional hot-path instrumentation for optimization runs.
+
+RunStats is passed to abc_optimize / abc_optimize_batch as `stats` and
+collects per-phase wall time, objective call and evaluation counts, and
+per-cycle scout resets and acceptance rates. Without it the optimizer
+uses NULL_STATS, whose methods do nothing.
+
+profile_call wraps any call in cProfile and/or tracemalloc capture.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+# Phases timed inside the ABC loop
+PHASES = ("objective", "candidates", "clip", "selection", "probabilities", "scouts", "stopping")
+
+
+class RunStats:
+    def __init__(self):
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self.objective_calls = 0
+        self.objective_evals = 0
+        # Per cycle
+        self.scouts = []
+        self.employed_accepted = []
+        self.employed_trials = []
+        self.onlooker_accepted = []
+        self.onlooker_trials = []
+        self.total_time = 0.0
+
+    @contextmanager
+    def timer(self, phase):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_time[phase] = self.phase_time.get(phase, 0.0) + time.perf_counter() - t0
+
+    def count_objective(self, evals):
+        self.objective_calls += 1
+        self.objective_evals += int(evals)
+
+    def record_cycle(self, employed, onlooker, scouts):
+        """employed/onlooker are (accepted, trials) pairs for the cycle."""
+        self.employed_accepted.append(int(employed[0]))
+        self.employed_trials.append(int(employed[1]))
+        self.onlooker_accepted.append(int(onlooker[0]))
+        self.onlooker_trials.append(int(onlooker[1]))
+        self.scouts.append(int(scouts))
+
+    def summary(self):
+        """Plain-Python summary suitable for session state or JSON."""
+        def rate(acc, trials):
+            acc, trials = np.asarray(acc, dtype=float), np.asarray(trials, dtype=float)
+            return np.divide(acc, trials, out=np.zeros_like(acc), where=trials > 0).tolist()
+
+        return {
+            "phase_time": dict(self.phase_time),
+            "total_time": self.total_time,
+            "objective_calls": self.objective_calls,
+            "objective_evals": self.objective_evals,
+            "evals_per_sec": self.objective_evals / self.total_time if self.total_time > 0 else 0.0,
+            "scouts_per_cycle": list(self.scouts),
+            "scout_resets": int(sum(self.scouts)),
+            "employed_acceptance": rate(self.employed_accepted, self.employed_trials),
+            "onlooker_acceptance": rate(self.onlooker_accepted, self.onlooker_trials),
+        }
+
+
+class _NullStats:
+    _null = nullcontext()
+
+    def timer(self, phase):
+        return self._null
+
+    def count_objective(self, evals):
+        pass
+
+    def record_cycle(self, employed, onlooker, scouts):
+        pass
+
+
+NULL_STATS = _NullStats()
+
+
+def profile_call(fn, *args, cprofile=False, trace_memory=False, top=25, **kwargs):
+    """
+    Call fn(*args, **kwargs) under optional cProfile / tracemalloc capture.
+
+    Returns (result, report) where report has "cprofile" (pstats text
+    sorted by cumulative time) and/or "peak_mem_mb" and "top_allocations".
+    """
+    report = {}
+    profiler = cProfile.Profile() if cprofile else None
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(fn, *args, **kwargs)
+        else:
+            result = fn(*args, **kwargs)
+        if trace_memory:
+            report["peak_mem_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+            snapshot = tracemalloc.take_snapshot()
+            report["top_allocations"] = [str(s) for s in snapshot.statistics("lineno")[:top]]
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    if profiler is not None:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        report["cprofile"] = out.getvalue()
+
+    return result, report
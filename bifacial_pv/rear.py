@@ -0,0 +1,311 @@
+"""
+View-factor rear irradiance model: BG from array geometry and sun position.
+
+Rows are treated as long 2-D sheds in the plane across the rows (x
+toward the back of the rows, z up). Every row is a straight collector of
+slant width `width`, tilted by `tilt`, with its lower (front) edge at
+`height` above the ground and rows `pitch` apart:
+
+    row j:  (j·pitch, height) → (j·pitch + width·cos(tilt), height + width·sin(tilt))
+
+Each face sees:
+    beam        DNI × cos(AOI), less the part shaded by the neighbouring row
+    sky         DHI × F_sky                 (isotropic)
+    ground      albedo × Σ F_ground(x) × E_ground(x)
+
+and the ground receives
+    E_ground(x) = (GHI − DHI) × (1 − shaded(x)) + DHI × F_ground_sky(x)
+
+where shaded(x) follows from the row shadows for the current sun
+position. The view factors F_sky, F_ground and F_ground_sky depend on
+the geometry only; they are found once by casting rays from points on
+the faces and the ground against the neighbouring rows and cached per
+geometry (see view_factors). Each time step then costs a few small
+array products, so annual hourly or minute data are cheap.
+
+Rows near the array edges see more sky and open ground than interior
+rows. Rows are grouped by how many neighbours (up to `window`) they
+have in front and behind; every group gets its own view factors and
+results are returned per row. Light reflected off other rows is ignored.
+
+BG is the ratio G_rear / G_front of the row-averaged irradiances, i.e.
+the page-1 input with G_rear = BG × G_front.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.cache import ResultCache, make_key
+
+
+class RowGeometry(NamedTuple):
+    tilt: float = 25.0        # degrees from horizontal
+    pitch: float = 6.0        # row-to-row distance (m)
+    height: float = 1.0       # clearance of the lower edge (m)
+    width: float = 2.3        # collector slant width (m)
+    azimuth: float = 180.0    # direction the front faces (degrees, 180 = south)
+    rows: int = 20            # rows in the array
+
+    @property
+    def gcr(self):
+        return self.width / self.pitch
+
+
+class ViewFactors(NamedTuple):
+    """Geometry-only lookup table, one entry per row group."""
+    x: np.ndarray             # (G,) ground segment centres, relative to the row's lower edge (m)
+    row_group: np.ndarray     # (rows,) group of each row
+    front_rows: np.ndarray    # (C,) neighbours in front modelled (window = array continues)
+    back_rows: np.ndarray     # (C,) neighbours behind modelled
+    ground_sky: np.ndarray    # (C, G) sky view factor of each ground segment
+    front_sky: np.ndarray     # (C,)
+    front_ground: np.ndarray  # (C, G)
+    front_open: np.ndarray    # (C,) view factor to open ground beyond the array
+    rear_sky: np.ndarray      # (C,)
+    rear_ground: np.ndarray   # (C, G)
+    rear_open: np.ndarray     # (C,)
+
+
+class RearIrradiance(NamedTuple):
+    G_front: np.ndarray       # (T, rows) front plane-of-array irradiance (W/m²)
+    G_rear: np.ndarray        # (T, rows) rear irradiance (W/m²)
+    BG: np.ndarray            # (T, rows) G_rear / G_front (0 where G_front ≤ 0)
+
+
+# Rays per face point / ground point, and face points along the slant
+ANGLES = 720
+FACE_POINTS = 16
+
+_lut_cache = ResultCache(maxsize=32)
+
+
+# ------------------ RAY CASTING ------------------
+def _cross(ax, az, bx, bz):
+    return ax * bz - az * bx
+
+
+def _cast(px, pz, normal, row_x0, geometry):
+    """
+    Cast ANGLES rays over the hemisphere around `normal` (radians) from
+    each point (px, pz), against rows with lower edges at row_x0.
+
+    Returns (weight, ground_x, sky): per-ray view-factor weights (rows
+    sum to 1), the x where each ray meets the ground (NaN if it does
+    not) and a mask of rays escaping to the sky.
+    """
+    phi = (np.arange(ANGLES) + 0.5) / ANGLES * np.pi - np.pi / 2
+    weight = 0.5 * np.cos(phi) * (np.pi / ANGLES)
+    weight = np.broadcast_to(weight / weight.sum(), (len(px), ANGLES))
+    dx, dz = np.cos(normal + phi), np.sin(normal + phi)
+
+    # Nearest row hit along each ray: P + t·d = A + u·(B − A), t > 0, 0 ≤ u ≤ 1
+    tilt = np.radians(geometry.tilt)
+    ex, ez = geometry.width * np.cos(tilt), geometry.width * np.sin(tilt)
+    ax = row_x0[None, None, :] - px[:, None, None]
+    az = geometry.height - pz[:, None, None]
+    denom = _cross(dx, dz, ex, ez)[None, :, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = _cross(ax, az, ex, ez) / denom
+        u = _cross(ax, az, dx[None, :, None], dz[None, :, None]) / denom
+    hit = (t > 1e-9) & (u >= 0) & (u <= 1)
+    t_row = np.where(hit, t, np.inf).min(axis=-1) if len(row_x0) else np.full((len(px), ANGLES), np.inf)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_ground = np.where(dz < 0, -pz[:, None] / dz, np.inf)
+    to_ground = t_ground < t_row
+    ground_x = np.where(to_ground, px[:, None] + t_ground * dx, np.nan)
+    sky = (dz >= 0) & np.isinf(t_row)
+    return weight, ground_x, sky
+
+
+def _bin_ground(weight, ground_x, geometry, front_rows, back_rows, window, resolution):
+    """
+    Sum ray weights per ground segment of the window.
+
+    Hits beyond the window fold back into the outermost pitch when the
+    array continues that way (the ground pattern repeats every pitch),
+    otherwise they land on open ground.
+    """
+    p = geometry.pitch
+    x0 = -window * p
+    size = (2 * window + 1) * resolution
+    x = ground_x[~np.isnan(ground_x)]
+    w = weight[~np.isnan(ground_x)]
+
+    before = x < x0
+    after = x >= x0 + size * p / resolution
+    open_ = (before & (front_rows < window)) | (after & (back_rows < window))
+    x = np.where(before & ~open_, x0 + np.mod(x - x0, p), x)
+    x = np.where(after & ~open_, x0 + (2 * window) * p + np.mod(x - x0, p), x)
+
+    idx = np.floor((x[~open_] - x0) / (p / resolution)).astype(int).clip(0, size - 1)
+    return np.bincount(idx, weights=w[~open_], minlength=size), float(w[open_].sum())
+
+
+def _compute_view_factors(geometry, window, resolution):
+    p, tilt = geometry.pitch, np.radians(geometry.tilt)
+    n = geometry.rows
+    idx = np.arange(n)
+    groups = np.stack([np.minimum(idx, window), np.minimum(n - 1 - idx, window)], axis=1)
+    classes, row_group = np.unique(groups, axis=0, return_inverse=True)
+
+    x = -window * p + (np.arange((2 * window + 1) * resolution) + 0.5) * p / resolution
+    s = (np.arange(FACE_POINTS) + 0.5) / FACE_POINTS * geometry.width
+    fx, fz = s * np.cos(tilt), geometry.height + s * np.sin(tilt)
+    off = 1e-6
+    front_normal = np.pi / 2 + tilt
+    rear_normal = tilt - np.pi / 2
+
+    out = {k: [] for k in ViewFactors._fields[4:]}
+    for front_rows, back_rows in classes:
+        others = np.array([k * p for k in range(-front_rows, back_rows + 1) if k != 0], dtype=float)
+        wide = np.arange(-front_rows - (window if front_rows == window else 0),
+                         back_rows + (window if back_rows == window else 0) + 1) * p
+
+        weight, _, sky = _cast(x, np.full_like(x, off), np.pi / 2, wide, geometry)
+        out["ground_sky"].append(np.where(sky, weight, 0.0).sum(axis=1))
+
+        for face, normal in (("front", front_normal), ("rear", rear_normal)):
+            px = fx + off * np.cos(normal)
+            pz = fz + off * np.sin(normal)
+            weight, ground_x, sky = _cast(px, pz, normal, others, geometry)
+            ground, open_ = _bin_ground(weight, ground_x, geometry, front_rows, back_rows,
+                                        window, resolution)
+            out[f"{face}_sky"].append(np.where(sky, weight, 0.0).sum() / FACE_POINTS)
+            out[f"{face}_ground"].append(ground / FACE_POINTS)
+            out[f"{face}_open"].append(open_ / FACE_POINTS)
+
+    return ViewFactors(
+        x=x,
+        row_group=row_group.ravel(),
+        front_rows=classes[:, 0],
+        back_rows=classes[:, 1],
+        **{k: np.array(v) for k, v in out.items()},
+    )
+
+
+def view_factors(geometry, window=5, resolution=40):
+    """
+    View-factor table for a geometry, cached per (geometry, window, resolution).
+
+    window     — neighbouring rows modelled on each side of a row
+    resolution — ground segments per pitch
+    """
+    geometry = RowGeometry(*geometry)
+    key = make_key("view_factors", tuple(geometry), window, resolution, ANGLES, FACE_POINTS)
+    return _lut_cache.get_or_compute(key, lambda: _compute_view_factors(geometry, window, resolution))
+
+
+# ------------------ PER-STEP IRRADIANCE ------------------
+def _shaded(x, shadow_start, shadow_width, pitch, first_row, last_row):
+    """Whether ground point x lies in the shadow of any row j in [first_row, last_row]."""
+    u = x - shadow_start
+    lo = np.maximum(np.ceil((u - shadow_width) / pitch), first_row)
+    hi = np.minimum(np.floor(u / pitch), last_row)
+    return lo <= hi
+
+
+def rear_irradiance(geometry, zenith, azimuth, dni, dhi, albedo=0.2,
+                    window=5, resolution=40, chunk_steps=2048):
+    """
+    Front and rear irradiance and BG per time step and row.
+
+    zenith, azimuth (degrees, azimuth clockwise from north), dni, dhi
+    (W/m²) and albedo are scalars or (T,) arrays. Time steps are
+    processed chunk_steps at a time to bound memory.
+    """
+    geometry = RowGeometry(*geometry)
+    vf = view_factors(geometry, window, resolution)
+    zenith, azimuth, dni, dhi, albedo = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (zenith, azimuth, dni, dhi, albedo))
+    )
+
+    p, L = geometry.pitch, geometry.width
+    tilt, face_az = np.radians(geometry.tilt), np.radians(geometry.azimuth)
+    big = np.iinfo(np.int32).max
+    first_row = np.where(vf.front_rows < window, -vf.front_rows, -big)[None, :, None]
+    last_row = np.where(vf.back_rows < window, vf.back_rows, big)[None, :, None]
+    has_front = (vf.front_rows > 0)[None, :]
+    has_back = (vf.back_rows > 0)[None, :]
+
+    G_front, G_rear = [], []
+    for start in range(0, len(zenith), chunk_steps):
+        sl = slice(start, start + chunk_steps)
+        Z, A = np.radians(zenith[sl]), np.radians(azimuth[sl])
+        up = np.cos(Z) > 0
+        beam_h = np.where(up, dni[sl] * np.cos(Z), 0.0)
+        ghi = beam_h + dhi[sl]
+
+        # Sun across the rows: component toward the front over vertical
+        toward_front = np.sin(Z) * np.cos(A - face_az)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k = np.where(up, -toward_front / np.cos(Z), 0.0)   # shadow shift dx per unit height
+        x1 = -geometry.height * k
+        x2 = L * np.cos(tilt) - (geometry.height + L * np.sin(tilt)) * k
+        shadow_start = np.minimum(x1, x2)[:, None, None]
+        shadow_width = np.abs(x2 - x1)
+
+        shaded = _shaded(vf.x[None, None, :], shadow_start, shadow_width[:, None, None], p,
+                         first_row, last_row)
+        E_ground = beam_h[:, None, None] * ~shaded + dhi[sl, None, None] * vf.ground_sky[None]
+
+        # Beam on each face, less the strip shaded by the neighbouring row
+        cos_front = np.where(up, toward_front * np.sin(tilt) + np.cos(Z) * np.cos(tilt), 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            row_shade = np.clip(1 - p / shadow_width, 0.0, 1.0)[:, None]
+        beam_front = dni[sl, None] * np.maximum(cos_front, 0)[:, None] * (1 - np.where(has_front, row_shade, 0))
+        beam_rear = dni[sl, None] * np.maximum(-cos_front, 0)[:, None] * (1 - np.where(has_back, row_shade, 0))
+
+        rho = albedo[sl, None]
+        for out, beam, sky, ground, open_ in (
+            (G_front, beam_front, vf.front_sky, vf.front_ground, vf.front_open),
+            (G_rear, beam_rear, vf.rear_sky, vf.rear_ground, vf.rear_open),
+        ):
+            reflected = rho * (np.einsum("tcg,cg->tc", E_ground, ground) + ghi[:, None] * open_)
+            out.append((beam + dhi[sl, None] * sky + reflected)[:, vf.row_group])
+
+    G_front = np.concatenate(G_front)
+    G_rear = np.concatenate(G_rear)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        BG = np.where(G_front > 0, G_rear / G_front, 0.0)
+    return RearIrradiance(G_front, G_rear, BG)
+
+
+def bifacial_gain(geometry, zenith, azimuth, dni, dhi, albedo=0.2, **options):
+    """Array-average BG for each time step: Σ G_rear / Σ G_front over all rows."""
+    r = rear_irradiance(geometry, zenith, azimuth, dni, dhi, albedo, **options)
+    front = r.G_front.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(front > 0, r.G_rear.sum(axis=1) / front, 0.0)
+
+
+# ------------------ SUN POSITION ------------------
+def solar_position(times, latitude, longitude):
+    """
+    Apparent solar zenith and azimuth (degrees) for UTC datetime64 times.
+
+    NOAA's low-precision formulas (about 0.01° in declination); enough
+    for irradiance transposition, no refraction correction.
+    """
+    times = np.asarray(times, dtype="datetime64[s]")
+    day = (times - np.datetime64("2000-01-01T12:00:00")) / np.timedelta64(1, "D")
+    hours = (times - times.astype("datetime64[D]")) / np.timedelta64(1, "h")
+
+    g = np.radians(357.529 + 0.98560028 * day)                 # mean anomaly
+    q = 280.459 + 0.98564736 * day                             # mean longitude
+    lam = np.radians(q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g))
+    eps = np.radians(23.439 - 0.00000036 * day)
+    decl = np.arcsin(np.sin(eps) * np.sin(lam))
+    ra = np.degrees(np.arctan2(np.cos(eps) * np.sin(lam), np.cos(lam)))
+    eot = 4 * (((q - ra + 180) % 360) - 180)                   # equation of time (minutes)
+
+    hour_angle = np.radians(15 * (hours + longitude / 15 + eot / 60 - 12))
+    lat = np.radians(latitude)
+    cos_z = np.sin(lat) * np.sin(decl) + np.cos(lat) * np.cos(decl) * np.cos(hour_angle)
+    zenith = np.arccos(np.clip(cos_z, -1, 1))
+    azimuth = np.arctan2(
+        np.sin(hour_angle),
+        np.cos(hour_angle) * np.sin(lat) - np.tan(decl) * np.cos(lat),
+    )
+    return np.degrees(zenith), (np.degrees(azimuth) + 180) % 360
@@ -0,0 +1,320 @@
+"""
+Sensitivity and uncertainty sweeps around an operating point.
+
+Any of PARAMETERS may be given an Uncertainty; the others stay at their
+nominal values. Every sweep evaluates model.compute_outputs on chunks of
+at most chunk_size samples, so memory is bounded by the chunk, not by
+the sample count, and 10^6–10^7 samples run in seconds:
+
+    monte_carlo   — P50/P90 (exceedance) percentiles, mean, spread, histogram
+    grid_sweep    — output on the full Cartesian product of given axis values
+    tornado       — one-at-a-time swings between each input's low and high case
+    sobol         — first-order and total Sobol indices (Saltelli/Jansen estimators)
+
+The operating point is the Computation Tool's single-point calculation,
+so the irradiance factor is front-only, Fg = G_front / 1000. BG has no
+effect on that Pmax and is therefore not a parameter: its tornado swing
+and Sobol share would be zero.
+
+Samples are drawn in fixed blocks of RNG_BLOCK, each from its own
+generator spawned from one SeedSequence, and chunks are whole numbers
+of blocks. The draws therefore depend on the seed only: any chunk_size
+gives the same samples, and results equal up to floating-point
+summation order.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.model import ModuleSTC, TempCoeffs, compute_outputs
+
+PARAMETERS = (
+    "G_front", "Tcell", "dirt", "years", "Fmm", "Fshade",
+    "alphasc", "betaoc", "alphamp", "betamp", "gamma",
+)
+
+# Physical range each sampled value is clipped to
+LIMITS = {
+    "G_front": (0.0, np.inf),
+    "dirt": (0.0, 100.0),
+    "years": (0.0, np.inf),
+    "Fmm": (0.0, 1.0),
+    "Fshade": (0.0, 1.0),
+}
+
+# Exceedance levels reported by monte_carlo: P90 is exceeded with 90% probability
+EXCEEDANCE = (50, 75, 90, 95, 99)
+
+CHUNK_SIZE = 1 << 18
+RNG_BLOCK = 1 << 12
+HISTOGRAM_BINS = 1 << 14
+
+
+class Uncertainty(NamedTuple):
+    """
+    kind="uniform": values uniform on [a, b].
+    kind="normal":  mean a, standard deviation b.
+    """
+    kind: str
+    a: float
+    b: float
+
+    @property
+    def low_high(self):
+        """Low and high case for tornado and grid sweeps: the bounds, or P10/P90 of a normal."""
+        if self.kind == "uniform":
+            return self.a, self.b
+        return self.a - 1.2816 * self.b, self.a + 1.2816 * self.b
+
+    def sample(self, rng, n):
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b, n)
+        if self.kind == "normal":
+            return rng.normal(self.a, self.b, n)
+        raise ValueError(f"Unknown distribution {self.kind!r}")
+
+
+def uniform(low, high):
+    return Uncertainty("uniform", low, high)
+
+
+def normal(mean, std):
+    return Uncertainty("normal", mean, std)
+
+
+class SweepStats(NamedTuple):
+    output: str
+    samples: int
+    nominal: float            # output at the nominal inputs
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: dict         # "P50", "P90", ... → value exceeded with that probability
+    histogram: tuple          # (counts, edges)
+
+
+class GridSweep(NamedTuple):
+    output: str
+    names: tuple              # swept parameters, one per axis
+    axes: tuple               # value arrays, one per axis
+    values: np.ndarray        # output, shape (len(axes[0]), len(axes[1]), ...)
+
+
+class Tornado(NamedTuple):
+    output: str
+    nominal: float
+    names: tuple              # sorted by swing, largest first
+    low_inputs: np.ndarray
+    high_inputs: np.ndarray
+    low: np.ndarray           # output at each input's low case
+    high: np.ndarray
+
+    @property
+    def swing(self):
+        return np.abs(self.high - self.low)
+
+
+class SobolIndices(NamedTuple):
+    output: str
+    names: tuple
+    first: np.ndarray         # S_i: share of variance from x_i alone
+    total: np.ndarray         # S_Ti: share including all interactions of x_i
+    variance: float
+    samples: int              # model evaluations, base × (k + 2)
+
+
+def _check(nominal, uncertain):
+    unknown = [n for n in (*nominal, *uncertain) if n not in PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown parameter(s): {', '.join(unknown)}")
+    missing = [n for n in PARAMETERS if n not in nominal]
+    if missing:
+        raise ValueError(f"Nominal value missing for: {', '.join(missing)}")
+
+
+def _evaluate(nominal, values, stc, output):
+    """Output for nominal inputs overridden by the sampled arrays in `values`."""
+    v = {**nominal, **{n: np.clip(x, *LIMITS[n]) if n in LIMITS else x for n, x in values.items()}}
+    coeffs = TempCoeffs(v["alphasc"], v["betaoc"], v["alphamp"], v["betamp"], v["gamma"])
+    out = compute_outputs(v["G_front"], v["Tcell"], v["dirt"], v["years"], v["Fmm"], v["Fshade"],
+                          stc, coeffs)
+    return np.asarray(getattr(out, output), dtype=float)
+
+
+def _chunks(total, chunk_size):
+    for start in range(0, total, chunk_size):
+        yield min(chunk_size, total - start)
+
+
+def _sample_chunks(seed, total, chunk_size, draw):
+    """
+    Yield (n, samples) for chunks of whole RNG blocks, about chunk_size samples each.
+
+    draw(rng, n) returns a dict of n-sample arrays for one block; the
+    blocks of a chunk are concatenated key by key.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(-(-total // RNG_BLOCK))
+    per_chunk = max(1, chunk_size // RNG_BLOCK)
+    for first in range(0, len(seeds), per_chunk):
+        blocks = [draw(np.random.default_rng(seeds[b]), min(RNG_BLOCK, total - b * RNG_BLOCK))
+                  for b in range(first, min(first + per_chunk, len(seeds)))]
+        n = min(per_chunk * RNG_BLOCK, total - first * RNG_BLOCK)
+        yield n, {k: np.concatenate([block[k] for block in blocks]) for k in blocks[0]}
+
+
+def nominal_output(nominal, stc=ModuleSTC(), output="Pmax"):
+    _check(nominal, {})
+    return float(_evaluate(nominal, {}, stc, output))
+
+
+# ------------------ MONTE CARLO ------------------
+def monte_carlo(nominal, uncertain, samples=1_000_000, seed=0, stc=ModuleSTC(),
+                output="Pmax", chunk_size=CHUNK_SIZE, bins=HISTOGRAM_BINS):
+    """
+    Output distribution for random draws of the uncertain inputs.
+
+    Two passes over the same reproducible chunks: the first finds the
+    range, the second fills a `bins`-bin histogram from which the
+    percentiles are read (resolution (max − min)/bins), so memory never
+    depends on `samples`.
+    """
+    _check(nominal, uncertain)
+
+    def draw(rng, n):
+        return {k: u.sample(rng, n) for k, u in uncertain.items()}
+
+    def chunks():
+        for n, values in _sample_chunks(seed, samples, chunk_size, draw):
+            yield np.broadcast_to(_evaluate(nominal, values, stc, output), (n,))
+
+    lo, hi, total, total_sq = np.inf, -np.inf, 0.0, 0.0
+    f0 = nominal_output(nominal, stc, output)
+    for y in chunks():
+        lo, hi = min(lo, y.min()), max(hi, y.max())
+        d = y - f0          # centred sums keep the variance accurate
+        total += d.sum()
+        total_sq += (d * d).sum()
+
+    edges = np.linspace(lo, hi if hi > lo else lo + 1.0, bins + 1)
+    counts = np.zeros(bins, dtype=np.int64)
+    for y in chunks():
+        counts += np.histogram(y, edges)[0]
+
+    cdf = np.cumsum(counts) / samples
+    percentiles = {}
+    for p in EXCEEDANCE:
+        # exceeded with p% probability = (100 − p)th percentile; interpolate within the bin
+        q = 1 - p / 100
+        i = min(int(np.searchsorted(cdf, q)), bins - 1)
+        below = cdf[i - 1] if i else 0.0
+        frac = (q - below) / (cdf[i] - below) if cdf[i] > below else 0.0
+        percentiles[f"P{p}"] = float(edges[i] + frac * (edges[i + 1] - edges[i]))
+
+    mean = total / samples
+    return SweepStats(
+        output=output,
+        samples=samples,
+        nominal=f0,
+        mean=float(f0 + mean),
+        std=float(np.sqrt(max(total_sq / samples - mean * mean, 0.0))),
+        min=float(lo),
+        max=float(hi),
+        percentiles=percentiles,
+        histogram=(counts, edges),
+    )
+
+
+# ------------------ GRID SWEEP ------------------
+def grid_sweep(nominal, axes, stc=ModuleSTC(), output="Pmax", chunk_size=CHUNK_SIZE):
+    """
+    Output on the Cartesian product of axis values.
+
+    axes maps parameter name → 1-D values; the result has one dimension
+    per axis, in the dict's order. Points are evaluated chunk_size at a
+    time from flat indices, so only the result array scales with the grid.
+    """
+    _check(nominal, axes)
+    names = tuple(axes)
+    values = tuple(np.asarray(axes[n], dtype=float) for n in names)
+    shape = tuple(len(v) for v in values)
+    out = np.empty(int(np.prod(shape)))
+
+    start = 0
+    for n in _chunks(out.size, chunk_size):
+        idx = np.unravel_index(np.arange(start, start + n), shape)
+        point = {name: v[i] for name, v, i in zip(names, values, idx)}
+        out[start:start + n] = np.broadcast_to(_evaluate(nominal, point, stc, output), (n,))
+        start += n
+    return GridSweep(output, names, values, out.reshape(shape))
+
+
+# ------------------ TORNADO ------------------
+def tornado(nominal, uncertain, stc=ModuleSTC(), output="Pmax"):
+    """One-at-a-time swings between each uncertain input's low and high case."""
+    _check(nominal, uncertain)
+    names = tuple(uncertain)
+    lo_in = np.array([uncertain[n].low_high[0] for n in names])
+    hi_in = np.array([uncertain[n].low_high[1] for n in names])
+    low = np.array([float(_evaluate(nominal, {n: x}, stc, output)) for n, x in zip(names, lo_in)])
+    high = np.array([float(_evaluate(nominal, {n: x}, stc, output)) for n, x in zip(names, hi_in)])
+
+    order = np.argsort(-np.abs(high - low), kind="stable")
+    return Tornado(output, nominal_output(nominal, stc, output), tuple(names[i] for i in order),
+                   lo_in[order], hi_in[order], low[order], high[order])
+
+
+# ------------------ SOBOL ------------------
+def sobol(nominal, uncertain, base_samples=100_000, seed=0, stc=ModuleSTC(),
+          output="Pmax", chunk_size=CHUNK_SIZE):
+    """
+    First-order (Saltelli 2010) and total (Jansen 1999) Sobol indices.
+
+    Uses base_samples × (k + 2) model evaluations for k uncertain
+    inputs: matrices A and B, and for each input A with that column
+    taken from B. Only running sums are kept across chunks.
+    """
+    _check(nominal, uncertain)
+    names = tuple(uncertain)
+    k = len(names)
+    f0 = nominal_output(nominal, stc, output)
+
+    sums = {"n": 0, "f": 0.0, "f2": 0.0}
+    first = np.zeros(k)
+    total = np.zeros(k)
+
+    def draw(rng, n):
+        A = {("A", name): uncertain[name].sample(rng, n) for name in names}
+        B = {("B", name): uncertain[name].sample(rng, n) for name in names}
+        return {**A, **B}
+
+    for n, samples in _sample_chunks(seed, base_samples, chunk_size, draw):
+        A = {name: samples["A", name] for name in names}
+        B = {name: samples["B", name] for name in names}
+
+        def f(point):
+            return np.broadcast_to(_evaluate(nominal, point, stc, output), (n,)) - f0
+
+        fA, fB = f(A), f(B)
+        for i, name in enumerate(names):
+            fAB = f({**A, name: B[name]})
+            first[i] += (fB * (fAB - fA)).sum()
+            total[i] += ((fA - fAB) ** 2).sum() / 2
+
+        sums["n"] += 2 * n
+        sums["f"] += fA.sum() + fB.sum()
+        sums["f2"] += (fA * fA).sum() + (fB * fB).sum()
+
+    mean = sums["f"] / sums["n"]
+    variance = sums["f2"] / sums["n"] - mean * mean
+    if variance <= 0:
+        zeros = np.zeros(k)
+        return SobolIndices(output, names, zeros, zeros, 0.0, base_samples * (k + 2))
+    return SobolIndices(
+        output, names,
+        first / base_samples / variance,
+        total / base_samples / variance,
+        float(variance),
+        base_samples * (k + 2),
+    )
@@ -0,0 +1,256 @@
+"""
+Typed results passed between the Streamlit pages.
+
+The Computation Tool stores one ComputeResult and the ABC page one
+AbcResult in session state; later pages read them with a single
+lookup and never recompute formulas: AbcResult also builds its
+ResultView — the derived metrics, table and chart data — once, when
+it is created. Both carry RESULT_VERSION, so a
+session holding objects from an older layout is treated as empty and
+the user is asked to re-run instead of hitting missing fields.
+
+abc_result_from_run turns the raw return value of any solver — run in
+the page or in a background job (JOB_KEY holds the attached job id) —
+into an AbcResult.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from bifacial_pv.charts import convergence_chart
+from bifacial_pv.model import (
+    ModuleSTC, Outputs, TempCoeffs, TempFactors,
+    cleaning_factor, electrical_outputs, irradiance_factor, temperature_factors,
+)
+from bifacial_pv.space import FACTORS
+
+RESULT_VERSION = 5
+
+COMPUTE_KEY = "compute_result"
+ABC_KEY = "abc_result"
+JOB_KEY = "abc_job"
+
+
+@dataclass(frozen=True, slots=True)
+class ComputeResult:
+    """Operating point, correction factors and outputs from the Computation Tool."""
+    stc: ModuleSTC
+    coeffs: TempCoeffs
+    G_front: float
+    BG: float
+    Tcell: float
+    dirt: float
+    years: int
+    Fmm: float
+    Fshade: float
+    Fg: float               # front-only irradiance factor
+    Fclean: float
+    Fage: float
+    Ftemp: TempFactors
+    outputs: Outputs
+    version: int = field(default=RESULT_VERSION)
+
+
+@dataclass(frozen=True, slots=True)
+class ResultView:
+    """Display-ready data derived from an AbcResult; chart dicts feed st.*_chart directly."""
+    G_total: float
+    abs_error: float        # |best_pmax − Pmax_meas|, W
+    pct_error: float
+    orig_error: float       # same for the Computation Tool's Pmax
+    orig_pct: float
+    table: dict             # Parameter / Measured / Calculated / Error (%) columns
+    pmax_chart: dict        # Case / Pmax (W): measured, before and after ABC
+    convergence: dict       # Cycle / Error, downsampled for a log-scale chart
+
+
+@dataclass(frozen=True, slots=True)
+class AbcResult:
+    """
+    Best fit from the ABC page and everything the Results page shows.
+
+    G_front, Tcell, Fage and Ftemp are the operating point the fit used:
+    fitted where they are among the free (searched) variables, otherwise
+    copied from the ComputeResult or pinned in a custom search space.
+    outputs are the five outputs at the fit.
+    """
+    compute: ComputeResult
+    solver: str
+    objective: str
+    seed: int
+    best_sol: tuple         # (BG, dirt, Fmm, Fshade)
+    best_pmax: float
+    error_history: np.ndarray
+    stop_reason: str
+    stop_cycle: int
+    measured: Outputs       # 0 = not measured
+    G_front: float
+    Tcell: float
+    Fage: float
+    Ftemp: TempFactors
+    Fg_eff: float
+    Fclean: float
+    outputs: Outputs
+    fitted_operating_point: bool = False
+    fitted_age: bool = False
+    free: tuple = FACTORS   # variables the fit searched, in space.VARIABLES order
+    weighted: bool = False  # weighted relative error over all outputs, else |Pmax error| in W
+    restart_solutions: list = None
+    restart_errors: list = None
+    profile: dict = None
+    max_cycles: int = None
+    job_id: str = None
+    view: ResultView = None
+    version: int = field(default=RESULT_VERSION)
+
+    def __post_init__(self):
+        if self.view is None:
+            object.__setattr__(self, "view", build_view(self))
+
+
+def fit_summary(result):
+    """One sentence naming the solver, the variables it searched and what it minimised."""
+    free = result.free
+    if len(free) == 1:
+        names = free[0]
+    elif len(free) == 2:
+        names = f"{free[0]} and {free[1]}"
+    else:
+        names = f"{', '.join(free[:-1])}, and {free[-1]}"
+    objective = ("the weighted relative error over all measured outputs" if result.weighted
+                 else "|Pmax_calc − Pmax_measured|")
+    return f"{result.solver} tuned {names} to minimise {objective}."
+
+
+def _pct(error, reference):
+    return error / reference * 100 if reference != 0 else 0.0
+
+
+def build_view(result):
+    """Derived metrics and chart data for an AbcResult."""
+    Pmax_meas  = result.measured.Pmax
+    Pmax_orig  = result.compute.outputs.Pmax
+    abs_error  = abs(result.best_pmax - Pmax_meas)
+    orig_error = abs(Pmax_orig - Pmax_meas)
+
+    params = ["Pmax (W)", "Isc (A)", "Imp (A)", "Voc (V)", "Vmp (V)"]
+    fields = ["Pmax", "Isc", "Imp", "Voc", "Vmp"]
+    meas   = [float(getattr(result.measured, f)) for f in fields]
+    calc   = [result.best_pmax] + [float(getattr(result.outputs, f)) for f in fields[1:]]
+
+    return ResultView(
+        G_total=result.G_front * (1 + result.best_sol[0]),
+        abs_error=abs_error,
+        pct_error=_pct(abs_error, Pmax_meas),
+        orig_error=orig_error,
+        orig_pct=_pct(orig_error, Pmax_meas),
+        table={
+            "Parameter":  params,
+            "Measured":   meas,
+            "Calculated": calc,
+            "Error (%)":  [_pct(abs(c - m), m) for m, c in zip(meas, calc)],
+        },
+        pmax_chart={
+            "Case":     ["Measured", "Before ABC", "After ABC"],
+            "Pmax (W)": [Pmax_meas, Pmax_orig, result.best_pmax],
+        },
+        convergence=convergence_chart(result.error_history),
+    )
+
+
+def abc_result_from_run(compute, kind, raw, *, solver, objective, seed, measured,
+                        max_cycles=None, fit_age=False, free=None, weighted=None, profile=None,
+                        job_id=None):
+    """
+    AbcResult from a solver's raw return value.
+
+    kind names the solver call that produced raw:
+        "analytic" — AnalyticFit from solve_closest
+        "single"   — abc_optimize tuple
+        "ensemble" — EnsembleResult from abc_ensemble
+        "multi"    — MultiFit from fit_multi_batch (one problem per restart);
+                     fit_age says whether Fage was the 7th variable
+        "space"    — MultiFit from space.fit_space_batch (one problem per
+                     restart); free names the searched variables and
+                     weighted whether the objective was the weighted one
+    """
+    Tcell, G_front, Fage, Ftemp = compute.Tcell, compute.Fg * 1000, compute.Fage, compute.Ftemp
+    restart_solutions = restart_errors = None
+    if kind == "multi":
+        free = FACTORS + ("Tcell", "G_front") + (("Fage",) if fit_age else ())
+        weighted = True
+    elif kind != "space":
+        free, weighted = FACTORS, False
+
+    if kind == "analytic":
+        best_sol, history = raw.solution[0], raw.error[:1]
+        stop = ("analytic", 0)
+    elif kind == "single":
+        best_sol, _, history, stop = raw
+    elif kind == "ensemble":
+        best_sol, history = raw.best_sol, raw.error_history
+        stop = raw.stops[int(np.argmin(raw.errors))]
+        restart_solutions, restart_errors = raw.solutions, raw.errors
+    elif kind in ("multi", "space"):
+        # Both carry vectors in space.VARIABLES order; a space run's are always full
+        best = int(np.argmin(raw.error))
+        fitted = raw.best_sol[best]
+        best_sol, history = fitted[:4], raw.error_history[best]
+        stop = (raw.stop.reason[best], raw.stop.cycle[best])
+        Tcell, G_front = float(fitted[4]), float(fitted[5])
+        Fage  = float(fitted[6]) if len(fitted) > 6 else Fage
+        Ftemp = TempFactors(*(float(f) for f in temperature_factors(Tcell, compute.coeffs)))
+        if len(raw.error) > 1:
+            restart_solutions, restart_errors = raw.best_sol, raw.error
+    else:
+        raise ValueError(f"Unknown run kind: {kind!r}")
+
+    best_sol = tuple(float(x) for x in best_sol)
+    BG, dirt, Fmm, Fshade = best_sol
+    Fg_eff  = float(irradiance_factor(G_front, BG))
+    Fclean  = float(cleaning_factor(dirt))
+    outputs = Outputs(*(float(o) for o in electrical_outputs(
+        compute.stc, Ftemp, Fg_eff, Fclean, Fshade, Fmm, Fage,
+    )))
+
+    return AbcResult(
+        compute, solver, objective, seed, best_sol, outputs.Pmax,
+        np.asarray(history, dtype=float), str(stop[0]), int(stop[1]), measured,
+        G_front, Tcell, Fage, Ftemp, Fg_eff, Fclean, outputs,
+        # Also set when a custom search space pinned them away from the ComputeResult
+        fitted_operating_point=bool({"Tcell", "G_front"} & set(free))
+        or (Tcell, G_front) != (compute.Tcell, compute.Fg * 1000),
+        fitted_age="Fage" in free,
+        free=tuple(free),
+        weighted=bool(weighted),
+        # Restart runs only (None for a single colony)
+        restart_solutions=np.asarray(restart_solutions).tolist() if restart_solutions is not None else None,
+        restart_errors=np.asarray(restart_errors).tolist() if restart_errors is not None else None,
+        profile=profile,
+        max_cycles=max_cycles,
+        job_id=job_id,
+    )
+
+
+def abc_result_from_job(manager, job_id):
+    """
+    AbcResult of a finished background job, or None if it is not done.
+
+    The job's context must be {"kind": ..., "compute": ComputeResult,
+    "options": abc_result_from_run keywords}, as the ABC page submits it.
+    """
+    info = manager.poll(job_id)
+    if info is None or info.status != "done":
+        return None
+    context = manager.context(job_id)
+    return abc_result_from_run(context["compute"], context["kind"], manager.result(job_id),
+                               job_id=job_id, **context["options"])
+
+
+def get_result(state, key, cls):
+    """state[key] if it is a current-version cls instance, else None."""
+    result = state.get(key)
+    if isinstance(result, cls) and result.version == RESULT_VERSION:
+        return result
+    return None
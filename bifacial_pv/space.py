@@ -0,0 +1,179 @@
+"""
+Declarative search space for the fits.
+
+Every fit works on the same seven model variables, in the order
+multi.outputs_at reads them:
+
+    BG, dirt, Fmm, Fshade, Tcell, G_front, Fage
+
+A SearchSpace says which of them are searched — each with its own
+bounds, e.g. tightened from site knowledge — and pins every other one to
+a value (a user's pin or the Computation Tool's operating point).
+Optimizers see only the free columns. columns() hands pinned variables
+to the model as scalars, so the work per candidate scales with the
+number of free variables, not with a fixed vector length:
+
+    space = search_space(nominal, free=("BG", "dirt", "Tcell"),
+                         bounds={"dirt": (2.0, 8.0)}, pinned={"Fmm": 0.98})
+
+SearchSpace is a plain tuple of tuples, so it is hashable, picklable
+and usable in cache keys.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.colony import BOUNDS, StopInfo
+from bifacial_pv.model import (
+    ModuleSTC, TempCoeffs,
+    cleaning_factor, compute_pmax, electrical_outputs, irradiance_factor, temperature_factors,
+)
+from bifacial_pv.multi import AGE_BOUNDS, MULTI_BOUNDS, MultiFit, measured_matrix, weighted_error
+from bifacial_pv.optimizers import minimize_batch
+
+VARIABLES = ("BG", "dirt", "Fmm", "Fshade", "Tcell", "G_front", "Fage")
+FACTORS = VARIABLES[:4]
+
+DEFAULT_BOUNDS = dict(zip(VARIABLES, [tuple(map(float, b)) for b in MULTI_BOUNDS] + [AGE_BOUNDS]))
+
+
+class SearchSpace(NamedTuple):
+    free: tuple               # searched variables, in VARIABLES order
+    bounds: tuple             # (low, high) of each free variable
+    values: tuple             # value of every variable in VARIABLES order (free entries unused)
+
+    @property
+    def dim(self):
+        return len(self.free)
+
+    @property
+    def box(self):
+        """(dim, 2) bounds array for the optimizers."""
+        return np.array(self.bounds, dtype=float).reshape(-1, 2)
+
+    def columns(self, X):
+        """Variable name → values for candidates X (..., dim): column views if free, else scalars."""
+        X = np.asarray(X, dtype=float)
+        cols = dict(zip(VARIABLES, self.values))
+        for k, name in enumerate(self.free):
+            cols[name] = X[..., k]
+        return cols
+
+    def expand(self, X):
+        """Full (..., 7) vectors in VARIABLES order."""
+        cols = self.columns(X)
+        shape = np.shape(X)[:-1]
+        return np.stack([np.broadcast_to(cols[n], shape) for n in VARIABLES], axis=-1)
+
+
+def search_space(nominal, free=FACTORS, bounds=None, pinned=None):
+    """
+    Build a SearchSpace.
+
+    nominal — mapping of variable → value for every variable that is
+              neither free nor pinned (e.g. the operating point)
+    free    — variables to search; pinned ones are removed from it
+    bounds  — variable → (low, high) overriding DEFAULT_BOUNDS
+    pinned  — variable → fixed value
+    """
+    bounds, pinned = dict(bounds or {}), dict(pinned or {})
+    unknown = [n for n in (*free, *bounds, *pinned) if n not in VARIABLES]
+    if unknown:
+        raise ValueError(f"Unknown variable(s): {', '.join(unknown)}")
+
+    free = tuple(n for n in VARIABLES if n in free and n not in pinned)
+    if not free:
+        raise ValueError("At least one variable must be free")
+
+    box = []
+    for name in free:
+        lo, hi = (float(b) for b in bounds.get(name, DEFAULT_BOUNDS[name]))
+        if not lo < hi:
+            raise ValueError(f"Bounds of {name} must satisfy low < high, got ({lo}, {hi})")
+        box.append((lo, hi))
+
+    values = []
+    for name in VARIABLES:
+        if name in pinned:
+            values.append(float(pinned[name]))
+        elif name in free:
+            values.append(sum(box[free.index(name)]) / 2)
+        elif name in nominal and nominal[name] is not None:
+            values.append(float(nominal[name]))
+        else:
+            raise ValueError(f"{name} is neither free nor pinned and has no nominal value")
+    return SearchSpace(free, tuple(box), tuple(values))
+
+
+def default_space(nominal, multi=False, fit_age=False):
+    """The space the fixed-layout fits search: the four factors, plus Tcell and G_front (and Fage) for multi."""
+    free = FACTORS + (("Tcell", "G_front") if multi else ()) + (("Fage",) if multi and fit_age else ())
+    bounds = dict(zip(FACTORS, map(tuple, BOUNDS)))
+    return search_space(nominal, free, bounds)
+
+
+def _outputs(cols, stc, coeffs):
+    return electrical_outputs(
+        stc,
+        temperature_factors(cols["Tcell"], coeffs),
+        irradiance_factor(cols["G_front"], cols["BG"]),
+        cleaning_factor(cols["dirt"]),
+        cols["Fshade"],
+        cols["Fmm"],
+        cols["Fage"],
+    )
+
+
+def space_objective(space, measured, stc=ModuleSTC(), coeffs=TempCoeffs(), weights=None):
+    """
+    Batched objective over the free variables of `space` for P problems.
+
+    weights=None: |Pmax − Pmax_meas| in W, with measured a scalar or
+    (P,) Pmax. Otherwise the weighted mean relative error over measured
+    Outputs, as in multi.multi_objective.
+
+    Returns (objective(X, p), P, rel_scale), rel_scale being what
+    rel_tol is relative to (Pmax_meas, or 1 for the relative error).
+    """
+    if weights is None:
+        Pmax_meas = np.atleast_1d(np.asarray(measured, dtype=float))
+
+        def objective(X, p):
+            cols = space.columns(X)
+            pmax = compute_pmax(stc.Pmax, temperature_factors(cols["Tcell"], coeffs).Pmp,
+                                irradiance_factor(cols["G_front"], cols["BG"]), cleaning_factor(cols["dirt"]),
+                                cols["Fshade"], cols["Fmm"], cols["Fage"])
+            return np.abs(pmax - Pmax_meas[p])
+
+        return objective, len(Pmax_meas), Pmax_meas
+
+    meas, w = measured_matrix(measured, weights)
+
+    def objective(X, p):
+        return weighted_error(_outputs(space.columns(X), stc, coeffs), meas[p], w[p])
+
+    return objective, len(meas), 1.0
+
+
+def fit_space_batch(space, measured, max_cycles, stc=ModuleSTC(), coeffs=TempCoeffs(), weights=None,
+                    method="ABC", options=None, rng=None, stats=None, progress=None, **stopping):
+    """
+    Fit P problems over `space` with any optimizers.METHODS backend.
+
+    measured and weights are as for space_objective; options are the
+    backend's hyperparameters (e.g. num_bees and limit for ABC).
+
+    Returns a MultiFit whose best_sol holds full (P, 7) vectors in
+    VARIABLES order, pinned values included, and whose error is in the
+    objective's units.
+    """
+    objective, num_problems, rel_scale = space_objective(space, measured, stc, coeffs, weights)
+    best, best_fit, error_history, stop = minimize_batch(
+        method, objective, space.box, num_problems, max_cycles, rng, options, stats, progress,
+        rel_scale=rel_scale, **stopping
+    )
+    full = space.expand(best)
+    outputs = _outputs(space.columns(best), stc, coeffs)
+    outputs = type(outputs)(*(np.broadcast_to(o, (num_problems,)).astype(float) for o in outputs))
+    return MultiFit(full, outputs, best_fit, error_history, StopInfo(*stop))
@@ -0,0 +1,163 @@
+"""
+Incremental warm-start fitting for streaming measurements.
+
+A monitoring pipeline delivers a new measured Pmax per string every few
+minutes, and consecutive fits of a string are nearly identical. Rather
+than start every fit from a uniformly random colony, IncrementalFitter
+keeps each string's last best solution and seeds the next colony around
+it:
+
+    bee 0           — the previous best solution, unchanged
+    other bees      — previous best + N(0, radius × bound width), clipped
+
+The radius follows how far the previous best now misses the new
+measurement (RADIUS_GAIN × its relative error), so the search stays
+tight while conditions drift slowly and widens after a jump such as a
+cleaning. Strings whose previous best still meets the tolerance are not
+refitted at all (0 cycles); the rest usually meet it within a few
+cycles. Scouts still restart uniformly over the whole box, so a warm
+colony can leave a stale optimum. Strings that have never been fitted
+get a cold, uniform colony. Each update() call fits every remaining
+string it names in one stacked colony.
+
+Only a compact state is kept per string — float32 best solution and
+error plus a uint32 update count, 24 bytes — so 10k strings take under
+250 kB, against roughly 1.5 kB per string for a full 30-bee colony.
+save() and load() round-trip the state through one .npz file.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.colony import BOUNDS, DIM, HI, LO, abc_minimize_batch, compute_pmax, pmax_objective
+
+# Warm-start spread as a fraction of each bound's width:
+# RADIUS_GAIN × relative error of the previous best, clipped to [MIN_RADIUS, MAX_RADIUS]
+RADIUS_GAIN = 3.0
+MIN_RADIUS  = 0.002
+MAX_RADIUS  = 0.25
+
+
+class StreamFit(NamedTuple):
+    best_sol: np.ndarray      # (n, 4) [BG, dirt, Fmm, Fshade] per updated string
+    best_pmax: np.ndarray     # (n,) Pmax at best_sol
+    error: np.ndarray         # (n,) |best_pmax − Pmax_meas|
+    cycles: np.ndarray        # (n,) cycles run before stopping; 0 = previous best kept
+    warm: np.ndarray          # (n,) True where the fit started from the previous solution
+
+
+class IncrementalFitter:
+    """
+    Per-string warm-start ABC fitter.
+
+    num_bees, limit and max_cycles are as for abc_optimize_batch;
+    stopping takes its early-stopping keywords and defaults to a
+    relative tolerance of 1e-4 and a 10-cycle stall window, which is
+    what lets warm strings finish early. seed makes a sequence of
+    updates reproducible.
+    """
+
+    def __init__(self, num_strings, num_bees=30, limit=5, max_cycles=100, seed=None, **stopping):
+        self.num_bees = num_bees
+        self.limit = limit
+        self.max_cycles = max_cycles
+        self.stopping = {"rel_tol": 1e-4, "stall_cycles": 10, **stopping}
+        self.rng = np.random.default_rng(seed)
+
+        self.best_sol = np.zeros((num_strings, DIM), dtype=np.float32)
+        self.error    = np.full(num_strings, np.inf, dtype=np.float32)
+        self.updates  = np.zeros(num_strings, dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.updates)
+
+    @property
+    def nbytes(self):
+        return self.best_sol.nbytes + self.error.nbytes + self.updates.nbytes
+
+    def _tolerance(self, Pmax_meas):
+        tol = np.zeros_like(Pmax_meas)
+        if self.stopping.get("abs_tol") is not None:
+            tol = np.maximum(tol, self.stopping["abs_tol"])
+        if self.stopping.get("rel_tol") is not None:
+            tol = np.maximum(tol, self.stopping["rel_tol"] * Pmax_meas)
+        return tol
+
+    def _colony(self, centre, radius, warm):
+        colony = self.rng.uniform(LO, HI, size=(len(warm), self.num_bees, DIM))
+        if warm.any():
+            centre = centre[warm]
+            spread = radius[warm, None, None] * (HI - LO)
+            noise  = self.rng.normal(size=(len(centre), self.num_bees - 1, DIM))
+            colony[warm, 0] = centre
+            colony[warm, 1:] = np.clip(centre[:, None, :] + noise * spread, LO, HI)
+        return colony
+
+    def update(self, strings, Pmax_meas, Pmax_stc, Ftemp_P, Fg, Fage=1.0, stats=None):
+        """
+        Refit the given strings to their newest measurements.
+
+        strings are distinct indices into the fitter; Pmax_meas and the
+        fixed factors are scalars or arrays broadcasting to len(strings),
+        as for abc_optimize_batch. Returns a StreamFit in the order of
+        strings and updates their stored state.
+        """
+        strings = np.atleast_1d(np.asarray(strings, dtype=np.int64))
+        if len(np.unique(strings)) != len(strings):
+            raise ValueError("Each string can be updated at most once per call")
+        if len(strings) and (strings.min() < 0 or strings.max() >= len(self)):
+            raise ValueError(f"String indices must lie in [0, {len(self)})")
+
+        Pmax_stc, Ftemp_P, Fg, Fage = (np.asarray(a, dtype=float) for a in (Pmax_stc, Ftemp_P, Fg, Fage))
+        objective, Pmax_meas = pmax_objective(Pmax_stc, Ftemp_P, Fg, Fage,
+                                              np.broadcast_to(Pmax_meas, strings.shape))
+        n = len(strings)
+        warm = self.updates[strings] > 0
+
+        # How well the previous best still fits; within tolerance it is kept as is
+        best_sol = self.best_sol[strings].astype(float)
+        best_fit = np.full(n, np.inf)
+        if warm.any():
+            best_fit[warm] = objective(best_sol[warm], np.flatnonzero(warm))
+        refit = ~(best_fit <= self._tolerance(Pmax_meas))
+        cycles = np.zeros(n, dtype=np.int64)
+
+        if refit.any():
+            rows = np.flatnonzero(refit)
+            radius = np.clip(RADIUS_GAIN * best_fit[rows] / Pmax_meas[rows], MIN_RADIUS, MAX_RADIUS)
+
+            def sub_objective(X, p):
+                return objective(X, rows[p])
+
+            best_sol[rows], best_fit[rows], _, stop = abc_minimize_batch(
+                sub_objective, BOUNDS, len(rows), self.num_bees, self.max_cycles, self.limit,
+                self.rng, rel_scale=Pmax_meas[rows], stats=stats,
+                init=self._colony(best_sol[rows], radius, warm[rows]), **self.stopping
+            )
+            cycles[rows] = stop.cycle
+
+        self.best_sol[strings] = best_sol
+        self.error[strings] = best_fit
+        self.updates[strings] += 1
+
+        best_pmax = compute_pmax(best_sol, Pmax_stc, Ftemp_P, Fg, Fage)
+        return StreamFit(best_sol, best_pmax, best_fit, cycles, warm)
+
+    def reset(self, strings=None):
+        """Forget the given strings (all if None) so their next fit starts cold."""
+        strings = slice(None) if strings is None else strings
+        self.error[strings] = np.inf
+        self.updates[strings] = 0
+
+    def save(self, path):
+        np.savez(path, best_sol=self.best_sol, error=self.error, updates=self.updates)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """A fitter with the state saved at path; kwargs are as for __init__."""
+        with np.load(path) as data:
+            fitter = cls(len(data["updates"]), **kwargs)
+            for name in ("best_sol", "error", "updates"):
+                getattr(fitter, name)[...] = data[name]
+        return fitter
@@ -0,0 +1,71 @@
+"""
+Column-table I/O for the command-line tools.
+
+A table is a dict of equal-length 1-D NumPy arrays. Supported formats:
+
+    .csv        header row + one row per record
+    .json       list of records, or an object of column → list
+    .npz        one array per column (np.savez)
+    directory   one .npy per column + meta.json, the bifacial_pv.dataset
+                layout (columnar, memory-mappable)
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+from bifacial_pv.dataset import open_dataset, write_dataset
+
+
+def _as_column(values):
+    try:
+        return np.asarray(values, dtype=float)
+    except ValueError:
+        return np.asarray(values, dtype=str)
+
+
+def read_table(path):
+    """Read a table from CSV, JSON, .npz or a column directory."""
+    if os.path.isdir(path):
+        return dict(open_dataset(path, required=()).columns)
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = [h.strip() for h in next(reader)]
+            cols = list(zip(*reader)) or [()] * len(header)
+        return {h: _as_column(c) for h, c in zip(header, cols)}
+    if ext == ".json":
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            names = list(data[0]) if data else []
+            data = {n: [rec[n] for rec in data] for n in names}
+        return {n: _as_column(v) for n, v in data.items()}
+    if ext == ".npz":
+        with np.load(path) as z:
+            return {n: z[n] for n in z.files}
+    raise ValueError(f"Unsupported table format: {path}")
+
+
+def write_table(path, columns):
+    """Write a table; the format follows the extension (none = column directory)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        names = list(columns)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            writer.writerows(zip(*(np.asarray(columns[n]).tolist() for n in names)))
+    elif ext == ".json":
+        with open(path, "w") as f:
+            json.dump({n: np.asarray(v).tolist() for n, v in columns.items()}, f)
+    elif ext == ".npz":
+        np.savez(path, **{n: np.asarray(v) for n, v in columns.items()})
+    elif ext == "":
+        write_dataset(path, columns)
+    else:
+        raise ValueError(f"Unsupported table format: {path}")
@@ -0,0 +1,129 @@
+"""
+Streaming energy-yield computation from a CSV weather file.
+
+The CSV needs a header row with a timestamp column (ISO 8601), a front
+irradiance column (W/m²) and a cell temperature column (°C):
+
+    timestamp,G_front,Tcell
+    2024-01-01T00:00,0.0,24.1
+    ...
+
+Rows are read in fixed-size chunks and each chunk is pushed through the
+vectorized model, so memory stays bounded by chunk_rows regardless of
+file length. The time step is assumed constant and is inferred from the
+first two timestamps unless step_hours is given.
+"""
+
+import csv
+import io
+import os
+from itertools import islice
+from typing import NamedTuple
+
+import numpy as np
+
+from bifacial_pv.model import ModuleSTC, TempCoeffs, compute_outputs
+
+
+class WeatherChunk(NamedTuple):
+    time: np.ndarray      # datetime64[m]
+    G_front: np.ndarray   # W/m²
+    Tcell: np.ndarray     # °C
+
+
+class EnergyYield(NamedTuple):
+    energy_Wh: float
+    monthly_Wh: dict      # "YYYY-MM" → Wh
+    peak_power: float     # W
+    peak_time: np.datetime64
+    rows: int
+    step_hours: float
+
+
+def _open_text(source):
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, newline="")
+    if isinstance(source, io.TextIOBase):
+        return source
+    # Binary file-like (e.g. a Streamlit UploadedFile)
+    return io.TextIOWrapper(source, encoding="utf-8", newline="")
+
+
+def iter_weather_chunks(source, chunk_rows=100_000,
+                        time_col="timestamp", G_col="G_front", T_col="Tcell"):
+    """Yield WeatherChunk arrays of at most chunk_rows rows from a CSV path or file."""
+    f = _open_text(source)
+    try:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        missing = [c for c in (time_col, G_col, T_col) if c not in header]
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+        it, ig, iT = (header.index(c) for c in (time_col, G_col, T_col))
+
+        while True:
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                break
+            cols = list(zip(*rows))
+            yield WeatherChunk(
+                time=np.array(cols[it], dtype="datetime64[m]"),
+                G_front=np.array(cols[ig], dtype=float),
+                Tcell=np.array(cols[iT], dtype=float),
+            )
+    finally:
+        if f is not source:
+            f.close()
+
+
+def energy_yield(source, dirt=0.0, years=0, Fmm=1.0, Fshade=1.0,
+                 stc=ModuleSTC(), coeffs=TempCoeffs(), BG=0.0,
+                 step_hours=None, chunk_rows=100_000, **columns):
+    """
+    Total energy, per-month energy and peak Pmax for one module.
+
+    The loss factors (dirt → Fclean, years → Fage, Fmm, Fshade) are
+    applied to every time step exactly as on the Computation Tool page.
+    Extra keyword arguments select CSV column names (see iter_weather_chunks).
+    """
+    # Sums of Pmax over time steps; converted to Wh once the step is known
+    total    = 0.0
+    monthly  = {}
+    peak     = -np.inf
+    peak_t   = None
+    rows     = 0
+    first_t  = None
+
+    for chunk in iter_weather_chunks(source, chunk_rows, **columns):
+        if step_hours is None and len(chunk.time):
+            # First two timestamps of the file, which may sit in different chunks
+            if first_t is None and len(chunk.time) >= 2:
+                step_hours = (chunk.time[1] - chunk.time[0]) / np.timedelta64(1, "h")
+            elif first_t is not None:
+                step_hours = (chunk.time[0] - first_t) / np.timedelta64(1, "h")
+            first_t = chunk.time[0] if first_t is None else first_t
+
+        pmax = compute_outputs(chunk.G_front, chunk.Tcell, dirt, years, Fmm, Fshade,
+                               stc, coeffs, BG).Pmax
+        pmax = np.maximum(pmax, 0.0)  # night-time sensor offsets can give G < 0
+
+        month = chunk.time.astype("datetime64[M]")
+        keys, inverse = np.unique(month, return_inverse=True)
+        sums = np.bincount(inverse, weights=pmax)
+        for key, p in zip(keys.astype(str).tolist(), sums):
+            monthly[key] = monthly.get(key, 0.0) + float(p)
+
+        total += float(pmax.sum())
+        idx = int(np.argmax(pmax))
+        if pmax[idx] > peak:
+            peak, peak_t = float(pmax[idx]), chunk.time[idx]
+        rows += len(pmax)
+
+    if rows == 0:
+        raise ValueError("CSV contains no data rows")
+    if step_hours is None:
+        raise ValueError("Need at least two rows to infer the time step")
+
+    step_hours = float(step_hours)
+    monthly = {key: p * step_hours for key, p in monthly.items()}
+    return EnergyYield(total * step_hours, monthly, peak, peak_t, rows, step_hours)
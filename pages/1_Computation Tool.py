@@ -1,150 +1,496 @@
-import streamlit as st
-
-st.title("⚡ Bifacial PV Output Computation Tool")
-st.markdown("Compute Pmax, Vmp, Imp, Voc, and Isc using datasheet-based formulas.")
-st.markdown("---")
-
-# ------------------ INPUT LAYOUT ------------------
-col1, col2 = st.columns(2)
-
-# ---------- LEFT ----------
-with col1:
-    st.subheader("🔆 Environmental Inputs")
-
-    G_front = st.number_input("Front Irradiance (W/m²)", value=800.0)
-    BG = st.number_input("Bifacial Gain (BG)", value=0.15)
-    Tcell = st.number_input("Cell Temperature (°C)", value=30.0)
-
-    st.subheader("📦 Module Electrical Data at STC")
-    Pmax_stc = st.number_input("Pmax at STC (W)", value=610.0)
-    Vmp_stc = st.number_input("Vmp at STC (V)", value=40.51)
-    Imp_stc = st.number_input("Imp at STC (A)", value=15.06)
-    Voc_stc = st.number_input("Voc at STC (V)", value=48.38)
-    Isc_stc = st.number_input("Isc at STC (A)", value=15.95)
-
-# ---------- RIGHT ----------
-with col2:
-    st.subheader("🌡 Temperature Coefficients")
-    alphasc = st.number_input("α (Isc coeff, %/°C)", value=0.045, format="%.3f")
-    betaoc  = st.number_input("β (Voc coeff, %/°C)", value=-0.230, format="%.3f")
-    alphamp = st.number_input("α (Imp coeff, %/°C)", value=0.045, format="%.3f")
-    betamp  = st.number_input("β (Vmp coeff, %/°C)", value=-0.280, format="%.3f")
-    gamma = st.number_input("γ (Pmax coeff, %/°C)", value=-0.280, format="%.3f")
-
-
-
-    st.subheader("⚙ Loss & Correction Factors")
-
-    dirt = st.number_input("Dirt Level (%) [Range: 0 – 20%]", min_value=0.0, max_value=20.0, value=5.0)
-    years = st.number_input("Module Age (years) [Range: 0 – 25 years]", min_value=0, max_value=25, value=10, step=1)
-    Fmm = st.number_input("Mismatch Factor (Fmm) [Range: 0.95 – 1.0]", min_value=0.95, max_value=1.0, value=0.98)
-    Fshade = st.number_input("Shading Factor (Fshade) [Range: 0.7 – 1.0]", min_value=0.7, max_value=1.0, value=0.95)
-
-# ------------------ CALCULATION ------------------
-if st.button("Compute Outputs"):
-
-    # Rear & total irradiance
-    G_rear = BG * G_front
-    G_total = G_front + G_rear
-
-    # Irradiance factor
-    Fg = G_front / 1000
-
-    # Cleaning factor
-    Fclean = (100 - dirt) / 100
-
-    # ---------- FIXED Fage LOGIC ----------
-    if years <= 0:
-        Fage = 1.0
-    else:
-        Fage = 1 - 0.015 - 0.005 * (years - 1)
-
-    # -------- Temperature factors --------
-    # Fallback rules:
-    # - If alphamp not given → use alphasc
-    # - If betamp not given → use gamma
-    
-    if alphamp == 0:
-        alphamp = alphasc
-    
-    if betamp == 0:
-        betamp = gamma
-    
-    Ftemp_Isc = 1 + (alphasc / 100) * (Tcell - 25)
-    Ftemp_Imp = 1 + (alphamp / 100) * (Tcell - 25)
-    Ftemp_Voc = 1 + (betaoc  / 100) * (Tcell - 25)
-    Ftemp_Vmp = 1 + (betamp  / 100) * (Tcell - 25)
-    Ftemp_Pmp = 1 + (gamma   / 100) * (Tcell - 25)
-    
-    # -------- Electrical outputs --------
-    Isc  = Isc_stc  * Ftemp_Isc * Fg * Fclean * Fshade
-    Imp  = Imp_stc  * Ftemp_Imp * Fg * Fclean * Fshade
-    Voc  = Voc_stc  * Ftemp_Voc
-    Vmp  = Vmp_stc  * Ftemp_Vmp
-    Pmax = Pmax_stc * Ftemp_Pmp * Fg * Fclean * Fshade * Fmm * Fage
-
-    # --- SAVE FOR ABC (THIS IS THE KEY PART) ---
-    # --- SAVE FOR ABC (THIS IS THE KEY PART) ---
-    st.session_state["Pmax_calculated"] = Pmax
-    st.session_state["Pmax_STC"] = Pmax_stc
-    st.session_state["Ftemp_P"] = Ftemp_Pmp
-    st.session_state["Fg"] = Fg
-    st.session_state["Fclean"] = Fclean
-    st.session_state["Fshade"] = Fshade
-    st.session_state["Fmm"] = Fmm
-    st.session_state["Fage"] = Fage
-
-
-    # ------------------ OUTPUT ------------------
-    st.markdown("---")
-    st.subheader("📊 Calculated Electrical Outputs (Module Level)")
-
-    st.success(f"Maximum Power Output, **Pmax** = {Pmax:.2f} W")
-    st.success(f"Voltage at Maximum Power, **Vmp** = {Vmp:.2f} V")
-    st.success(f"Current at Maximum Power, **Imp** = {Imp:.2f} A")
-    st.success(f"Open Circuit Voltage, **Voc** = {Voc:.2f} V")
-    st.success(f"Short Circuit Current, **Isc** = {Isc:.2f} A")
-
-    st.markdown("### 🧮 Calculation Steps")
-    st.write(f"1️⃣ Rear irradiance = BG × G_front = {BG} × {G_front} = **{G_rear:.2f} W/m²**")
-    st.write(f"2️⃣ Total irradiance = G_front + G_rear = **{G_total:.2f} W/m²**")
-
-    st.write(f"3️⃣ Irradiance factor Fg = G_front / 1000 = {G_front} / 1000 = **{Fg:.3f}**")
-
-
-    
-    st.write(
-        f"4️⃣ Temperature factors:\n"
-        f"- Ftemp,Isc = 1 + (α_Isc/100)(T−25) = **{Ftemp_Isc:.3f}**\n"
-        f"- Ftemp,Imp = 1 + (α_Imp/100)(T−25) = **{Ftemp_Imp:.3f}**\n"
-        f"- Ftemp,Voc = 1 + (β_Voc/100)(T−25) = **{Ftemp_Voc:.3f}**\n"
-        f"- Ftemp,Vmp = 1 + (β_Vmp/100)(T−25) = **{Ftemp_Vmp:.3f}**\n"
-        f"- Ftemp,Pmp = 1 + (γ/100)(T−25) = **{Ftemp_Pmp:.3f}**"
-    )
-
-    st.write(
-        f"5️⃣ Cleaning factor Fclean = (100 − dirt)/100 = "
-        f"(100 − {dirt})/100 = **{Fclean:.3f}**"
-    )
-    
-    st.write(
-        f"6️⃣ Aging factor Fage:\n"
-        f"- Year 1 degradation = 1.5%\n"
-        f"- Subsequent years = 0.5%/year\n"
-        f"- Total Fage = **{Fage:.3f}**"
-    )
-    
-    st.write(
-        f"7️⃣ Electrical calculations:\n"
-        f"- Isc = {Isc_stc:.3f} × {Ftemp_Isc:.3f} × {Fg:.3f} × "
-        f"{Fclean:.3f} × {Fshade:.3f} = **{Isc:.2f} A**\n"
-        f"- Voc = {Voc_stc:.3f} × {Ftemp_Voc:.3f} = **{Voc:.2f} V**\n"
-        f"- Vmp = {Vmp_stc:.3f} × {Ftemp_Vmp:.3f} = **{Vmp:.2f} V**\n"
-        f"- Imp = {Imp_stc:.3f} × {Ftemp_Imp:.3f} × {Fg:.3f} × "
-        f"{Fclean:.3f} × {Fshade:.3f} = **{Imp:.2f} A**\n"
-        f"- Pmax = {Pmax_stc:.1f} × {Ftemp_Pmp:.3f} × {Fg:.3f} × "
-        f"{Fclean:.3f} × {Fshade:.3f} × {Fmm:.3f} × {Fage:.3f} "
-        f"= **{Pmax:.2f} W**"
-    )
-    
-    st.info("All calculations follow the datasheet-based PV computation formula at module level.")
+import numpy as np
+import streamlit as st
+
+from bifacial_pv.cache import default_cache, make_key
+from bifacial_pv.model import (
+    ModuleSTC, Outputs, TempCoeffs, TempFactors,
+    aging_factor, cleaning_factor, electrical_outputs, irradiance_factor, temperature_factors,
+)
+from bifacial_pv.plant import PlantLayout, plant_pmax
+from bifacial_pv.rear import RowGeometry, bifacial_gain
+from bifacial_pv.sensitivity import (
+    LIMITS, grid_sweep, monte_carlo, normal, sobol, tornado, uniform,
+)
+from bifacial_pv.session import COMPUTE_KEY, RESULT_VERSION, ComputeResult
+from bifacial_pv.lifetime import Soiling, lifetime_simulation
+from bifacial_pv.timeseries import energy_yield
+
+st.title("⚡ Bifacial PV Output Computation Tool")
+st.markdown("Compute Pmax, Vmp, Imp, Voc, and Isc using datasheet-based formulas.")
+st.markdown("---")
+
+# ------------------ INPUT LAYOUT ------------------
+col1, col2 = st.columns(2)
+
+# ---------- LEFT ----------
+with col1:
+    st.subheader("🔆 Environmental Inputs")
+
+    G_front = st.number_input("Front Irradiance (W/m²)", value=800.0)
+    geometric_bg = st.checkbox("Compute BG from array geometry (view-factor model)")
+    if geometric_bg:
+        with st.container(border=True):
+            g1, g2 = st.columns(2)
+            albedo    = g1.number_input("Ground Albedo", min_value=0.0, max_value=1.0, value=0.25)
+            tilt      = g2.number_input("Tilt (°)", min_value=0.0, max_value=90.0, value=25.0)
+            pitch     = g1.number_input("Row Pitch (m)", min_value=0.1, value=6.0)
+            height    = g2.number_input("Clearance Height (m)", min_value=0.0, value=1.0)
+            width     = g1.number_input("Collector Width (m)", min_value=0.1, value=2.3)
+            n_rows    = g2.number_input("Rows", min_value=1, value=20, step=1)
+            elevation = g1.number_input("Sun Elevation (°)", min_value=5.0, max_value=90.0, value=50.0,
+                                        help="At least 5°: DNI = (GHI − DHI) / cos(zenith) diverges at the horizon.")
+            sun_az    = g2.number_input("Sun Azimuth (° from N)", min_value=0.0, max_value=360.0, value=180.0)
+            diffuse   = g1.number_input("Diffuse Fraction (DHI/GHI)", min_value=0.0, max_value=1.0, value=0.2)
+            face_az   = g2.number_input("Array Azimuth (° from N)", min_value=0.0, max_value=360.0, value=180.0)
+
+            # BG is a ratio, so any GHI gives the same value
+            zenith = 90.0 - elevation
+            ghi = 1000.0
+            dhi = diffuse * ghi
+            dni = (ghi - dhi) / np.cos(np.radians(zenith))
+            geometry = RowGeometry(tilt, pitch, height, width, face_az, int(n_rows))
+            BG = float(bifacial_gain(geometry, zenith, sun_az, dni, dhi, albedo)[0])
+            st.metric("Bifacial Gain (BG), array average", f"{BG:.4f}")
+            st.caption(f"Ground coverage ratio {geometry.gcr:.2f}")
+    else:
+        BG = st.number_input("Bifacial Gain (BG)", value=0.15)
+    Tcell = st.number_input("Cell Temperature (°C)", value=30.0)
+
+    st.subheader("📦 Module Electrical Data at STC")
+    Pmax_stc = st.number_input("Pmax at STC (W)", value=610.0)
+    Vmp_stc = st.number_input("Vmp at STC (V)", value=40.51)
+    Imp_stc = st.number_input("Imp at STC (A)", value=15.06)
+    Voc_stc = st.number_input("Voc at STC (V)", value=48.38)
+    Isc_stc = st.number_input("Isc at STC (A)", value=15.95)
+
+# ---------- RIGHT ----------
+with col2:
+    st.subheader("🌡 Temperature Coefficients")
+    alphasc = st.number_input("α (Isc coeff, %/°C)", value=0.045, format="%.3f")
+    betaoc  = st.number_input("β (Voc coeff, %/°C)", value=-0.230, format="%.3f")
+    alphamp = st.number_input("α (Imp coeff, %/°C)", value=0.045, format="%.3f")
+    betamp  = st.number_input("β (Vmp coeff, %/°C)", value=-0.280, format="%.3f")
+    gamma = st.number_input("γ (Pmax coeff, %/°C)", value=-0.280, format="%.3f")
+
+
+
+    st.subheader("⚙ Loss & Correction Factors")
+
+    dirt = st.number_input("Dirt Level (%) [Range: 0 – 20%]", min_value=0.0, max_value=20.0, value=5.0)
+    years = st.number_input("Module Age (years) [Range: 0 – 25 years]", min_value=0, max_value=25, value=10, step=1)
+    st.session_state.setdefault("Fmm", 0.98)  # may be replaced by the plant model's computed Fmm below
+    Fmm = st.number_input("Mismatch Factor (Fmm) [Range: 0.95 – 1.0]", min_value=0.95, max_value=1.0, key="Fmm")
+    Fshade = st.number_input("Shading Factor (Fshade) [Range: 0.7 – 1.0]", min_value=0.7, max_value=1.0, value=0.95)
+
+# ------------------ CALCULATION ------------------
+if st.button("Compute Outputs"):
+
+    # Rear & total irradiance
+    G_rear = BG * G_front
+    G_total = G_front + G_rear
+
+    stc    = ModuleSTC(Pmax_stc, Vmp_stc, Imp_stc, Voc_stc, Isc_stc)
+    coeffs = TempCoeffs(alphasc, betaoc, alphamp, betamp, gamma)
+
+    def compute_operating_point():
+        # Irradiance factor (front side only)
+        Fg = irradiance_factor(G_front)
+
+        # Cleaning factor
+        Fclean = cleaning_factor(dirt)
+
+        # Aging factor (1.5% year one, then 0.5%/year)
+        Fage = aging_factor(years)
+
+        # -------- Temperature factors --------
+        # Fallback rules (applied in temperature_factors):
+        # - If alphamp not given → use alphasc
+        # - If betamp not given → use gamma
+        Ftemp = temperature_factors(Tcell, coeffs)
+
+        # -------- Electrical outputs --------
+        outputs = electrical_outputs(stc, Ftemp, Fg, Fclean, Fshade, Fmm, Fage)
+        return ComputeResult(
+            stc, coeffs, G_front, BG, Tcell, dirt, years, Fmm, Fshade,
+            float(Fg), float(Fclean), float(Fage),
+            TempFactors(*(float(f) for f in Ftemp)), Outputs(*(float(o) for o in outputs)),
+        )
+
+    cache  = default_cache()
+    key    = make_key("compute", RESULT_VERSION, G_front, BG, Tcell, dirt, years, Fmm, Fshade, stc, coeffs)
+    result = cache.get_or_compute(key, compute_operating_point)
+
+    Fg, Fclean, Fage = result.Fg, result.Fclean, result.Fage
+    Ftemp_Isc, Ftemp_Imp, Ftemp_Voc, Ftemp_Vmp, Ftemp_Pmp = result.Ftemp
+    Pmax, Vmp, Imp, Voc, Isc = result.outputs
+
+    # --- SAVE FOR ABC (THIS IS THE KEY PART) ---
+    st.session_state[COMPUTE_KEY] = result
+
+    # ------------------ OUTPUT ------------------
+    st.markdown("---")
+    st.subheader("📊 Calculated Electrical Outputs (Module Level)")
+
+    st.success(f"Maximum Power Output, **Pmax** = {Pmax:.2f} W")
+    st.success(f"Voltage at Maximum Power, **Vmp** = {Vmp:.2f} V")
+    st.success(f"Current at Maximum Power, **Imp** = {Imp:.2f} A")
+    st.success(f"Open Circuit Voltage, **Voc** = {Voc:.2f} V")
+    st.success(f"Short Circuit Current, **Isc** = {Isc:.2f} A")
+
+    st.markdown("### 🧮 Calculation Steps")
+    st.write(f"1️⃣ Rear irradiance = BG × G_front = {BG} × {G_front} = **{G_rear:.2f} W/m²**")
+    st.write(f"2️⃣ Total irradiance = G_front + G_rear = **{G_total:.2f} W/m²**")
+
+    st.write(f"3️⃣ Irradiance factor Fg = G_front / 1000 = {G_front} / 1000 = **{Fg:.3f}**")
+
+
+    
+    st.write(
+        f"4️⃣ Temperature factors:\n"
+        f"- Ftemp,Isc = 1 + (α_Isc/100)(T−25) = **{Ftemp_Isc:.3f}**\n"
+        f"- Ftemp,Imp = 1 + (α_Imp/100)(T−25) = **{Ftemp_Imp:.3f}**\n"
+        f"- Ftemp,Voc = 1 + (β_Voc/100)(T−25) = **{Ftemp_Voc:.3f}**\n"
+        f"- Ftemp,Vmp = 1 + (β_Vmp/100)(T−25) = **{Ftemp_Vmp:.3f}**\n"
+        f"- Ftemp,Pmp = 1 + (γ/100)(T−25) = **{Ftemp_Pmp:.3f}**"
+    )
+
+    st.write(
+        f"5️⃣ Cleaning factor Fclean = (100 − dirt)/100 = "
+        f"(100 − {dirt})/100 = **{Fclean:.3f}**"
+    )
+    
+    st.write(
+        f"6️⃣ Aging factor Fage:\n"
+        f"- Year 1 degradation = 1.5%\n"
+        f"- Subsequent years = 0.5%/year\n"
+        f"- Total Fage = **{Fage:.3f}**"
+    )
+    
+    st.write(
+        f"7️⃣ Electrical calculations:\n"
+        f"- Isc = {Isc_stc:.3f} × {Ftemp_Isc:.3f} × {Fg:.3f} × "
+        f"{Fclean:.3f} × {Fshade:.3f} = **{Isc:.2f} A**\n"
+        f"- Voc = {Voc_stc:.3f} × {Ftemp_Voc:.3f} = **{Voc:.2f} V**\n"
+        f"- Vmp = {Vmp_stc:.3f} × {Ftemp_Vmp:.3f} = **{Vmp:.2f} V**\n"
+        f"- Imp = {Imp_stc:.3f} × {Ftemp_Imp:.3f} × {Fg:.3f} × "
+        f"{Fclean:.3f} × {Fshade:.3f} = **{Imp:.2f} A**\n"
+        f"- Pmax = {Pmax_stc:.1f} × {Ftemp_Pmp:.3f} × {Fg:.3f} × "
+        f"{Fclean:.3f} × {Fshade:.3f} × {Fmm:.3f} × {Fage:.3f} "
+        f"= **{Pmax:.2f} W**"
+    )
+    
+    st.info("All calculations follow the datasheet-based PV computation formula at module level.")
+    st.caption("Result cache: {hits} hits / {misses} misses ({size} entries)".format(**cache.stats()))
+
+
+# ------------------ ARRAY PLANT MODEL ------------------
+PLANT_KEY = "plant_result"
+
+st.markdown("---")
+st.subheader("🏭 Array Plant Model (Computed Mismatch)")
+st.markdown(
+    "Instead of assuming Fmm, build a plant of series strings on inverters and give each module "
+    "its own irradiance, temperature and soiling, drawn around the inputs above with the spreads below. "
+    "Each string is limited by its weakest module and parallel strings share one inverter bus voltage; "
+    "the plant mismatch factor follows from the result. As in the single-point calculation, "
+    "Fg is taken from G_front only."
+)
+
+col_p1, col_p2, col_p3 = st.columns(3)
+with col_p1:
+    modules_per_string   = st.number_input("Modules per String", min_value=1, value=28, step=1)
+    strings_per_inverter = st.number_input("Strings per Inverter", min_value=1, value=20, step=1)
+    inverters            = st.number_input("Inverters", min_value=1, value=200, step=1)
+with col_p2:
+    G_spread    = st.number_input("Irradiance Spread (σ, % of G_front)", min_value=0.0, max_value=50.0, value=3.0)
+    T_spread    = st.number_input("Temperature Spread (σ, °C)", min_value=0.0, max_value=20.0, value=2.0)
+    dirt_spread = st.number_input("Dirt Spread (σ, %)", min_value=0.0, max_value=10.0, value=1.0)
+with col_p3:
+    inverter_kw = st.number_input("Inverter DC Limit (kW, 0 = none)", min_value=0.0, value=0.0)
+    plant_seed  = st.number_input("Random Seed", min_value=0, value=0, step=1, key="plant_seed")
+
+if st.button("Compute Plant"):
+    layout = PlantLayout(int(modules_per_string), int(strings_per_inverter), int(inverters))
+    rng = np.random.default_rng(int(plant_seed))
+    n = layout.n_modules
+
+    st.session_state[PLANT_KEY] = plant_pmax(
+        layout,
+        G_front=np.maximum(rng.normal(G_front, G_front * G_spread / 100, n), 0.0),
+        Tcell=rng.normal(Tcell, T_spread, n),
+        dirt=np.clip(rng.normal(dirt, dirt_spread, n), 0.0, 100.0),
+        years=years, Fshade=Fshade,
+        stc=ModuleSTC(Pmax_stc, Vmp_stc, Imp_stc, Voc_stc, Isc_stc),
+        coeffs=TempCoeffs(alphasc, betaoc, alphamp, betamp, gamma),
+        inverter_limit=inverter_kw * 1000 if inverter_kw > 0 else None,
+    )
+
+plant = st.session_state.get(PLANT_KEY)
+if plant is not None:
+    inverters_P = plant.inverter_P
+    col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+    col_m1.metric("Plant Pmax (kW)",    f"{plant.Pmax / 1000:,.1f}")
+    col_m2.metric("Σ Module Pmax (kW)", f"{plant.Pmax_modules / 1000:,.1f}")
+    col_m3.metric("Computed Fmm",       f"{plant.Fmm:.4f}")
+    col_m4.metric("Clipped (kW)",       f"{plant.clipped / 1000:,.1f}")
+
+    st.caption(
+        f"{plant.string_I.size:,} strings on {inverters_P.size:,} inverters · "
+        f"string current {plant.string_I.min():.2f}–{plant.string_I.max():.2f} A · "
+        f"inverter power {inverters_P.min() / 1000:,.1f}–{inverters_P.max() / 1000:,.1f} kW"
+    )
+
+    def use_plant_fmm():
+        st.session_state["Fmm"] = float(np.clip(plant.Fmm, 0.95, 1.0))
+
+    st.button("Use Computed Fmm Above", on_click=use_plant_fmm)
+    if not 0.95 <= plant.Fmm <= 1.0:
+        st.warning("The computed Fmm is outside the 0.95 – 1.0 input range and will be clamped.")
+
+# ------------------ SENSITIVITY & UNCERTAINTY ------------------
+st.markdown("---")
+st.subheader("🎲 Sensitivity & Uncertainty")
+st.markdown(
+    "Vary the inputs above around their current values: Monte Carlo percentiles (P90 is exceeded "
+    "with 90% probability), tornado swings and Sobol indices. Spread is the ± half-width of a uniform "
+    "range or the standard deviation of a normal. The nominal point is the single-point Pmax above: "
+    "Fg = G_front / 1000 (front side only), so BG has no effect and is not swept."
+)
+
+sweep_nominal = {
+    "G_front": G_front, "Tcell": Tcell, "dirt": dirt, "years": years,
+    "Fmm": Fmm, "Fshade": Fshade,
+    "alphasc": alphasc, "betaoc": betaoc, "alphamp": alphamp, "betamp": betamp, "gamma": gamma,
+}
+sweep_defaults = {
+    "G_front": ("normal", 0.02 * G_front), "Tcell": ("normal", 2.0),
+    "dirt": ("uniform", 2.0), "years": ("fixed", 0.0), "Fmm": ("uniform", 0.01),
+    "Fshade": ("uniform", 0.02), "alphasc": ("normal", 0.005), "betaoc": ("normal", 0.02),
+    "alphamp": ("normal", 0.005), "betamp": ("normal", 0.02), "gamma": ("normal", 0.02),
+}
+spreads = st.data_editor(
+    {
+        "Parameter": list(sweep_nominal),
+        "Nominal": [float(v) for v in sweep_nominal.values()],
+        "Distribution": [d for d, _ in sweep_defaults.values()],
+        "Spread": [s for _, s in sweep_defaults.values()],
+    },
+    column_config={
+        "Distribution": st.column_config.SelectboxColumn(options=["fixed", "uniform", "normal"], required=True),
+        "Spread": st.column_config.NumberColumn(min_value=0.0, format="%.4f"),
+    },
+    disabled=["Parameter", "Nominal"],
+    hide_index=True,
+)
+
+uncertain = {}
+for name, kind, spread in zip(spreads["Parameter"], spreads["Distribution"], spreads["Spread"]):
+    if kind == "fixed" or not spread:
+        continue
+    nominal_value = sweep_nominal[name]
+    if kind == "uniform":
+        lo, hi = LIMITS.get(name, (-float("inf"), float("inf")))
+        uncertain[name] = uniform(max(nominal_value - spread, lo), min(nominal_value + spread, hi))
+    else:
+        uncertain[name] = normal(nominal_value, spread)
+
+col_s1, col_s2, col_s3 = st.columns(3)
+sweep_output = col_s1.selectbox("Output", ["Pmax", "Vmp", "Imp", "Voc", "Isc"])
+mc_samples = col_s2.select_slider("Monte Carlo Samples", options=[10**4, 10**5, 10**6, 10**7], value=10**6,
+                                  format_func=lambda n: f"{n:,}")
+sobol_base = col_s3.select_slider("Sobol Base Samples", options=[10**3, 10**4, 10**5, 10**6], value=10**5,
+                                  format_func=lambda n: f"{n:,}")
+sweep_stc = ModuleSTC(Pmax_stc, Vmp_stc, Imp_stc, Voc_stc, Isc_stc)
+
+if st.button("Run Sensitivity Analysis", disabled=not uncertain):
+    with st.spinner("Sampling..."):
+        mc  = monte_carlo(sweep_nominal, uncertain, mc_samples, stc=sweep_stc, output=sweep_output)
+        tor = tornado(sweep_nominal, uncertain, stc=sweep_stc, output=sweep_output)
+        sob = sobol(sweep_nominal, uncertain, sobol_base, stc=sweep_stc, output=sweep_output)
+
+    col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+    col_r1.metric(f"Nominal {sweep_output}", f"{mc.nominal:.2f}")
+    col_r2.metric("P50", f"{mc.percentiles['P50']:.2f}")
+    col_r3.metric("P90", f"{mc.percentiles['P90']:.2f}")
+    col_r4.metric("P99", f"{mc.percentiles['P99']:.2f}")
+    st.caption(
+        f"{mc.samples:,} samples · mean {mc.mean:.2f} · σ {mc.std:.2f} · "
+        f"range {mc.min:.2f} – {mc.max:.2f} · Sobol: {sob.samples:,} evaluations"
+    )
+
+    st.markdown(f"#### Distribution of {sweep_output}")
+    counts, edges = mc.histogram
+    coarse = 128
+    per_bar = len(counts) // coarse
+    bar_edges = edges[::per_bar]
+    st.bar_chart(
+        {
+            sweep_output: ((bar_edges[:-1] + bar_edges[1:]) / 2).round(2).tolist(),
+            "Share (%)": (counts.reshape(coarse, per_bar).sum(axis=1) / mc.samples * 100).tolist(),
+        },
+        x=sweep_output,
+    )
+
+    st.markdown(f"#### Tornado (change in {sweep_output} from nominal)")
+    st.bar_chart(
+        {
+            "Parameter": list(tor.names) * 2,
+            "Case": ["Low"] * len(tor.names) + ["High"] * len(tor.names),
+            "Change": (tor.low - tor.nominal).tolist() + (tor.high - tor.nominal).tolist(),
+        },
+        x="Parameter", y="Change", color="Case", horizontal=True, stack=False,
+    )
+
+    st.markdown("#### Sobol Indices")
+    st.bar_chart(
+        {
+            "Parameter": list(sob.names) * 2,
+            "Index": ["First-order"] * len(sob.names) + ["Total"] * len(sob.names),
+            "Value": sob.first.tolist() + sob.total.tolist(),
+        },
+        x="Parameter", y="Value", color="Index", stack=False,
+    )
+
+with st.expander("Grid Sweep"):
+    swept = st.multiselect("Parameters (1 or 2)", list(uncertain), max_selections=2,
+                           default=list(uncertain)[:1])
+    grid_points = st.number_input("Points per Axis", min_value=2, max_value=2000, value=50, step=1)
+    st.caption("Each axis spans the parameter's low–high case (uniform bounds, or P10–P90 of a normal).")
+
+    if swept and st.button("Run Grid Sweep"):
+        axes = {name: np.linspace(*uncertain[name].low_high, int(grid_points)) for name in swept}
+        grid = grid_sweep(sweep_nominal, axes, stc=sweep_stc, output=sweep_output)
+        if len(swept) == 1:
+            st.line_chart({swept[0]: grid.axes[0].tolist(), sweep_output: grid.values.tolist()}, x=swept[0])
+        else:
+            xs, ys = np.meshgrid(grid.axes[0], grid.axes[1], indexing="ij")
+            st.vega_lite_chart(
+                {
+                    swept[0]: xs.ravel().round(4).tolist(),
+                    swept[1]: ys.ravel().round(4).tolist(),
+                    sweep_output: grid.values.ravel().tolist(),
+                },
+                {
+                    "mark": "rect",
+                    "encoding": {
+                        "x": {"field": swept[0], "type": "quantitative", "bin": {"maxbins": int(grid_points)}},
+                        "y": {"field": swept[1], "type": "quantitative", "bin": {"maxbins": int(grid_points)}},
+                        "color": {"field": sweep_output, "type": "quantitative", "aggregate": "mean"},
+                    },
+                },
+            )
+
+# ------------------ TIME-SERIES MODE ------------------
+st.markdown("---")
+st.subheader("📅 Time-Series Energy Yield (CSV)")
+st.markdown(
+    "Upload hourly or 1-minute weather data with `timestamp`, `G_front` (W/m²) and `Tcell` (°C) columns. "
+    "The file is streamed in chunks through the same module model using the STC data, "
+    "temperature coefficients and loss factors above. As in the single-point calculation, "
+    "Fg is taken from G_front only; BG is not applied."
+)
+
+weather_file = st.file_uploader("Weather CSV", type="csv")
+
+if weather_file is not None and st.button("Compute Energy Yield"):
+    with st.spinner("Streaming weather data through the module model..."):
+        try:
+            result = energy_yield(
+                weather_file,
+                dirt=dirt, years=years, Fmm=Fmm, Fshade=Fshade,
+                stc=ModuleSTC(Pmax_stc, Vmp_stc, Imp_stc, Voc_stc, Isc_stc),
+                coeffs=TempCoeffs(alphasc, betaoc, alphamp, betamp, gamma),
+            )
+        except ValueError as e:
+            st.error(f"Could not read weather file: {e}")
+            st.stop()
+
+    col_t1, col_t2, col_t3, col_t4 = st.columns(4)
+    col_t1.metric("Total Energy (kWh)", f"{result.energy_Wh / 1000:.2f}")
+    col_t2.metric("Peak Pmax (W)",      f"{result.peak_power:.2f}")
+    col_t3.metric("Peak Time",          str(result.peak_time))
+    col_t4.metric("Rows / Step (h)",    f"{result.rows} / {result.step_hours:.4f}")
+
+    st.markdown("#### Monthly Energy (kWh)")
+    st.bar_chart(
+        {
+            "Month": list(result.monthly_Wh),
+            "Energy (kWh)": [wh / 1000 for wh in result.monthly_Wh.values()],
+        },
+        x="Month",
+    )
+
+# ------------------ LIFETIME SIMULATION ------------------
+st.markdown("#### 🕰 Lifetime Simulation")
+st.markdown(
+    "Repeats the uploaded weather as a typical year over the module's service life, with the "
+    "year-by-year aging factor (1.5% in year one, then 0.5%/yr) and a soiling and cleaning schedule "
+    "feeding Fclean. The file is streamed once; each year only rescales the per-day results. "
+    "Fmm and Fshade are taken from above and Fg from G_front only, as in the energy yield; "
+    "dirt and module age come from the schedule below instead."
+)
+
+col_l1, col_l2, col_l3 = st.columns(3)
+with col_l1:
+    life_years = st.number_input("Years in Service", min_value=1, max_value=50, value=25, step=1)
+    start_age  = st.number_input("Module Age at Start (years)", min_value=0, max_value=50, value=0, step=1)
+with col_l2:
+    soil_rate  = st.number_input("Soiling Rate (% per day)", min_value=0.0, max_value=5.0, value=0.05, format="%.3f")
+    soil_max   = st.number_input("Maximum Dirt (%)", min_value=0.0, max_value=100.0, value=20.0)
+with col_l3:
+    clean_every = st.number_input("Cleaning Interval (days, 0 = never)", min_value=0, value=90, step=1)
+    clean_days  = st.text_input("Extra Cleaning Days of Year", value="",
+                                help="Comma-separated 0-based days of the weather year, e.g. 120, 240.")
+
+if weather_file is not None and st.button("Simulate Lifetime"):
+    try:
+        days_of_year = tuple(int(d) for d in clean_days.replace(" ", "").split(",") if d)
+    except ValueError:
+        st.error("Extra cleaning days must be comma-separated whole numbers.")
+        st.stop()
+    soiling = Soiling(soil_rate, soil_max, int(clean_every) or None, days_of_year)
+
+    weather_file.seek(0)
+    with st.spinner("Streaming weather data once and replaying it over the service life..."):
+        try:
+            life = lifetime_simulation(
+                weather_file, int(life_years), int(start_age), soiling,
+                Fmm=Fmm, Fshade=Fshade,
+                stc=ModuleSTC(Pmax_stc, Vmp_stc, Imp_stc, Voc_stc, Isc_stc),
+                coeffs=TempCoeffs(alphasc, betaoc, alphamp, betamp, gamma),
+            )
+        except ValueError as e:
+            st.error(f"Could not read weather file: {e}")
+            st.stop()
+
+    first, last = life.energy_Wh[0], life.energy_Wh[-1]
+    clean_Wh = (life.energy_Wh + life.soiling_loss_Wh).sum()
+    col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+    col_r1.metric("Lifetime Energy (MWh)",         f"{life.cumulative_Wh[-1] / 1e6:.3f}")
+    col_r2.metric("Year 1 Energy (kWh)",           f"{first / 1000:.2f}")
+    col_r3.metric(f"Year {life.year[-1]} Energy (kWh)", f"{last / 1000:.2f}",
+                  delta=f"{(last / first - 1) * 100:.2f} %" if first > 0 else None)
+    col_r4.metric("Soiling Loss (%)",
+                  f"{life.soiling_loss_Wh.sum() / clean_Wh * 100:.2f}" if clean_Wh > 0 else "0.00")
+
+    st.markdown("#### Annual Energy (kWh)")
+    st.bar_chart(
+        {
+            "Year": life.year,
+            "Energy (kWh)": life.energy_Wh / 1000,
+            "Soiling Loss (kWh)": life.soiling_loss_Wh / 1000,
+        },
+        x="Year",
+    )
+
+    st.markdown("#### Pmax Trajectory (W)")
+    st.line_chart(
+        {
+            "Year": life.year,
+            "Peak Pmax (W)": life.peak_Pmax,
+            "Rated Pmax × Fage (W)": life.rated_Pmax,
+        },
+        x="Year",
+    )
+    st.caption(f"Mean soiling factor Fclean: {life.mean_Fclean.min():.4f} – {life.mean_Fclean.max():.4f} "
+               "(energy-weighted, per year).")
@@ -1,15 +1,34 @@
+import time
+
 import streamlit as st
-import random
+import numpy as np
+
+from bifacial_pv.analytic import DEFAULT_PRIOR, reachable_range, solve_closest
+from bifacial_pv.cache import default_cache, make_key
+from bifacial_pv.charts import comparison_chart, comparison_spec, convergence_chart, convergence_spec
+from bifacial_pv.colony import STOP_REASONS, abc_optimize
+from bifacial_pv.ensemble import abc_ensemble
+from bifacial_pv.jobs import FINISHED, default_manager
+from bifacial_pv.model import Outputs
+from bifacial_pv.multi import DEFAULT_WEIGHTS, fit_multi_batch
+from bifacial_pv.optimizers import METHODS, POPULATION_OPTION, compare_methods
+from bifacial_pv.profiling import RunStats, profile_call
+from bifacial_pv.session import (
+    ABC_KEY, COMPUTE_KEY, JOB_KEY, ComputeResult,
+    abc_result_from_job, abc_result_from_run, fit_summary, get_result,
+)
+from bifacial_pv.space import (
+    DEFAULT_BOUNDS, VARIABLES, default_space, fit_space_batch, search_space, space_objective,
+)
 
 st.title("🐝 ABC Algorithm — Pmax Error Minimizer")
 st.markdown("Optimize controllable factors so that **calculated Pmax matches your measured Pmax** as closely as possible.")
 st.markdown("---")
 
 # ------------------ CHECK SESSION STATE ------------------
-required_keys = ["Pmax_STC", "Ftemp_P", "Fg", "Fage"]
-missing = [k for k in required_keys if k not in st.session_state]
+compute = get_result(st.session_state, COMPUTE_KEY, ComputeResult)
 
-if missing:
+if compute is None:
     st.warning(
         "⚠️ No data found from the Computational Tool. "
         "Please run the **Computational Tool page** first and click **Calculate Outputs**."
@@ -17,19 +36,12 @@ if missing:
     st.stop()
 
 # ------------------ IMPORT FIXED VALUES ------------------
-Pmax_stc  = st.session_state["Pmax_STC"]
-Ftemp_P   = st.session_state["Ftemp_P"]
-Fg        = st.session_state["Fg"]
-Fage      = st.session_state["Fage"]
-
-Ftemp_Isc = st.session_state.get("Ftemp_Isc", 1.0)
-Ftemp_Imp = st.session_state.get("Ftemp_Imp", 1.0)
-Ftemp_Voc = st.session_state.get("Ftemp_Voc", 1.0)
-Ftemp_Vmp = st.session_state.get("Ftemp_Vmp", 1.0)
-Isc_stc   = st.session_state.get("Isc_stc",   None)
-Imp_stc   = st.session_state.get("Imp_stc",   None)
-Voc_stc   = st.session_state.get("Voc_stc",   None)
-Vmp_stc   = st.session_state.get("Vmp_stc",   None)
+module_stc  = compute.stc
+temp_coeffs = compute.coeffs
+Pmax_stc    = module_stc.Pmax
+Ftemp_P     = compute.Ftemp.Pmp
+Fg          = compute.Fg
+Fage        = compute.Fage
 
 st.subheader("📥 Imported Fixed Values (from Computational Tool)")
 col1, col2, col3, col4 = st.columns(4)
@@ -40,6 +52,72 @@ col4.metric("Fage",          f"{Fage:.4f}")
 
 st.markdown("---")
 
+cache = default_cache()
+jobs  = default_manager()
+shown = None   # AbcResult to render at the bottom: a run that just finished here or an attached job
+
+# ------------------ BACKGROUND JOBS ------------------
+@st.fragment(run_every=1.0)
+def job_status(job_id):
+    info = jobs.poll(job_id)
+    if info is None or info.status in FINISHED:
+        st.rerun()
+    total = info.total or 1
+    st.progress(min(info.cycle / total, 1.0),
+                text=f"⏳ Job `{job_id}` ({info.kind}) {info.status}: cycle {info.cycle} of {info.total}")
+    if info.history is not None and len(info.history):
+        st.vega_lite_chart(convergence_chart(info.history), convergence_spec(f"Best error — cycle {info.cycle}"))
+    if st.button("✖ Cancel job", key=f"cancel_{job_id}"):
+        jobs.cancel(job_id)
+        st.rerun()
+
+
+job_id = st.session_state.get(JOB_KEY)
+if job_id is not None:
+    info = jobs.poll(job_id)
+    if info is None or info.status in FINISHED:
+        del st.session_state[JOB_KEY]
+    if info is None:
+        st.warning(f"⚠️ Background job `{job_id}` no longer exists.")
+    elif info.status == "done":
+        shown = abc_result_from_job(jobs, job_id)
+        st.session_state[ABC_KEY] = shown
+        st.success(f"✅ Background job `{job_id}` finished — results are shown below and on the "
+                   "**Results & Graphs** page.")
+        cache_key = jobs.context(job_id)["cache_key"]
+        if cache_key is not None:
+            cache.put(cache_key, jobs.result(job_id))
+    elif info.status == "failed":
+        st.error(f"❌ Background job `{job_id}` failed: {info.error}")
+    elif info.status == "cancelled":
+        st.warning(f"✖ Background job `{job_id}` was cancelled after {info.cycle} cycles.")
+    else:
+        job_status(job_id)
+
+with st.expander("🗂 Background Jobs"):
+    recent = jobs.jobs()
+    if not recent:
+        st.caption("No jobs yet.")
+    else:
+        st.dataframe(
+            {
+                "Job":     [j.id for j in recent],
+                "Kind":    [j.kind for j in recent],
+                "Status":  [j.status for j in recent],
+                "Cycle":   [f"{j.cycle} / {j.total}" for j in recent],
+                "Best":    [j.best for j in recent],
+                "Created": [time.strftime("%H:%M:%S", time.localtime(j.created)) for j in recent],
+            },
+            hide_index=True,
+        )
+        attach = st.selectbox("Job", [j.id for j in recent if j.status not in ("failed", "cancelled")],
+                              index=None, placeholder="Attach to a running or finished job")
+        if attach is not None and st.button("📎 Attach"):
+            st.session_state[JOB_KEY] = attach
+            st.rerun()
+
+st.markdown("---")
+
 # ------------------ MEASURED DATA INPUT ------------------
 st.subheader("📋 Measured Data (Field Measurements)")
 st.markdown("Enter the values measured from your actual PV module in the field.")
@@ -57,165 +135,313 @@ if Pmax_meas <= 0:
     st.info("ℹ️ Enter your measured Pmax above to enable optimization.")
     st.stop()
 
+pmax_lo, pmax_hi = reachable_range(Pmax_stc, Ftemp_P, Fg, Fage)
+if pmax_lo <= Pmax_meas <= pmax_hi:
+    st.caption(f"Pmax reachable within the factor bounds: {pmax_lo:.2f} – {pmax_hi:.2f} W.")
+else:
+    st.warning(
+        f"⚠️ Measured Pmax is outside the range reachable within the factor bounds "
+        f"({pmax_lo:.2f} – {pmax_hi:.2f} W). The best fit will sit on a bound."
+    )
+
+st.markdown("---")
+
+# ------------------ SOLVER ------------------
+ANALYTIC = "Analytic (closest to prior)"
+solver = st.radio(
+    "Solver", ["ABC", ANALYTIC], horizontal=True,
+    help="One measured Pmax fixes only the product (1+BG)·Fclean·Fmm·Fshade. The analytic solver "
+         "returns the exact match closest to a nominal prior instantly; ABC searches stochastically.",
+)
+
+if solver == ANALYTIC:
+    st.markdown("Prior (nominal) factors — the exact-match solution closest to these is returned.")
+    col_p1, col_p2, col_p3, col_p4 = st.columns(4)
+    with col_p1:
+        BG_prior     = st.number_input("Prior BG",      min_value=0.0,  max_value=0.35, value=DEFAULT_PRIOR[0])
+    with col_p2:
+        dirt_prior   = st.number_input("Prior Dirt %",  min_value=0.0,  max_value=20.0, value=DEFAULT_PRIOR[1])
+    with col_p3:
+        Fmm_prior    = st.number_input("Prior Fmm",     min_value=0.95, max_value=1.0,  value=DEFAULT_PRIOR[2])
+    with col_p4:
+        Fshade_prior = st.number_input("Prior Fshade",  min_value=0.7,  max_value=1.0,  value=DEFAULT_PRIOR[3])
+    prior = (BG_prior, dirt_prior, Fmm_prior, Fshade_prior)
+
+# ------------------ OBJECTIVE ------------------
+MULTI = "All measured outputs (weighted)"
+
+objective = "Pmax only"
+if solver == "ABC":
+    objective = st.radio(
+        "Objective", ["Pmax only", MULTI], horizontal=True,
+        help="The weighted objective matches every measured output (0 = not measured) and also "
+             "fits cell temperature and front irradiance: Voc and Vmp pin Tcell, the currents "
+             "and Pmax constrain irradiance and the loss factors.",
+    )
+
+measured = Outputs(Pmax_meas, Vmp_meas, Imp_meas, Voc_meas, Isc_meas)
+weights  = None
+fit_age  = False
+
+if objective == MULTI:
+    st.markdown("Output weights (relative; unmeasured outputs are ignored).")
+    col_w = st.columns(5)
+    weights = Outputs(*(
+        col.number_input(f"Weight {name}", min_value=0.0, value=DEFAULT_WEIGHTS[k], step=0.1)
+        for k, (col, name) in enumerate(zip(col_w, Outputs._fields))
+    ))
+    fit_age = st.checkbox("Also fit the aging factor Fage",
+                          help="Adds a 7th dimension; otherwise Fage is fixed from the Computational Tool.")
+    if not any(m > 0 and w > 0 for m, w in zip(measured, weights)):
+        st.info("ℹ️ Give at least one measured output a non-zero weight.")
+        st.stop()
+
+# ------------------ SEARCH SPACE ------------------
+VARIABLE_LABELS = ["BG", "Dirt %", "Fmm", "Fshade", "Tcell (°C)", "G_front (W/m²)", "Fage"]
+nominal = dict(zip(VARIABLES, (compute.BG, compute.dirt, compute.Fmm, compute.Fshade,
+                               compute.Tcell, compute.G_front, Fage)))
+default = default_space(nominal, multi=objective == MULTI, fit_age=fit_age)
+space   = default
+
+if solver == "ABC":
+    with st.expander("🧭 Search Space"):
+        st.markdown(
+            "Untick **Free** to pin a variable at **Value** (preset to the Computational Tool's operating "
+            "point); narrow **Low** / **High** to tighten a free variable's bounds. Tcell, G_front and Fage "
+            "can be made free under either objective. Only free variables are searched."
+        )
+        table = st.data_editor(
+            {
+                "Variable": VARIABLE_LABELS,
+                "Free":     [n in default.free for n in VARIABLES],
+                "Low":      [DEFAULT_BOUNDS[n][0] for n in VARIABLES],
+                "High":     [DEFAULT_BOUNDS[n][1] for n in VARIABLES],
+                "Value":    [float(nominal[n]) for n in VARIABLES],
+            },
+            column_config={
+                "Free":  st.column_config.CheckboxColumn(required=True),
+                "Low":   st.column_config.NumberColumn(required=True, format="%.4f"),
+                "High":  st.column_config.NumberColumn(required=True, format="%.4f"),
+                "Value": st.column_config.NumberColumn(required=True, format="%.4f"),
+            },
+            disabled=["Variable"],
+            hide_index=True,
+            # A fresh table per objective, so its default free set applies
+            key=f"search_space_{objective}_{fit_age}",
+        )
+        try:
+            space = search_space(
+                dict(zip(VARIABLES, table["Value"])),
+                free=[n for n, free in zip(VARIABLES, table["Free"]) if free],
+                bounds=dict(zip(VARIABLES, zip(table["Low"], table["High"]))),
+            )
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        if space != default:
+            st.caption(f"Custom search space: {space.dim} free variable(s) — "
+                       f"{', '.join(l for n, l in zip(VARIABLES, VARIABLE_LABELS) if n in space.free)}.")
+
 st.markdown("---")
 
 # ------------------ ABC PARAMETERS ------------------
 st.subheader("⚙️ ABC Algorithm Parameters")
+if solver == ANALYTIC:
+    st.caption("Not used by the analytic solver.")
 
-col_a, col_b, col_c = st.columns(3)
+col_a, col_b, col_c, col_d = st.columns(4)
 with col_a:
-    num_bees   = st.number_input("Number of Bees", min_value=10, max_value=200, value=30,  step=5)
+    num_bees   = st.number_input("Number of Bees", min_value=10, max_value=5000,  value=30,  step=5)
 with col_b:
-    max_cycles = st.number_input("Max Cycles",     min_value=10, max_value=500, value=100, step=10)
+    max_cycles = st.number_input("Max Cycles",     min_value=10, max_value=50000, value=100, step=10)
 with col_c:
     limit      = st.number_input("Scout Limit",    min_value=1,  max_value=50,  value=5,   step=1)
+with col_d:
+    restarts   = st.number_input("Independent Restarts", min_value=1, max_value=64, value=1, step=1,
+                                 help="Runs more than one colony in parallel worker processes "
+                                      "and keeps the best; the spread shows how well-identified the factors are.")
+
+seed_input = st.number_input("Random Seed (blank = new random seed)", min_value=0, value=None, step=1,
+                             help="The same seed and parameters reproduce a run exactly. "
+                                  "With several restarts, each restart's seed is derived from it.")
+
+with st.expander("⏱ Early Stopping (leave blank to disable)"):
+    col_s1, col_s2, col_s3, col_s4 = st.columns(4)
+    with col_s1:
+        abs_tol      = st.number_input("Absolute Tolerance (W)", min_value=0.0, value=None, format="%.6f",
+                                       help="For the weighted objective this is taken relative to the measured Pmax.")
+    with col_s2:
+        rel_tol_pct  = st.number_input("Relative Tolerance (%)", min_value=0.0, value=None, format="%.6f")
+    with col_s3:
+        stall_cycles = st.number_input("Stall Window (cycles)",  min_value=1,   value=None, step=1,
+                                       help="Stop when the best error has not improved over this many cycles.")
+    with col_s4:
+        time_budget  = st.number_input("Time Budget (s)",        min_value=0.1, value=None, format="%.1f")
+
+stopping = dict(
+    abs_tol=abs_tol,
+    rel_tol=rel_tol_pct / 100 if rel_tol_pct is not None else None,
+    stall_cycles=int(stall_cycles) if stall_cycles is not None else None,
+    time_budget=time_budget,
+)
+if objective == MULTI and abs_tol is not None:
+    # The weighted objective is a relative error
+    stopping["abs_tol"] = abs_tol / Pmax_meas
+
+with st.expander("🔬 Profiling"):
+    collect_stats    = st.checkbox("Per-phase timers, objective counters, scout resets and acceptance rates",
+                                   help="Collected for single-colony runs and the weighted objective only.")
+    capture_cprofile = st.checkbox("cProfile capture")
+    capture_memory   = st.checkbox("tracemalloc capture")
+
+profiling = collect_stats or capture_cprofile or capture_memory
+
+background = st.checkbox(
+    "Run as a background job",
+    help="The optimization runs in a worker process, so it survives page switches and reruns; "
+         "any session can attach to it from the job list below. Profiling is not collected.",
+)
 
 st.markdown("---")
 
-# ------------------ ABC ALGORITHM ------------------
-def abc_optimize(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, num_bees, max_cycles, limit):
-    """
-    Optimize 4 controllable factors to minimise |Pmax_calc - Pmax_meas|.
-
-    Variables (solution vector):
-        x[0] = BG      — bifacial gain       [0.00, 0.35]
-        x[1] = dirt    — dirt level %        [0.00, 20.0]
-        x[2] = Fmm     — mismatch factor     [0.95,  1.0]
-        x[3] = Fshade  — shading factor      [0.70,  1.0]
-
-    Fixed (from session_state):
-        Pmax_stc, Ftemp_P, Fg, Fage
-
-    Objective: minimise |Pmax_calc - Pmax_meas|
-    """
-
-    BOUNDS = [
-        (0.00, 0.35),
-        (0.00, 20.0),
-        (0.95, 1.00),
-        (0.70, 1.00),
-    ]
-    DIM = len(BOUNDS)
-
-    def compute_pmax(x):
-        BG, dirt, Fmm, Fshade = x
-        G_front = Fg * 1000
-        G_total = G_front * (1 + BG)
-        Fg_eff  = G_total / 1000
-        Fclean  = (100 - dirt) / 100
-        return Pmax_stc * Ftemp_P * Fg_eff * Fclean * Fshade * Fmm * Fage
-
-    def objective(x):
-        return abs(compute_pmax(x) - Pmax_meas)
-
-    def random_solution():
-        return [random.uniform(lo, hi) for lo, hi in BOUNDS]
-
-    def clip(x):
-        return [max(lo, min(hi, x[i])) for i, (lo, hi) in enumerate(BOUNDS)]
-
-    # ---- Initialise ----
-    solutions = [random_solution() for _ in range(num_bees)]
-    fitness   = [objective(s) for s in solutions]
-    trial     = [0] * num_bees
-    error_history = []
-
-    for cycle in range(max_cycles):
-
-        # ---- Employed Bees ----
-        for i in range(num_bees):
-            k = random.randint(0, num_bees - 1)
-            while k == i:
-                k = random.randint(0, num_bees - 1)
-            j       = random.randint(0, DIM - 1)
-            phi     = random.uniform(-1, 1)
-            new_sol = solutions[i][:]
-            new_sol[j] = solutions[i][j] + phi * (solutions[i][j] - solutions[k][j])
-            new_sol = clip(new_sol)
-            new_fit = objective(new_sol)
-            if new_fit < fitness[i]:
-                solutions[i] = new_sol
-                fitness[i]   = new_fit
-                trial[i]     = 0
-            else:
-                trial[i] += 1
-
-        # ---- Onlooker Bees ----
-        prob       = [1 / (1 + f) for f in fitness]
-        total_prob = sum(prob)
-        prob       = [p / total_prob for p in prob]
-
-        for i in range(num_bees):
-            if random.random() < prob[i]:
-                k = random.randint(0, num_bees - 1)
-                while k == i:
-                    k = random.randint(0, num_bees - 1)
-                j       = random.randint(0, DIM - 1)
-                phi     = random.uniform(-1, 1)
-                new_sol = solutions[i][:]
-                new_sol[j] = solutions[i][j] + phi * (solutions[i][j] - solutions[k][j])
-                new_sol = clip(new_sol)
-                new_fit = objective(new_sol)
-                if new_fit < fitness[i]:
-                    solutions[i] = new_sol
-                    fitness[i]   = new_fit
-                    trial[i]     = 0
-                else:
-                    trial[i] += 1
-
-        # ---- Scout Bees ----
-        for i in range(num_bees):
-            if trial[i] > limit:
-                solutions[i] = random_solution()
-                fitness[i]   = objective(solutions[i])
-                trial[i]     = 0
-
-        best_idx = fitness.index(min(fitness))
-        error_history.append(fitness[best_idx])
-
-    best_idx  = fitness.index(min(fitness))
-    best_sol  = solutions[best_idx]
-    best_pmax = compute_pmax(best_sol)
-
-    return best_sol, best_pmax, error_history
-
-
 # ------------------ RUN ------------------
 if st.button("🐝 Run ABC Optimization"):
 
-    with st.spinner("Bees are minimizing the error between calculated and measured Pmax..."):
-        best_sol, best_pmax, error_history = abc_optimize(
-            Pmax_stc, Ftemp_P, Fg, Fage,
-            Pmax_meas,
-            int(num_bees), int(max_cycles), int(limit)
-        )
+    # Draw a fresh seed when none is given so every run can be reproduced
+    seed = int(seed_input) if seed_input is not None else int(np.random.SeedSequence().generate_state(1)[0])
+
+    # Identical inputs + seed reproduce a run exactly, so results are served from
+    # the shared cache. Wall-clock budgets make runs machine-dependent and profiled
+    # runs must actually execute: neither is served from the cache.
+    args  = (Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, int(num_bees), int(max_cycles), int(limit))
+    key   = make_key("abc", *args, seed, int(restarts), stopping)
+    if objective == MULTI:
+        key = make_key(key, "multi", measured, weights, fit_age, module_stc, temp_coeffs)
+    if space != default:
+        key = make_key(key, "space", space, module_stc, temp_coeffs)
+    cacheable = stopping["time_budget"] is None
+
+    if solver == ANALYTIC:
+        kind = "analytic"
+    elif space != default:
+        # Restarts are extra problems in the same stacked colony, as for the weighted objective
+        kind = "space"
+        batch = (Outputs(*(np.full(int(restarts), m) for m in measured)) if objective == MULTI
+                 else np.full(int(restarts), Pmax_meas))
+        call = (fit_space_batch,
+                (space, batch, int(max_cycles), module_stc, temp_coeffs, weights),
+                dict(options=dict(num_bees=int(num_bees), limit=int(limit)), rng=seed, **stopping))
+    elif objective == MULTI:
+        # Independent restarts are extra problems in the same stacked colony
+        kind = "multi"
+        call = (fit_multi_batch,
+                (Outputs(*(np.full(int(restarts), m) for m in measured)), int(num_bees), int(max_cycles),
+                 int(limit), module_stc, temp_coeffs, Fage, weights, fit_age),
+                dict(rng=seed, **stopping))
+    elif restarts > 1:
+        kind = "ensemble"
+        call = (abc_ensemble, args, dict(restarts=int(restarts), seed=seed, **stopping))
+    else:
+        kind = "single"
+        call = (abc_optimize, args, dict(rng=seed, **stopping))
+
+    # Everything needed to turn the raw solver output into an AbcResult — here or when a job finishes
+    context = dict(
+        kind=kind, compute=compute, cache_key=key if cacheable else None,
+        options=dict(solver=solver, objective=objective, seed=seed, measured=measured,
+                     max_cycles=int(max_cycles), fit_age=fit_age, free=space.free,
+                     weighted=objective == MULTI),
+    )
+
+    raw     = None
+    profile = None
+    if kind == "analytic":
+        raw = solve_closest(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, prior)
+    elif background:
+        fn, fn_args, fn_kwargs = call
+        raw = cache.get(key) if cacheable else None
+        if raw is None:
+            st.session_state[JOB_KEY] = jobs.submit(kind, fn, *fn_args, context=context,
+                                                    total=int(max_cycles), **fn_kwargs)
+            st.rerun()
+    else:
+        # Weighted-objective restarts share one stacked colony, so stats cover them all
+        run_stats = RunStats() if collect_stats and kind != "ensemble" else None
+        profile   = {} if profiling else None
+
+        def run_cached(fn, *fn_args, **fn_kwargs):
+            if profiling:
+                result, report = profile_call(fn, *fn_args, cprofile=capture_cprofile,
+                                              trace_memory=capture_memory, **fn_kwargs)
+                profile.update(report)
+                return result
+            if not cacheable:
+                return fn(*fn_args, **fn_kwargs)
+            return cache.get_or_compute(key, fn, *fn_args, **fn_kwargs)
+
+        # Single colonies stream their convergence into a live chart instead of a spinner;
+        # redraws are throttled so the browser is not flooded on fast runs
+        live         = st.empty()
+        live_history = []
+        last_draw    = [0.0]
+        error_label  = "Weighted Relative Error" if objective == MULTI else "Absolute Error — Pmax (W)"
+
+        def stream_progress(cycles_run, best):
+            live_history.append(float(best.min()))
+            now = time.perf_counter()
+            if now - last_draw[0] >= 0.25:
+                last_draw[0] = now
+                live.vega_lite_chart(convergence_chart(live_history),
+                                     convergence_spec(f"{error_label} — cycle {cycles_run} of {int(max_cycles)}"))
+
+        fn, fn_args, fn_kwargs = call
+        if kind == "ensemble":
+            # Restarts run in worker processes, which cannot report back per cycle
+            with st.spinner("Bees are minimizing the error between calculated and measured Pmax..."):
+                raw = run_cached(fn, *fn_args, **fn_kwargs)
+        else:
+            raw = run_cached(fn, *fn_args, stats=run_stats, progress=stream_progress, **fn_kwargs)
+        live.empty()
+
+        if run_stats is not None:
+            profile["stats"] = run_stats.summary()
 
-    BG_opt, dirt_opt, Fmm_opt, Fshade_opt = best_sol
-    
     # --- SAVE RESULTS FOR PAGE 3 ---
-    st.session_state["abc_best_pmax"] = best_pmax
-    st.session_state["abc_best_sol"] = best_sol
-    st.session_state["abc_error_history"] = error_history
-    st.session_state["abc_pmax_meas"] = Pmax_meas
-    
-    # Optional (for full table in Page 3)
-    st.session_state["abc_vmp_meas"] = Vmp_meas
-    st.session_state["abc_imp_meas"] = Imp_meas
-    st.session_state["abc_voc_meas"] = Voc_meas
-    st.session_state["abc_isc_meas"] = Isc_meas
-
-    G_front    = Fg * 1000
-    G_total    = G_front * (1 + BG_opt)
-    Fg_eff     = G_total / 1000
-    Fclean_opt = (100 - dirt_opt) / 100
-
-    abs_error = abs(best_pmax - Pmax_meas)
-    pct_error = (abs_error / Pmax_meas) * 100 if Pmax_meas != 0 else 0
-
-    Pmax_calc_original = st.session_state.get("Pmax_calculated", None)
+    if raw is not None:
+        shown = abc_result_from_run(compute, kind, raw, profile=profile, **context["options"])
+        st.session_state[ABC_KEY] = shown
+
+# ------------------ RESULTS ------------------
+if shown is not None:
+    r = shown
+    view = r.view
+    BG_opt, dirt_opt, Fmm_opt, Fshade_opt = r.best_sol
+    Ftemp      = r.Ftemp
+    G_front    = r.G_front
+    Fg_eff     = r.Fg_eff
+    Fclean_opt = r.Fclean
+    best_pmax  = r.best_pmax
+    Pmax_meas  = r.measured.Pmax
+    profile    = r.profile
+
+    # Derived metrics and table come from the result's view, as on the Results page
+    G_total   = view.G_total
+    abs_error = view.abs_error
+    pct_error = view.pct_error
+
+    Pmax_calc_original = r.compute.outputs.Pmax
 
     st.markdown("---")
     st.subheader("🏆 Optimization Results")
+    render_start = time.perf_counter()
+    if r.solver == ANALYTIC:
+        st.info("📐 Closed-form projection onto the exact-match set — no iterations.")
+    else:
+        st.caption(f"Random seed: {r.seed} — enter it above to reproduce this run.")
+        if r.job_id is not None:
+            st.caption(f"Loaded from background job `{r.job_id}`.")
+        st.caption("Result cache: {hits} hits / {misses} misses ({size} entries)".format(**cache.stats()))
+        st.info(f"⏹ Stopped at cycle {r.stop_cycle} of {r.max_cycles}: {STOP_REASONS[r.stop_reason]}.")
 
     # --- Optimal factors ---
     st.markdown("#### Optimized Controllable Factors")
@@ -225,6 +451,26 @@ if st.button("🐝 Run ABC Optimization"):
     col3.metric("Optimal Fmm",    f"{Fmm_opt:.4f}")
     col4.metric("Optimal Fshade", f"{Fshade_opt:.4f}")
 
+    if r.fitted_operating_point:
+        col5, col6, col7 = st.columns(3)
+        col5.metric("Tcell (°C)" + (" (fitted)" if "Tcell" in r.free else " (fixed)"),        f"{r.Tcell:.2f}")
+        col6.metric("G_front (W/m²)" + (" (fitted)" if "G_front" in r.free else " (fixed)"), f"{G_front:.2f}")
+        col7.metric("Fage" + (" (fitted)" if r.fitted_age else " (fixed)"), f"{r.Fage:.4f}")
+
+    # --- Restart spread ---
+    if r.restart_solutions is not None:
+        spread = np.std(r.restart_solutions, axis=0)
+        unit   = "(weighted relative)" if r.weighted else "W"
+        st.markdown(f"#### Spread Across {len(r.restart_errors)} Restarts (std. dev.)")
+        columns = st.columns(len(spread))
+        for col, label, value in zip(columns, ["BG", "Dirt %", "Fmm", "Fshade", "Tcell", "G_front", "Fage"], spread):
+            col.metric(label, f"{value:.4f}")
+        st.caption(
+            f"Final error per restart: min {min(r.restart_errors):.4f} {unit}, "
+            f"max {max(r.restart_errors):.4f} {unit}. A large factor spread with small errors "
+            "means the measurement alone does not pin that factor down."
+        )
+
     # --- Pmax comparison ---
     st.markdown("#### Pmax Comparison")
     col_a, col_b, col_c, col_d = st.columns(4)
@@ -234,58 +480,45 @@ if st.button("🐝 Run ABC Optimization"):
     col_d.metric("Error (%)",          f"{pct_error:.4f} %")
 
     # --- Before vs after ABC ---
-    if Pmax_calc_original is not None:
-        orig_error     = abs(Pmax_calc_original - Pmax_meas)
-        orig_pct_error = (orig_error / Pmax_meas) * 100 if Pmax_meas != 0 else 0
-        st.markdown("#### Before vs After ABC")
-        col_e, col_f, col_g, col_h = st.columns(4)
-        col_e.metric("Computed — Pmax (W)",    f"{Pmax_calc_original:.4f}")
-        col_f.metric("Computed — Error (W)",   f"{orig_error:.4f}")
-        col_g.metric("Optimized using ABC  — Pmax (W)",    f"{best_pmax:.4f}")
-        col_h.metric("Optimized using ABC  — Error (W)",   f"{abs_error:.4f}",
-                     delta=f"{abs_error - orig_error:.4f} W", delta_color="inverse")
+    orig_error = view.orig_error
+    st.markdown("#### Before vs After ABC")
+    col_e, col_f, col_g, col_h = st.columns(4)
+    col_e.metric("Computed — Pmax (W)",    f"{Pmax_calc_original:.4f}")
+    col_f.metric("Computed — Error (W)",   f"{orig_error:.4f}")
+    col_g.metric("Optimized using ABC  — Pmax (W)",    f"{best_pmax:.4f}")
+    col_h.metric("Optimized using ABC  — Error (W)",   f"{abs_error:.4f}",
+                 delta=f"{abs_error - orig_error:.4f} W", delta_color="inverse")
 
     # --- Full output table ---
     st.markdown("#### 📊 Measured vs Computated — All Five Outputs")
 
-    rows = [("Pmax (W)", Pmax_meas, best_pmax)]
-
-    if Isc_stc:
-        Isc_calc = Isc_stc * Ftemp_Isc * Fg_eff * Fclean_opt * Fshade_opt
-        rows.append(("Isc (A)", Isc_meas, Isc_calc))
-    if Imp_stc:
-        Imp_calc = Imp_stc * Ftemp_Imp * Fg_eff * Fclean_opt * Fshade_opt
-        rows.append(("Imp (A)", Imp_meas, Imp_calc))
-    if Voc_stc:
-        Voc_calc = Voc_stc * Ftemp_Voc
-        rows.append(("Voc (V)", Voc_meas, Voc_calc))
-    if Vmp_stc:
-        Vmp_calc = Vmp_stc * Ftemp_Vmp
-        rows.append(("Vmp (V)", Vmp_meas, Vmp_calc))
-
     header = st.columns(4)
     header[0].markdown("**Parameter**")
     header[1].markdown("**Measured**")
     header[2].markdown("**Computed**")
     header[3].markdown("**Error (%)**")
 
-    for param, meas, calc in rows:
-        err_p = abs(calc - meas) / meas * 100 if meas != 0 else 0
+    for param, meas, value, err_p in zip(*view.table.values()):
         c1, c2, c3, c4 = st.columns(4)
         c1.write(param)
         c2.write(f"{meas:.4f}")
-        c3.write(f"{calc:.4f}")
+        c3.write(f"{value:.4f}")
         c4.write(f"{err_p:.4f} %")
 
     # --- Steps ---
     st.markdown("#### 🧮 Optimized Calculation Steps")
-    st.write(f"1️⃣ G_front (from Fg) = {Fg:.4f} × 1000 = **{G_front:.2f} W/m²**")
+    if not r.fitted_operating_point:
+        st.write(f"1️⃣ G_front (from Fg) = {r.compute.Fg:.4f} × 1000 = **{G_front:.2f} W/m²**")
+    else:
+        st.write(f"1️⃣ G_front ({'fitted' if 'G_front' in r.free else 'fixed'}) = **{G_front:.2f} W/m²**, "
+                 f"Tcell ({'fitted' if 'Tcell' in r.free else 'fixed'}) = **{r.Tcell:.2f} °C** "
+                 f"→ Ftemp_Pmp = **{Ftemp.Pmp:.4f}**")
     st.write(f"2️⃣ Total irradiance with optimal BG = {G_front:.2f} × (1 + {BG_opt:.4f}) = **{G_total:.2f} W/m²**")
     st.write(f"3️⃣ Effective Fg = {G_total:.2f} / 1000 = **{Fg_eff:.4f}**")
     st.write(f"4️⃣ Fclean = (100 − {dirt_opt:.4f}) / 100 = **{Fclean_opt:.4f}**")
     st.write(
-        f"5️⃣ Pmax = {Pmax_stc:.2f} × {Ftemp_P:.4f} × {Fg_eff:.4f} × "
-        f"{Fclean_opt:.4f} × {Fshade_opt:.4f} × {Fmm_opt:.4f} × {Fage:.4f} "
+        f"5️⃣ Pmax = {r.compute.stc.Pmax:.2f} × {Ftemp.Pmp:.4f} × {Fg_eff:.4f} × "
+        f"{Fclean_opt:.4f} × {Fshade_opt:.4f} × {Fmm_opt:.4f} × {r.Fage:.4f} "
         f"= **{best_pmax:.4f} W**"
     )
     st.write(
@@ -293,6 +526,71 @@ if st.button("🐝 Run ABC Optimization"):
         f"= **{abs_error:.4f} W ({pct_error:.4f}%)**"
     )
     st.info(
-        "ABC tuned BG, dirt, Fmm, and Fshade to minimise |Pmax_calc − Pmax_measured|. "
-        "Voc and Vmp are temperature-only and are not affected by the optimized factors."
+        fit_summary(r)
+        + (" Voc and Vmp are temperature-only and are not affected by the optimized factors."
+           if "Tcell" not in r.free else "")
+    )
+
+    if profile is not None:
+        profile["render_time"] = time.perf_counter() - render_start
+        st.caption("Profiling data captured — see the **Results & Graphs** page.")
+
+
+# ------------------ OPTIMIZER COMPARISON ------------------
+st.markdown("---")
+st.subheader("⚖️ Optimizer Comparison")
+st.markdown(
+    "Run every optimizer on identical copies of the fit above (same objective, search space and seed) "
+    "and compare how many objective evaluations each needs to reach the tolerance, and its wall time. "
+    "ABC, DE and PSO use the number of bees as their population; ABC also uses the scout limit."
+)
+
+col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+compare_with   = col_c1.multiselect("Methods", list(METHODS), default=list(METHODS))
+compare_trials = col_c2.number_input("Problems (random starts)", min_value=1, max_value=1000, value=20, step=1)
+compare_tol    = col_c3.number_input("Tolerance (W)", min_value=0.0, value=0.01, format="%.6f",
+                                     help="For the weighted objective this is taken relative to the measured Pmax.")
+compare_budget = col_c4.number_input("Evaluation Budget per Problem", min_value=100, max_value=1_000_000,
+                                     value=10_000, step=1000)
+
+if st.button("⚖️ Compare Optimizers", disabled=not compare_with):
+    trials = int(compare_trials)
+    if objective == MULTI:
+        compare_objective, _, _ = space_objective(
+            space, Outputs(*(np.full(trials, m) for m in measured)), module_stc, temp_coeffs, weights,
+        )
+        tol = compare_tol / Pmax_meas
+        error_label = "Weighted Relative Error"
+    else:
+        compare_objective, _, _ = space_objective(space, np.full(trials, Pmax_meas), module_stc, temp_coeffs)
+        tol = compare_tol
+        error_label = "Absolute Error — Pmax (W)"
+
+    options = {name: {option: int(num_bees)} for name, option in POPULATION_OPTION.items()}
+    options["ABC"]["limit"] = int(limit)
+    with st.spinner("Running every optimizer on the same problems..."):
+        comparison = compare_methods(
+            compare_objective, space.box, trials, tol, int(compare_budget), methods=compare_with,
+            options=options,
+            seed=int(seed_input) if seed_input is not None else 0,
+        )
+
+    st.dataframe(
+        {
+            "Method":              [c.method for c in comparison],
+            "Solved (%)":          [100 * c.solved for c in comparison],
+            "Median Evals to Tol": [c.evals_to_tol for c in comparison],
+            "Median Final Error":  [c.final_error for c in comparison],
+            "Total Evals":         [c.evals for c in comparison],
+            "Wall Time (s)":       [c.wall_time for c in comparison],
+        },
+        hide_index=True,
     )
+    solved = [c for c in comparison if c.solved > 0]
+    if solved:
+        cheapest = min(solved, key=lambda c: (-c.solved, c.evals_to_tol))
+        st.success(f"🏁 Fewest evaluations to tolerance: **{cheapest.method}** "
+                   f"({cheapest.evals_to_tol:,.0f} median, {100 * cheapest.solved:.0f}% solved).")
+    else:
+        st.warning("No method reached the tolerance within the budget.")
+    st.vega_lite_chart(comparison_chart(comparison), comparison_spec(f"Median {error_label}"))
\ No newline at end of file
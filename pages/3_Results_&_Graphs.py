@@ -1,20 +1,30 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
+
+from bifacial_pv.charts import convergence_spec
+from bifacial_pv.jobs import FINISHED, default_manager
+from bifacial_pv.session import ABC_KEY, JOB_KEY, AbcResult, abc_result_from_job, fit_summary, get_result
+from bifacial_pv.space import FACTORS, VARIABLES
 
 st.title("📈 ABC Optimization — Results & Graphs")
 st.markdown("Full breakdown of optimization results, parameter comparison, and convergence graphs.")
 st.markdown("---")
 
 # ------------------ CHECK SESSION STATE ------------------
-required_keys = [
-    "abc_best_pmax", "abc_best_sol", "abc_error_history",
-    "abc_pmax_meas", "Pmax_calculated", "Pmax_STC",
-    "Ftemp_P", "Fg", "Fage",
-]
-missing = [k for k in required_keys if k not in st.session_state]
-
-if missing:
+# A background job attached on the ABC page lands here as soon as it finishes
+job_id = st.session_state.get(JOB_KEY)
+if job_id is not None:
+    jobs = default_manager()
+    info = jobs.poll(job_id)
+    if info is not None and info.status == "done":
+        st.session_state[ABC_KEY] = abc_result_from_job(jobs, job_id)
+        del st.session_state[JOB_KEY]
+    elif info is not None and info.status not in FINISHED:
+        st.info(f"⏳ Background job `{job_id}` is {info.status} (cycle {info.cycle} of {info.total}). "
+                "Its results replace the ones below when it finishes.")
+
+result = get_result(st.session_state, ABC_KEY, AbcResult)
+
+if result is None:
     st.warning(
         "⚠️ No ABC results found. "
         "Please run the **ABC Optimizer page** first and click **Run ABC Optimization**."
@@ -22,43 +32,30 @@ if missing:
     st.stop()
 
 # ------------------ PULL VALUES ------------------
-best_pmax     = st.session_state["abc_best_pmax"]
-best_sol      = st.session_state["abc_best_sol"]
-error_history = st.session_state["abc_error_history"]
-Pmax_meas     = st.session_state["abc_pmax_meas"]
-Pmax_orig     = st.session_state["Pmax_calculated"]
-Pmax_stc      = st.session_state["Pmax_STC"]
-Ftemp_P       = st.session_state["Ftemp_P"]
-Fg            = st.session_state["Fg"]
-Fage          = st.session_state["Fage"]
-
-Ftemp_Isc = st.session_state.get("Ftemp_Isc", 1.0)
-Ftemp_Imp = st.session_state.get("Ftemp_Imp", 1.0)
-Ftemp_Voc = st.session_state.get("Ftemp_Voc", 1.0)
-Ftemp_Vmp = st.session_state.get("Ftemp_Vmp", 1.0)
-Isc_stc   = st.session_state.get("Isc_stc", None)
-Imp_stc   = st.session_state.get("Imp_stc", None)
-Voc_stc   = st.session_state.get("Voc_stc", None)
-Vmp_stc   = st.session_state.get("Vmp_stc", None)
-
-Pmax_meas_val = st.session_state.get("abc_pmax_meas", 0.0)
-Vmp_meas      = st.session_state.get("abc_vmp_meas",  0.0)
-Imp_meas      = st.session_state.get("abc_imp_meas",  0.0)
-Voc_meas      = st.session_state.get("abc_voc_meas",  0.0)
-Isc_meas      = st.session_state.get("abc_isc_meas",  0.0)
-
-BG_opt, dirt_opt, Fmm_opt, Fshade_opt = best_sol
-
-G_front    = Fg * 1000
-G_total    = G_front * (1 + BG_opt)
-Fg_eff     = G_total / 1000
-Fclean_opt = (100 - dirt_opt) / 100
-
-abs_error  = abs(best_pmax - Pmax_meas)
-pct_error  = (abs_error / Pmax_meas * 100) if Pmax_meas != 0 else 0
-orig_error = abs(Pmax_orig - Pmax_meas)
-orig_pct   = (orig_error / Pmax_meas * 100) if Pmax_meas != 0 else 0
-improvement = orig_error - abs_error
+# Everything below is read from the stored result and its prebuilt view;
+# reruns and page switches do no arithmetic beyond string formatting.
+compute       = result.compute
+view          = result.view
+best_pmax     = result.best_pmax
+measured      = result.measured
+Pmax_meas     = measured.Pmax
+Pmax_orig     = compute.outputs.Pmax
+Pmax_stc      = compute.stc.Pmax
+Fg            = compute.Fg
+Ftemp_P       = result.Ftemp.Pmp
+Fage          = result.Fage
+G_front       = result.G_front
+Fg_eff        = result.Fg_eff
+Fclean_opt    = result.Fclean
+fitted        = result.fitted_operating_point
+weighted      = result.weighted
+
+BG_opt, dirt_opt, Fmm_opt, Fshade_opt = result.best_sol
+
+G_total    = view.G_total
+abs_error  = view.abs_error
+pct_error  = view.pct_error
+orig_error = view.orig_error
 
 # ------------------ SECTION 1: OPTIMIZED FACTORS ------------------
 st.subheader("🔧 Optimized Controllable Factors")
@@ -69,6 +66,12 @@ col2.metric("Optimal Dirt (%)",     f"{dirt_opt:.4f}")
 col3.metric("Optimal Fmm",         f"{Fmm_opt:.4f}")
 col4.metric("Optimal Fshade",      f"{Fshade_opt:.4f}")
 
+if fitted:
+    col5, col6, col7 = st.columns(3)
+    col5.metric("Tcell (°C)" + (" (fitted)" if "Tcell" in result.free else " (fixed)"),        f"{result.Tcell:.2f}")
+    col6.metric("G_front (W/m²)" + (" (fitted)" if "G_front" in result.free else " (fixed)"), f"{G_front:.2f}")
+    col7.metric("Fage" + (" (fitted)" if result.fitted_age else " (fixed)"),                   f"{Fage:.4f}")
+
 st.markdown("---")
 
 # ------------------ SECTION 2: PMAX COMPARISON ------------------
@@ -97,46 +100,40 @@ st.markdown("---")
 # ------------------ SECTION 4: ALL FIVE OUTPUTS TABLE ------------------
 st.subheader("📋 Measured vs Calculated — All Five Outputs")
 
-rows = [("Pmax (W)", Pmax_meas, best_pmax)]
-
-if Isc_stc:
-    Isc_calc = Isc_stc * Ftemp_Isc * Fg_eff * Fclean_opt * Fshade_opt
-    rows.append(("Isc (A)", Isc_meas, Isc_calc))
-if Imp_stc:
-    Imp_calc = Imp_stc * Ftemp_Imp * Fg_eff * Fclean_opt * Fshade_opt
-    rows.append(("Imp (A)", Imp_meas, Imp_calc))
-if Voc_stc:
-    Voc_calc = Voc_stc * Ftemp_Voc
-    rows.append(("Voc (V)", Voc_meas, Voc_calc))
-if Vmp_stc:
-    Vmp_calc = Vmp_stc * Ftemp_Vmp
-    rows.append(("Vmp (V)", Vmp_meas, Vmp_calc))
-
 header = st.columns(4)
 header[0].markdown("**Parameter**")
 header[1].markdown("**Measured**")
 header[2].markdown("**Calculated**")
 header[3].markdown("**Error (%)**")
 
-for param, meas, calc in rows:
-    err_p = abs(calc - meas) / meas * 100 if meas != 0 else 0
+for param, meas, value, err_p in zip(*view.table.values()):
     c1, c2, c3, c4 = st.columns(4)
     c1.write(param)
     c2.write(f"{meas:.4f}")
-    c3.write(f"{calc:.4f}")
+    c3.write(f"{value:.4f}")
     c4.write(f"{err_p:.4f} %")
 
-st.info(
-    "Voc and Vmp errors reflect temperature correction only — "
-    "they are not affected by the optimized factors (BG, dirt, Fmm, Fshade)."
-)
+if not fitted and not weighted:
+    st.info(
+        "Voc and Vmp errors reflect temperature correction only — "
+        "they are not affected by the optimized factors (BG, dirt, Fmm, Fshade)."
+    )
+elif not weighted:
+    st.info("Voc and Vmp follow the fitted operating point; only Pmax was part of the objective.")
+else:
+    st.info("Voc and Vmp follow the fitted operating point; all measured outputs were part of the objective.")
 
 st.markdown("---")
 
 # ------------------ SECTION 5: CALCULATION STEPS ------------------
 st.subheader("🧮 Optimized Calculation Steps")
 
-st.write(f"1️⃣ G_front (from Fg) = {Fg:.4f} × 1000 = **{G_front:.2f} W/m²**")
+if not fitted:
+    st.write(f"1️⃣ G_front (from Fg) = {Fg:.4f} × 1000 = **{G_front:.2f} W/m²**")
+else:
+    st.write(f"1️⃣ G_front ({'fitted' if 'G_front' in result.free else 'fixed'}) = **{G_front:.2f} W/m²**, "
+             f"Tcell ({'fitted' if 'Tcell' in result.free else 'fixed'}) = **{result.Tcell:.2f} °C** "
+             f"→ Ftemp_Pmp = **{Ftemp_P:.4f}**")
 st.write(f"2️⃣ Total irradiance with optimal BG = {G_front:.2f} × (1 + {BG_opt:.4f}) = **{G_total:.2f} W/m²**")
 st.write(f"3️⃣ Effective Fg = {G_total:.2f} / 1000 = **{Fg_eff:.4f}**")
 st.write(f"4️⃣ Fclean = (100 − {dirt_opt:.4f}) / 100 = **{Fclean_opt:.4f}**")
@@ -155,58 +152,96 @@ st.markdown("---")
 # ------------------ SECTION 6: GRAPHS ------------------
 st.subheader("📈 Graphs")
 
-cycles = list(range(1, len(error_history) + 1))
-
 col_g1, col_g2 = st.columns(2)
 
 # ---- Graph 1: Error Convergence ----
 with col_g1:
     st.markdown("#### Error Convergence History")
-    st.line_chart({"Absolute Error — Pmax (W)": error_history})
-    st.caption(
-        "Each point = best |Pmax_calc − Pmax_meas| found up to that cycle. "
-        "A flat tail means the algorithm has converged."
-    )
+    if not weighted:
+        st.vega_lite_chart(view.convergence, convergence_spec("Absolute Error — Pmax (W)"))
+        st.caption(
+            "Each point = best |Pmax_calc − Pmax_meas| found up to that cycle. "
+            "A flat tail means the algorithm has converged. Log scale; long runs are downsampled "
+            "keeping each segment's minimum and maximum."
+        )
+    else:
+        st.vega_lite_chart(view.convergence, convergence_spec("Weighted Relative Error — All Outputs"))
+        st.caption(
+            "Each point = best weighted mean relative error over the measured outputs found up to "
+            "that cycle. A flat tail means the algorithm has converged. Log scale; long runs are "
+            "downsampled keeping each segment's minimum and maximum."
+        )
 
 # ---- Graph 2: Pmax Bar Comparison ----
 with col_g2:
     st.markdown("#### Pmax — Measured vs Before/After ABC")
-    bar_data = {
-        "Pmax (W)": [Pmax_meas, Pmax_orig, best_pmax]
-    }
-    import pandas as pd
-    df_bar = pd.DataFrame(bar_data, index=["Measured", "Before ABC", "After ABC"])
-    st.bar_chart(df_bar)
+    st.bar_chart(view.pmax_chart, x="Case")
     st.caption("Compares the measured Pmax against the original calculated value and the ABC-optimized value.")
 
-# ---- Graph 3 & 4 (only if more than Pmax) ----
-if len(rows) > 1:
-    col_g3, col_g4 = st.columns(2)
-
-    # ---- Graph 3: Error % per parameter ----
-    with col_g3:
-        st.markdown("#### Error (%) per Output Parameter")
-        params = [r[0] for r in rows]
-        errors = [abs((r[2] - r[1]) / r[1] * 100) if r[1] != 0 else 0 for r in rows]
-        df_err = pd.DataFrame({"Error (%)": errors}, index=params)
-        st.bar_chart(df_err)
-        st.caption("Lower is better. Green threshold = 2%, amber = 5%.")
-
-    # ---- Graph 4: Measured vs Calculated per parameter ----
-    with col_g4:
-        st.markdown("#### Measured vs Calculated — All Parameters")
-        df_compare = pd.DataFrame(
-            {
-                "Measured":   [r[1] for r in rows],
-                "Calculated": [r[2] for r in rows],
-            },
-            index=[r[0] for r in rows]
-        )
-        st.bar_chart(df_compare)
-        st.caption("Side-by-side comparison of measured field values vs ABC-optimized calculated values.")
+col_g3, col_g4 = st.columns(2)
+
+# ---- Graph 3: Error % per parameter ----
+with col_g3:
+    st.markdown("#### Error (%) per Output Parameter")
+    st.bar_chart(view.table, x="Parameter", y="Error (%)")
+    st.caption("Lower is better. Green threshold = 2%, amber = 5%.")
+
+# ---- Graph 4: Measured vs Calculated per parameter ----
+with col_g4:
+    st.markdown("#### Measured vs Calculated — All Parameters")
+    st.bar_chart(view.table, x="Parameter", y=["Measured", "Calculated"])
+    st.caption("Side-by-side comparison of measured field values vs ABC-optimized calculated values.")
+
+# ------------------ SECTION 7: PROFILING ------------------
+profile = result.profile
+
+if profile:
+    st.markdown("---")
+    st.subheader("🔬 Profiling")
+
+    run_stats = profile.get("stats")
+    if run_stats:
+        col_p1, col_p2, col_p3, col_p4 = st.columns(4)
+        col_p1.metric("Optimizer Time (s)",    f"{run_stats['total_time']:.4f}")
+        col_p2.metric("Objective Evaluations", f"{run_stats['objective_evals']:,}")
+        col_p3.metric("Evaluations / s",       f"{run_stats['evals_per_sec']:,.0f}")
+        col_p4.metric("Scout Resets",          f"{run_stats['scout_resets']}")
+
+        col_g5, col_g6 = st.columns(2)
+        with col_g5:
+            st.markdown("#### Time per Phase (s)")
+            phases = dict(run_stats["phase_time"])
+            if "render_time" in profile:
+                phases["render"] = profile["render_time"]
+            st.bar_chart({"Phase": list(phases), "Time (s)": list(phases.values())}, x="Phase")
+            st.caption(f"{run_stats['objective_calls']} batched objective calls.")
+        with col_g6:
+            st.markdown("#### Acceptance Rate per Cycle")
+            st.line_chart({
+                "Employed": run_stats["employed_acceptance"],
+                "Onlooker": run_stats["onlooker_acceptance"],
+            })
+            st.caption("Share of candidate solutions that replaced their food source.")
+
+        st.markdown("#### Scout Resets per Cycle")
+        st.line_chart({"Scouts": run_stats["scouts_per_cycle"]})
+    elif "render_time" in profile:
+        st.metric("Result Rendering (s)", f"{profile['render_time']:.4f}")
+
+    if "peak_mem_mb" in profile:
+        st.markdown("#### tracemalloc")
+        st.metric("Peak Traced Memory (MB)", f"{profile['peak_mem_mb']:.3f}")
+        st.code("\n".join(profile["top_allocations"]), language=None)
+
+    if "cprofile" in profile:
+        st.markdown("#### cProfile (cumulative time)")
+        st.code(profile["cprofile"], language=None)
 
 st.markdown("---")
-st.info(
-    "ABC tuned BG, dirt, Fmm, and Fshade to minimise |Pmax_calc − Pmax_measured|. "
-    "All other factors were fixed from the Computational Tool."
-)
+if result.free == FACTORS and not weighted:
+    fixed = " All other factors were fixed from the Computational Tool."
+elif len(result.free) < len(VARIABLES):
+    fixed = " All other variables were fixed."
+else:
+    fixed = ""
+st.info(fit_summary(result) + fixed)
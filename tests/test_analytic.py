@@ -0,0 +1,65 @@
+"""Closed-form solver: exact matches when reachable, box corners when not."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.analytic import DEFAULT_PRIOR, U_HI, U_LO, _to_log, reachable_range, solve_closest
+from bifacial_pv.colony import BOUNDS, compute_pmax
+
+FIXED = (580.0, 0.95, 0.8, 0.985)
+
+
+def test_reachable_targets_are_matched_exactly():
+    lo, hi = reachable_range(*FIXED)
+    targets = np.linspace(lo, hi, 201)
+    fit = solve_closest(*FIXED, targets)
+
+    assert fit.reachable.all()
+    assert np.allclose(fit.pmax, targets, rtol=1e-12, atol=0)
+    assert np.all(fit.error <= 1e-9 * targets)
+    assert np.all((fit.solution >= BOUNDS[:, 0]) & (fit.solution <= BOUNDS[:, 1]))
+
+
+def test_prior_that_already_matches_is_returned():
+    target = compute_pmax(np.array(DEFAULT_PRIOR), *FIXED)
+    fit = solve_closest(*FIXED, target)
+    assert np.allclose(fit.solution[0], DEFAULT_PRIOR, rtol=1e-12)
+
+
+def test_closest_to_prior_among_exact_matches():
+    fit = solve_closest(*FIXED, 420.0)
+
+    # Random exact matches: draw BG, dirt and Fmm, solve for Fshade, keep those inside the box
+    rng = np.random.default_rng(0)
+    X = rng.uniform(BOUNDS[:, 0], BOUNDS[:, 1], size=(100_000, 4))
+    X[:, 3] = 1.0
+    X[:, 3] = 420.0 / compute_pmax(X, *FIXED)
+    X = X[(X[:, 3] >= BOUNDS[3, 0]) & (X[:, 3] <= BOUNDS[3, 1])]
+    assert len(X) > 1000
+
+    def distance(X):
+        return (((_to_log(X) - _to_log(DEFAULT_PRIOR)) / (U_HI - U_LO)) ** 2).sum(axis=-1)
+
+    assert distance(fit.solution[0]) <= distance(X).min()
+
+
+@pytest.mark.parametrize("factor, corner", [(0.5, 0), (2.0, 1)])
+def test_unreachable_targets_project_onto_the_bounds(factor, corner):
+    lo, hi = reachable_range(*FIXED)
+    target = (lo if corner == 0 else hi) * factor
+    fit = solve_closest(*FIXED, target)
+
+    # Lowest Pmax: no rear gain, most dirt, worst mismatch and shading; highest: the opposite
+    expected = np.array([BOUNDS[0, corner], BOUNDS[1, 1 - corner], BOUNDS[2, corner], BOUNDS[3, corner]])
+    assert not fit.reachable[0]
+    assert np.allclose(fit.solution[0], expected, rtol=1e-12)
+    assert fit.pmax[0] == pytest.approx(lo if corner == 0 else hi, rel=1e-12)
+    assert fit.error[0] == pytest.approx(abs(target - fit.pmax[0]))
+
+
+def test_batch_broadcasts_and_mixes_reachability():
+    lo, hi = reachable_range(*FIXED)
+    fit = solve_closest(*FIXED, [lo / 2, (lo + hi) / 2, hi * 2], prior=np.tile(DEFAULT_PRIOR, (3, 1)))
+    assert fit.reachable.tolist() == [False, True, False]
+    assert fit.solution.shape == (3, 4)
+    assert fit.error[1] <= 1e-9 * fit.pmax[1]
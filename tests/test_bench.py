@@ -0,0 +1,70 @@
+"""Baseline comparison of the benchmark suite."""
+
+import json
+
+import pytest
+
+from bifacial_pv import bench
+
+RESULT = {"wall_time": 1.0, "throughput": 1000.0, "peak_mem_mb": 10.0, "final_error": 0.1}
+
+
+def scaled(**factors):
+    return {**RESULT, **{k: RESULT[k] * f for k, f in factors.items()}}
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    bench.save_baseline(path, {"case": RESULT}, quick=True)
+    return path
+
+
+def test_within_tolerance_is_not_a_regression(baseline):
+    current = scaled(wall_time=1.15, throughput=1 / 1.15, peak_mem_mb=1.15, final_error=10)
+    assert bench.compare({"case": current}, baseline, 0.2, quick=True) == []
+
+
+@pytest.mark.parametrize("metric, factor, ratio", [
+    ("wall_time", 1.5, 1.5),
+    ("throughput", 0.5, 2.0),
+    ("peak_mem_mb", 3.0, 3.0),
+])
+def test_each_metric_is_compared(baseline, metric, factor, ratio):
+    current = scaled(**{metric: factor})
+    [(name, m, base, cur, r)] = bench.compare({"case": current, "new_case": RESULT}, baseline, 0.2, quick=True)
+    assert (name, m, base, cur) == ("case", metric, RESULT[metric], current[metric])
+    assert r == pytest.approx(ratio)
+
+
+def test_quick_flag_must_match(baseline):
+    with pytest.raises(ValueError, match="quick=True"):
+        bench.compare({"case": RESULT}, baseline, quick=False)
+
+
+def test_baseline_without_quick_flag_is_refused(tmp_path):
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"environment": bench.environment(), "results": {"case": RESULT}}))
+    with pytest.raises(ValueError, match="quick=None"):
+        bench.compare({"case": RESULT}, str(path))
+
+
+def test_environment_changes(baseline):
+    assert bench.environment_changes(baseline) == []
+    with open(baseline) as f:
+        data = json.load(f)
+    data["environment"]["numpy"] = "0.0"
+    with open(baseline, "w") as f:
+        json.dump(data, f)
+    [change] = bench.environment_changes(baseline)
+    assert change.startswith("numpy: 0.0 → ")
+
+
+def test_dimension_scaling_cases():
+    cases = bench.suite(quick=True)
+    names = [name for name in cases if name.startswith("scale_dim_")]
+    assert names == [f"scale_dim_{d}" for d in range(1, 8)]
+    for name in ("scale_dim_1", "scale_dim_7"):
+        result = bench.run_case(cases[name], repeat=1)
+        assert result["throughput"] > 0
+        assert result["final_error"] >= 0
@@ -0,0 +1,93 @@
+"""ResultCache eviction, expiry and on-disk recovery; make_key stability."""
+
+import os
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bifacial_pv import cache
+from bifacial_pv.cache import ResultCache, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=lambda: now.t))
+    return now
+
+
+def test_make_key_is_stable_across_equal_inputs():
+    key = make_key("abc", 1.0, [1, 2], {"a": 1, "b": np.float64(2.0)}, np.arange(3.0))
+    assert key == make_key("abc", np.float64(1.0), (1, 2), {"b": 2.0, "a": 1}, np.arange(3.0))
+    assert len(key) == 64
+
+
+@pytest.mark.parametrize("other", [
+    ("abc", 1.5, [1, 2], {"a": 1, "b": 2.0}, np.arange(3.0)),
+    ("abc", 1.0, [2, 1], {"a": 1, "b": 2.0}, np.arange(3.0)),
+    ("abc", 1.0, [1, 2], {"a": 1, "b": 2.0}, np.arange(3.0, dtype=np.float32)),
+    ("abc", 1.0, [1, 2], {"a": 1, "b": 2.0}, np.arange(3.0).reshape(3, 1)),
+])
+def test_make_key_differs_for_different_inputs(other):
+    assert make_key("abc", 1.0, [1, 2], {"a": 1, "b": 2.0}, np.arange(3.0)) != make_key(*other)
+
+
+def test_lru_eviction():
+    c = ResultCache(maxsize=2)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1          # a is now most recently used
+    c.put("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert len(c) == 2
+    assert c.stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+def test_ttl_expiry(clock):
+    c = ResultCache(ttl=10)
+    c.put("a", 1)
+    clock.t += 10
+    assert c.get("a") == 1
+    clock.t += 0.5
+    assert c.get("a", "gone") == "gone"
+    assert len(c) == 0
+
+
+def test_ttl_expiry_removes_disk_entry(clock, tmp_path):
+    c = ResultCache(ttl=10, path=tmp_path)
+    c.put("a", 1)
+    clock.t += 11
+    assert c.get("a") is None
+    assert not os.path.exists(tmp_path / "a.pkl")
+
+
+def test_disk_store_survives_restart(tmp_path):
+    ResultCache(path=tmp_path).put("a", {"x": np.arange(3)})
+    value = ResultCache(path=tmp_path).get("a")
+    assert value["x"].tolist() == [0, 1, 2]
+
+
+def test_disk_store_is_bounded(tmp_path):
+    c = ResultCache(maxsize=2, path=tmp_path)
+    for n, key in enumerate("abc"):
+        c.put(key, n)
+        os.utime(tmp_path / f"{key}.pkl", (n, n))
+    assert sorted(os.listdir(tmp_path)) == ["b.pkl", "c.pkl"]
+
+
+@pytest.mark.parametrize("payload", [
+    b"not a pickle",
+    pickle.dumps((1000.0, "value"))[:-3],
+    b"",
+    pickle.dumps("no timestamp"),
+    b"cno_such_module\nThing\n.",
+])
+def test_corrupt_pickle_is_a_miss_and_recomputed(tmp_path, payload):
+    (tmp_path / "a.pkl").write_bytes(payload)
+    c = ResultCache(path=tmp_path)
+    assert c.get("a", "miss") == "miss"
+    assert c.get_or_compute("a", lambda: 42) == 42
+    assert ResultCache(path=tmp_path).get("a") == 42
@@ -0,0 +1,48 @@
+"""Min/max-preserving decimation of long error histories."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.charts import convergence_chart, downsample
+
+
+@pytest.mark.parametrize("n, max_points", [(10_001, 1000), (5000, 7), (1003, 1000), (100_000, 4), (100_000, 5)])
+def test_keeps_extremes_endpoints_and_budget(n, max_points):
+    y = np.random.default_rng(n).normal(size=n).cumsum()
+    y[n // 3] = 1e6      # spike
+    y[n // 2] = -1e6     # dip
+    idx, values = downsample(y, max_points)
+
+    assert len(idx) <= max_points
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert values.tolist() == y[idx].tolist()
+    assert values.max() == y.max() and values.min() == y.min()
+
+
+def test_short_series_is_returned_whole():
+    y = [3.0, 1.0, 2.0]
+    idx, values = downsample(y, 4)
+    assert idx.tolist() == [0, 1, 2]
+    assert values.tolist() == y
+
+
+@pytest.mark.parametrize("max_points", [0, 2, 3])
+def test_budget_below_four_points_is_rejected(max_points):
+    with pytest.raises(ValueError, match="max_points"):
+        downsample(np.arange(10.0), max_points)
+
+
+def test_extremes_of_every_bucket_survive():
+    # Plateaus with one spike each: every spike sits in a different bucket
+    y = np.zeros(1000)
+    spikes = np.arange(50, 1000, 100)
+    y[spikes] = np.arange(1, len(spikes) + 1)
+    idx, _ = downsample(y, 22)
+    assert set(spikes) <= set(idx.tolist())
+
+
+def test_convergence_chart_lifts_exact_matches_for_log_axis():
+    chart = convergence_chart([1.0, 0.1, 0.0, 0.0])
+    assert chart["Cycle"] == [1, 2, 3, 4]
+    assert chart["Error"] == [1.0, 0.1, 0.01, 0.01]
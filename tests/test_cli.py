@@ -0,0 +1,70 @@
+"""Command-line tools and the column-table formats they read and write."""
+
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from bifacial_pv.cli import main
+from bifacial_pv.tables import read_table, write_table
+
+MEASURED = {
+    "Pmax_meas": [400.0, 380.0, 5000.0],
+    "Pmax_STC":  [580.0, 580.0, 580.0],
+    "Ftemp_P":   [0.95, 0.95, 0.95],
+    "Fg":        [0.8, 0.75, 0.8],
+    "Fage":      [0.985, 0.985, 0.985],
+}
+
+
+def test_import_stays_light():
+    code = ("import sys, bifacial_pv.cli; "
+            "print(sorted({'multiprocessing', 'sqlite3', 'bifacial_pv.jobs', 'bifacial_pv.bench'} & set(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("flag", ["--cycles", "--bees", "--chunk"])
+def test_counts_below_one_are_rejected(tmp_path, capsys, flag):
+    with pytest.raises(SystemExit) as exc:
+        main(["fit", str(tmp_path / "in.csv"), "-o", str(tmp_path / "out.csv"), flag, "0"])
+    assert exc.value.code == 2
+    assert "must be at least 1" in capsys.readouterr().err
+
+
+def test_fit_writes_column_directory(tmp_path):
+    write_table(str(tmp_path / "measured.json"), MEASURED)
+    main(["fit", str(tmp_path / "measured.json"), "-o", str(tmp_path / "fits"), "--solver", "analytic"])
+
+    fits = read_table(str(tmp_path / "fits"))
+    assert fits["stop_reason"].tolist() == ["analytic", "analytic", "unreachable"]
+    assert fits["stop_cycle"].dtype == np.int64
+    assert np.allclose(fits["Pmax_fit"][:2], MEASURED["Pmax_meas"][:2])
+
+
+def test_column_directory_round_trip(tmp_path):
+    columns = {"Pmax_meas": np.array([1, 2, 3], dtype=np.float32), "site": np.array(["a", "b", "c"])}
+    write_table(str(tmp_path / "t"), columns)
+    table = read_table(str(tmp_path / "t"))
+    assert table["Pmax_meas"].dtype == np.float64
+    assert table["site"].tolist() == ["a", "b", "c"]
+
+
+def test_column_directory_is_validated(tmp_path):
+    write_table(str(tmp_path / "t"), {"a": [1.0, 2.0]})
+    meta = json.loads((tmp_path / "t" / "meta.json").read_text())
+
+    (tmp_path / "t" / "meta.json").write_text(json.dumps({**meta, "rows": 3}))
+    with pytest.raises(ValueError, match="shape"):
+        read_table(str(tmp_path / "t"))
+
+    (tmp_path / "t" / "meta.json").write_text(json.dumps({**meta, "version": 2}))
+    with pytest.raises(ValueError, match="version"):
+        read_table(str(tmp_path / "t"))
+
+
+def test_ragged_columns_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="shape"):
+        write_table(str(tmp_path / "t"), {"a": [1.0, 2.0], "b": [1.0]})
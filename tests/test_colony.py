@@ -0,0 +1,110 @@
+"""
+The vectorized colony against the original scalar ABC loop.
+
+reference_abc is the per-bee loop abc_optimize used to be, with two
+changes that make it comparable draw for draw: random numbers come from
+the same np.random.Generator in the order the vectorized phases draw
+them (one array per phase), and every candidate of a phase is built
+from the colony as it was at the start of that phase.
+"""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.colony import BOUNDS, abc_optimize, abc_optimize_batch
+
+
+def reference_abc(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, num_bees, max_cycles, limit, seed):
+    rng = np.random.default_rng(seed)
+    P, N, D = len(Pmax_meas), num_bees, len(BOUNDS)
+
+    def objective(p, x):
+        BG, dirt, Fmm, Fshade = x
+        G_front = Fg[p] * 1000
+        G_total = G_front * (1 + BG)
+        Fg_eff  = G_total / 1000
+        Fclean  = (100 - dirt) / 100
+        pmax = Pmax_stc[p] * Ftemp_P[p] * Fg_eff * Fclean * Fshade * Fmm * Fage[p]
+        return abs(pmax - Pmax_meas[p])
+
+    def clip(x):
+        return [max(lo, min(hi, x[j])) for j, (lo, hi) in enumerate(BOUNDS)]
+
+    def phase(bees):
+        # Draw k, j and phi for the whole phase, then build every candidate from the snapshot
+        k = rng.integers(0, N - 1, size=len(bees))
+        j = rng.integers(0, D, size=len(bees))
+        phi = rng.uniform(-1, 1, size=len(bees))
+        snapshot = [[s[:] for s in colony] for colony in solutions]
+        candidates = []
+        for n, (p, i) in enumerate(bees):
+            partner = k[n] + (k[n] >= i)
+            new_sol = snapshot[p][i][:]
+            new_sol[j[n]] = snapshot[p][i][j[n]] + phi[n] * (snapshot[p][i][j[n]] - snapshot[p][partner][j[n]])
+            candidates.append(clip(new_sol))
+        for (p, i), new_sol in zip(bees, candidates):
+            new_fit = objective(p, new_sol)
+            if new_fit < fitness[p][i]:
+                solutions[p][i] = new_sol
+                fitness[p][i]   = new_fit
+                trial[p][i]     = 0
+            else:
+                trial[p][i] += 1
+
+    # ---- Initialise ----
+    start = rng.uniform(BOUNDS[:, 0], BOUNDS[:, 1], size=(P * N, D)).tolist()
+    solutions = [start[p * N:(p + 1) * N] for p in range(P)]
+    fitness   = [[objective(p, s) for s in solutions[p]] for p in range(P)]
+    trial     = [[0] * N for _ in range(P)]
+    error_history = [[] for _ in range(P)]
+
+    for cycle in range(max_cycles):
+        # ---- Employed Bees ----
+        phase([(p, i) for p in range(P) for i in range(N)])
+
+        # ---- Onlooker Bees ----
+        prob = [[1 / (1 + f) for f in fitness[p]] for p in range(P)]
+        prob = [np.array(row) / np.sum(row) for row in prob]
+        r = rng.random((P, N))
+        onlookers = [(p, i) for p in range(P) for i in range(N) if r[p, i] < prob[p][i]]
+        if onlookers:
+            phase(onlookers)
+
+        # ---- Scout Bees ----
+        scouts = [(p, i) for p in range(P) for i in range(N) if trial[p][i] > limit]
+        if scouts:
+            fresh = rng.uniform(BOUNDS[:, 0], BOUNDS[:, 1], size=(len(scouts), D)).tolist()
+            for (p, i), s in zip(scouts, fresh):
+                solutions[p][i] = s
+                fitness[p][i]   = objective(p, s)
+                trial[p][i]     = 0
+
+        for p in range(P):
+            error_history[p].append(min(fitness[p]))
+
+    best_sol = [solutions[p][int(np.argmin(fitness[p]))] for p in range(P)]
+    return best_sol, error_history
+
+
+@pytest.mark.parametrize("seed", [0, 1, 42])
+def test_single_problem_matches_scalar_loop(seed):
+    best_sol, _, error_history, stop = abc_optimize(580.0, 0.95, 0.8, 0.985, 400.0, 20, 40, 5, rng=seed)
+    ref_sol, ref_history = reference_abc([580.0], [0.95], [0.8], [0.985], [400.0], 20, 40, 5, seed)
+
+    assert best_sol == ref_sol[0]
+    assert error_history == ref_history[0]
+    assert stop == ("max_cycles", 40)
+
+
+def test_stacked_problems_match_scalar_loop():
+    Pmax_stc  = [580.0, 580.0, 450.0]
+    Ftemp_P   = [0.95, 0.90, 1.02]
+    Fg        = [0.8, 0.6, 1.0]
+    Fage      = [0.985, 0.97, 1.0]
+    Pmax_meas = [400.0, 280.0, 430.0]
+
+    best_sol, _, error_history, _ = abc_optimize_batch(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, 15, 30, 3, rng=7)
+    ref_sol, ref_history = reference_abc(Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, 15, 30, 3, 7)
+
+    assert best_sol.tolist() == ref_sol
+    assert error_history.tolist() == ref_history
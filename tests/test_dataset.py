@@ -0,0 +1,106 @@
+"""Columnar memory-mapped measurement datasets (bifacial_pv.dataset)."""
+
+import json
+
+import numpy as np
+import pytest
+
+from bifacial_pv.colony import abc_optimize_batch
+from bifacial_pv.dataset import (
+    COLUMNS, META_FILE, csv_to_dataset, fit_dataset, open_dataset, write_dataset,
+)
+
+ROWS = {
+    "Pmax_meas": [400.0, 430.0, 380.0, 415.5, 390.25],
+    "Pmax_STC":  [580.0, 610.0, 580.0, 610.0, 580.0],
+    "Ftemp_P":   [0.95, 0.97, 0.93, 0.96, 0.94],
+    "Fg":        [0.8, 0.82, 0.75, 0.81, 0.78],
+    "Fage":      [0.985, 0.98, 0.985, 0.975, 0.97],
+    "Voc_meas":  [47.0, 47.5, 46.8, 47.2, 47.1],
+}
+
+
+@pytest.fixture
+def measurement_csv(tmp_path):
+    # Columns in a different order from COLUMNS, an ignored extra column and a trailing blank line
+    names = ["site", *reversed(list(ROWS))]
+    lines = [",".join(names)]
+    for k in range(5):
+        lines.append(",".join(["A"] + [repr(ROWS[n][k]) for n in names[1:]]))
+    path = tmp_path / "measurements.csv"
+    path.write_text("\n".join(lines[:3]) + "\n\n" + "\n".join(lines[3:]) + "\n\n")
+    return path
+
+
+@pytest.mark.parametrize("chunk_rows", [2, 100_000])
+def test_csv_round_trip(measurement_csv, tmp_path, chunk_rows):
+    ds = csv_to_dataset(measurement_csv, tmp_path / "ds", chunk_rows=chunk_rows)
+    assert len(ds) == 5
+    assert list(ds.columns) == [c for c in COLUMNS if c in ROWS]
+    for name, values in ROWS.items():
+        assert ds[name].tolist() == values
+    assert "Vmp_meas" not in ds and "site" not in ds
+
+
+def test_columns_are_read_only_memmaps(measurement_csv, tmp_path):
+    csv_to_dataset(measurement_csv, tmp_path / "ds")
+    ds = open_dataset(tmp_path / "ds")
+    col = ds["Pmax_meas"]
+    assert isinstance(col, np.memmap)
+    assert not col.flags.writeable
+    with pytest.raises(ValueError):
+        col[0] = 1.0
+    view = ds.slice(1, 3)["Fg"]
+    assert np.shares_memory(view, ds["Fg"]) and view.tolist() == ROWS["Fg"][1:3]
+
+
+def test_missing_required_column(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("Pmax_meas,Pmax_STC,Fg\n400,580,0.8\n")
+    with pytest.raises(ValueError, match="Ftemp_P, Fage"):
+        csv_to_dataset(path, tmp_path / "ds")
+
+
+def _edit_meta(path, **changes):
+    meta = json.loads((path / META_FILE).read_text())
+    (path / META_FILE).write_text(json.dumps({**meta, **changes}))
+
+
+def test_wrong_version_is_rejected(tmp_path):
+    write_dataset(tmp_path, ROWS)
+    _edit_meta(tmp_path, version=99)
+    with pytest.raises(ValueError, match="version: 99"):
+        open_dataset(tmp_path)
+
+
+def test_wrong_dtype_is_rejected(tmp_path):
+    write_dataset(tmp_path, ROWS)
+    np.save(tmp_path / "Fg.npy", np.array(ROWS["Fg"], dtype=np.float32))
+    with pytest.raises(ValueError, match="'Fg' has dtype float32"):
+        open_dataset(tmp_path)
+
+
+def test_wrong_length_is_rejected(tmp_path):
+    write_dataset(tmp_path, ROWS)
+    _edit_meta(tmp_path, rows=4)
+    with pytest.raises(ValueError, match=r"shape \(5,\), expected float64 and \(4,\)"):
+        open_dataset(tmp_path)
+    with pytest.raises(ValueError, match="expected \\(5,\\)"):
+        write_dataset(tmp_path / "other", {**ROWS, "Fg": [0.8]})
+
+
+def test_non_measurement_columns_keep_their_dtype(tmp_path):
+    write_dataset(tmp_path, {"reason": np.array(["abs_tol", "max_cycles"]), "cycle": np.array([3, 50])})
+    ds = open_dataset(tmp_path, required=())
+    assert ds["cycle"].dtype == np.int64 and ds["reason"].tolist() == ["abs_tol", "max_cycles"]
+
+
+def test_fit_dataset_matches_in_memory_batch(measurement_csv, tmp_path):
+    ds = csv_to_dataset(measurement_csv, tmp_path / "ds")
+    best_sol, best_pmax, history, stop = fit_dataset(ds, 15, 40, 5, start=1, stop=4, rng=3)
+    inputs = (ROWS[n][1:4] for n in ("Pmax_STC", "Ftemp_P", "Fg", "Fage", "Pmax_meas"))
+    ref = abc_optimize_batch(*inputs, 15, 40, 5, rng=3)
+    assert best_sol.shape == (3, 4) and history.shape == (3, 40)
+    np.testing.assert_array_equal(best_sol, ref[0])
+    np.testing.assert_array_equal(best_pmax, ref[1])
+    np.testing.assert_allclose(best_pmax, ROWS["Pmax_meas"][1:4], atol=1.0)
@@ -0,0 +1,51 @@
+"""Multi-seed ABC ensemble (bifacial_pv.ensemble)."""
+
+import numpy as np
+
+from bifacial_pv.colony import abc_optimize
+from bifacial_pv.ensemble import abc_ensemble, restart_seeds
+
+PROBLEM = (580.0, 0.95, 0.8, 0.985, 400.0, 15, 40, 5)
+
+
+def test_restart_seeds_are_distinct_and_reproducible():
+    seeds = restart_seeds(7, 6)
+    assert seeds == restart_seeds(7, 6)
+    assert len(set(seeds)) == 6
+    assert restart_seeds(8, 6) != seeds
+    # More restarts extend the same sequence
+    assert restart_seeds(7, 8)[:6] == seeds
+
+
+def test_ensemble_is_reproducible():
+    a = abc_ensemble(*PROBLEM, restarts=4, seed=3, max_workers=2)
+    b = abc_ensemble(*PROBLEM, restarts=4, seed=3, max_workers=1)
+    assert a.seeds == b.seeds
+    np.testing.assert_array_equal(a.solutions, b.solutions)
+    np.testing.assert_array_equal(a.histories, b.histories)
+    assert a.best_sol == b.best_sol
+
+    c = abc_ensemble(*PROBLEM, restarts=4, seed=4, max_workers=2)
+    assert not np.array_equal(a.solutions, c.solutions)
+
+
+def test_ensemble_matches_individual_runs():
+    # abs_tol stops restarts at different cycles, so the history padding is exercised too
+    result = abc_ensemble(*PROBLEM, restarts=4, seed=3, max_workers=2, abs_tol=0.5)
+    runs = [abc_optimize(*PROBLEM, rng=s, abs_tol=0.5) for s in result.seeds]
+
+    np.testing.assert_array_equal(result.solutions, [r[0] for r in runs])
+    assert result.stops == [r[3] for r in runs]
+    np.testing.assert_array_equal(result.errors, [r[2][-1] for r in runs])
+    np.testing.assert_allclose(result.spread, np.std([r[0] for r in runs], axis=0))
+
+    best = int(np.argmin([r[2][-1] for r in runs]))
+    assert result.best_sol == runs[best][0]
+    assert result.best_pmax == runs[best][1]
+
+    cycles = max(len(r[2]) for r in runs)
+    assert result.histories.shape == (4, cycles)
+    for history, run in zip(result.histories, runs):
+        assert history[:len(run[2])].tolist() == run[2]
+        assert np.all(history[len(run[2]):] == run[2][-1])
+    np.testing.assert_array_equal(result.error_history, result.histories.min(axis=0))
@@ -0,0 +1,128 @@
+"""JobStore bookkeeping in SQLite and the run_job worker entry point."""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from bifacial_pv import jobs
+from bifacial_pv.colony import abc_optimize
+from bifacial_pv.jobs import JobStore, run_job
+
+PROBLEM = (580.0, 0.95, 0.8, 0.985, 400.0, 15, 30, 5)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite"))
+
+
+@pytest.fixture
+def report_every_cycle(monkeypatch):
+    monkeypatch.setattr(jobs, "PROGRESS_INTERVAL", 0.0)
+
+
+def cancel_itself(path, job_id, cycles, progress=None):
+    # Asks for its own cancellation after three cycles, as another session would
+    for cycle in range(1, cycles + 1):
+        if cycle == 4:
+            JobStore(path).cancel(job_id)
+        progress(cycle, np.array([1.0 / cycle]))
+    return "finished"
+
+
+def cancel_without_progress(path, job_id):
+    JobStore(path).cancel(job_id)
+    return "finished"
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def test_run_job_records_result_and_progress(store, report_every_cycle):
+    store.create("fit", "abc", context={"page": 2}, total=30)
+    run_job(store.path, "fit", abc_optimize, PROBLEM, {"rng": 5})
+
+    info = store.info("fit")
+    assert info.status == "done" and info.error is None
+    assert info.started <= info.finished
+    assert (info.cycle, info.total) == (30, 30)
+
+    expected = abc_optimize(*PROBLEM, rng=5)
+    result = store.result("fit")
+    assert result[0] == expected[0] and result[2] == expected[2]
+    np.testing.assert_array_equal(info.history, expected[2])
+    assert info.best == expected[2][-1]
+    assert store.context("fit") == {"page": 2}
+
+
+def test_progress_callback_cancels_cooperatively(store, report_every_cycle):
+    store.create("job", "slow")
+    run_job(store.path, "job", cancel_itself, (store.path, "job", 100), {})
+
+    info = store.info("job")
+    assert info.status == "cancelled"
+    assert info.cycle == 4 and info.history.tolist() == [1.0, 0.5, 1 / 3, 0.25]
+    assert store.result("job") is None
+
+
+def test_cancel_without_progress_discards_result(store):
+    store.create("job", "plain")
+    run_job(store.path, "job", cancel_without_progress, (store.path, "job"), {})
+    assert store.info("job").status == "cancelled"
+    assert store.result("job") is None
+
+
+def test_cancelled_while_queued_never_runs(store):
+    store.create("job", "fit")
+    store.cancel("job")
+    assert store.info("job").status == "cancelled"
+
+    run_job(store.path, "job", fail, ("must not run",), {})
+    info = store.info("job")
+    assert info.status == "cancelled" and info.started is None and info.error is None
+
+
+def test_failure_records_error(store):
+    store.create("job", "fit")
+    run_job(store.path, "job", fail, ("bad input",), {})
+    info = store.info("job")
+    assert info.status == "failed"
+    assert info.error == "ValueError: bad input"
+    assert store.result("job") is None
+
+
+def test_recover_fails_jobs_of_dead_owners(store):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    store.create("orphan", "fit", owner=dead.pid)
+    store.create("unowned", "fit")
+    store.create("alive", "fit", owner=os.getpid())
+    store.create("running_orphan", "fit", owner=dead.pid)
+    store.start("running_orphan")
+    store.create("finished", "fit", owner=dead.pid)
+    store.finish("finished", "done", result=1)
+
+    store.recover()
+    status = {j.id: (j.status, j.error) for j in store.jobs()}
+    interrupted = ("failed", "interrupted: the server process exited")
+    assert status["orphan"] == status["unowned"] == status["running_orphan"] == interrupted
+    assert status["alive"] == ("queued", None)
+    assert status["finished"] == ("done", None)
+
+
+def test_purge_deletes_only_old_finished_jobs(store):
+    for job_id in ("done", "failed", "cancelled", "queued", "running"):
+        store.create(job_id, "fit")
+    store.start("running")
+    for status in ("done", "failed", "cancelled"):
+        store.finish(status, status)
+
+    store.purge(older_than=3600)
+    assert len(store.jobs()) == 5
+
+    store.purge(older_than=-1)
+    assert sorted(j.id for j in store.jobs()) == ["queued", "running"]
@@ -0,0 +1,66 @@
+"""Multi-year replay of a typical weather year."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.lifetime import Soiling, lifetime_simulation
+from bifacial_pv.model import (
+    ModuleSTC, TempCoeffs, aging_factor, cleaning_factor, electrical_outputs, irradiance_factor,
+    temperature_factors,
+)
+from bifacial_pv.timeseries import energy_yield, iter_weather_chunks
+
+
+@pytest.fixture
+def weather(tmp_path):
+    # Four days of hourly data with a daily irradiance bell and a night-time sensor offset
+    hours = np.arange(96)
+    G = np.maximum(1000 * np.sin(np.pi * ((hours % 24) - 6) / 12), -2.0)
+    T = 20 + 0.03 * np.maximum(G, 0)
+    path = tmp_path / "weather.csv"
+    with open(path, "w") as f:
+        f.write("timestamp,G_front,Tcell\n")
+        for h, g, t in zip(hours, G, T):
+            f.write(f"2024-01-{1 + h // 24:02d}T{h % 24:02d}:00,{g:.3f},{t:.3f}\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("BG", [0.0, 0.2])
+def test_first_year_matches_energy_yield(weather, BG):
+    clean = Soiling(rate=0.0, initial=0.0)
+    life = lifetime_simulation(weather, years=2, soiling=clean, Fmm=0.98, Fshade=0.95, BG=BG)
+    single = energy_yield(weather, dirt=0.0, years=1, Fmm=0.98, Fshade=0.95, BG=BG)
+
+    assert life.energy_Wh[0] == pytest.approx(single.energy_Wh, rel=1e-12)
+    assert life.energy_Wh[1] / life.energy_Wh[0] == pytest.approx(aging_factor(2) / aging_factor(1))
+    assert np.all(life.soiling_loss_Wh == 0)
+
+
+def test_energy_yield_matches_single_point(weather):
+    # Both weather-file blocks use energy_yield's defaults, so each hour must equal the
+    # Computation Tool's single-point Pmax: front-only Fg, no BG
+    stc, coeffs = ModuleSTC(), TempCoeffs()
+    dirt, years, Fmm, Fshade = 5.0, 10, 0.98, 0.95
+    result = energy_yield(weather, dirt=dirt, years=years, Fmm=Fmm, Fshade=Fshade, stc=stc, coeffs=coeffs)
+
+    chunk, = iter_weather_chunks(weather)
+    pmax = [
+        electrical_outputs(stc, temperature_factors(T, coeffs), irradiance_factor(G),
+                           cleaning_factor(dirt), Fshade, Fmm, aging_factor(years)).Pmax
+        for G, T in zip(chunk.G_front, chunk.Tcell)
+    ]
+    pmax = np.maximum(pmax, 0.0)
+    assert result.energy_Wh == pytest.approx(pmax.sum(), rel=1e-12)
+    assert result.peak_power == pytest.approx(pmax.max(), rel=1e-12)
+
+
+def test_soiling_and_cleaning(weather):
+    soiling = Soiling(rate=1.0, max_dirt=2.5, interval_days=2)
+    assert soiling.dirt(6, 4).tolist() == [0.0, 1.0, 0.0, 1.0, 0.0, 1.0]
+    assert Soiling(rate=1.0, max_dirt=2.5).dirt(5, 4).tolist() == [0.0, 1.0, 2.0, 2.5, 2.5]
+    assert Soiling(rate=1.0, days_of_year=(2,), initial=5.0).dirt(6, 4).tolist() == [5, 6, 0, 1, 2, 3]
+
+    life = lifetime_simulation(weather, years=3, soiling=Soiling(rate=1.0, max_dirt=20.0))
+    assert np.all(np.diff(life.mean_Fclean) < 0)
+    assert np.allclose(life.energy_Wh + life.soiling_loss_Wh,
+                       life.energy_Wh / life.mean_Fclean)
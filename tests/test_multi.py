@@ -0,0 +1,78 @@
+"""Weighted multi-output objective (bifacial_pv.multi)."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.colony import pmax_objective
+from bifacial_pv.model import (
+    ModuleSTC, Outputs, TempCoeffs, aging_factor, irradiance_factor, temperature_factors,
+)
+from bifacial_pv.multi import MULTI_BOUNDS, fit_multi, multi_objective, outputs_at
+
+STC, COEFFS = ModuleSTC(), TempCoeffs()
+FAGE = float(aging_factor(10))
+# [BG, dirt, Fmm, Fshade, Tcell, G_front]
+TRUE_X = np.array([0.12, 4.0, 0.98, 0.93, 38.0, 820.0])
+
+
+def random_candidates(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(MULTI_BOUNDS[:, 0], MULTI_BOUNDS[:, 1], size=(n, len(MULTI_BOUNDS)))
+
+
+def measured_at(x):
+    return Outputs(*(float(o) for o in outputs_at(x, STC, COEFFS, FAGE)))
+
+
+def test_pmax_only_weight_equals_pmax_fit_error():
+    meas = measured_at(TRUE_X)
+    objective, _, _ = multi_objective(meas, STC, COEFFS, FAGE, weights=(1, 0, 0, 0, 0))
+
+    # With Tcell and G_front held, the relative multi error is the Pmax-only error over Pmax_meas
+    X = random_candidates(200)
+    X[:, 4:] = TRUE_X[4:]
+    Ftemp_P = temperature_factors(TRUE_X[4], COEFFS).Pmp
+    pmax_error, _ = pmax_objective(STC.Pmax, Ftemp_P, irradiance_factor(TRUE_X[5]), FAGE, meas.Pmax)
+    p = np.zeros(len(X), dtype=int)
+    np.testing.assert_allclose(objective(X, p), pmax_error(X[:, :4], p) / meas.Pmax, rtol=1e-12)
+
+
+@pytest.mark.parametrize("weights", [(1, 0, 1, 0, 1), (2, 1, 0, 3, 0)])
+def test_zero_weight_outputs_are_ignored(weights):
+    meas = measured_at(TRUE_X)
+    # Corrupt every zero-weight output; a zero or NaN measurement is also ignored
+    junk = (1e4, 0.0, np.nan, 5.0, 1e-3)
+    corrupted = Outputs(*(m if w else bad for m, w, bad in zip(meas, weights, junk)))
+    X = random_candidates(200, seed=1)
+    p = np.zeros(len(X), dtype=int)
+
+    clean, _, _ = multi_objective(meas, STC, COEFFS, FAGE, weights)
+    dirty, _, _ = multi_objective(corrupted, STC, COEFFS, FAGE, weights)
+    np.testing.assert_array_equal(dirty(X, p), clean(X, p))
+
+
+def test_objective_is_zero_at_the_true_point_and_weights_are_normalised():
+    meas = measured_at(TRUE_X)
+    objective, _, _ = multi_objective(meas, STC, COEFFS, FAGE, weights=(1, 1, 1, 1, 1))
+    scaled, _, _ = multi_objective(meas, STC, COEFFS, FAGE, weights=(5, 5, 5, 5, 5))
+    X = np.vstack([TRUE_X, random_candidates(50, seed=2)])
+    p = np.zeros(len(X), dtype=int)
+    assert objective(X, p)[0] == pytest.approx(0.0, abs=1e-15)
+    np.testing.assert_allclose(scaled(X, p), objective(X, p), rtol=1e-12)
+
+
+def test_no_usable_output_is_rejected():
+    with pytest.raises(ValueError, match="at least one measured output"):
+        # Only the voltages are measured, and they have zero weight
+        multi_objective(Outputs(0.0, 40.0, 0.0, 45.0, 0.0), weights=(1, 0, 1, 0, 1))
+
+
+def test_fit_recovers_a_consistent_point():
+    meas = measured_at(TRUE_X)
+    best_sol, outputs, error, history, _ = fit_multi(meas, 40, 400, 10, STC, COEFFS, FAGE, rng=0)
+
+    assert error < 1e-3
+    assert history[-1] == error
+    np.testing.assert_allclose(outputs, meas, rtol=2e-3)
+    # Voc and Vmp depend on Tcell alone, so the temperature is identified
+    assert best_sol[4] == pytest.approx(TRUE_X[4], abs=0.5)
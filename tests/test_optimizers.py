@@ -0,0 +1,44 @@
+"""Optimizer backends (bifacial_pv.optimizers) and the method comparison."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.colony import BOUNDS, compute_pmax, pmax_objective
+from bifacial_pv.optimizers import METHODS, compare_methods, fit_pmax_batch
+
+
+@pytest.mark.parametrize("method", list(METHODS))
+def test_fit_pmax_batch_accepts_lists(method):
+    Pmax_stc  = [580.0, 450.0]
+    Ftemp_P   = [0.95, 1.02]
+    Fg        = [0.8, 1.0]
+    Fage      = [0.985, 1.0]
+    Pmax_meas = [400.0, 430.0]
+
+    best_sol, best_pmax, history, _ = fit_pmax_batch(method, Pmax_stc, Ftemp_P, Fg, Fage, Pmax_meas, 30, rng=0)
+    assert best_sol.shape == (2, len(BOUNDS))
+    assert history.shape[0] == 2
+    expected = compute_pmax(best_sol, *(np.array(a) for a in (Pmax_stc, Ftemp_P, Fg, Fage)))
+    np.testing.assert_allclose(best_pmax, expected)
+
+
+def test_compare_methods_spends_equal_budgets():
+    # A negative tolerance is never reached, so every method runs until its budget is spent
+    objective, _ = pmax_objective(580.0, 0.95, 0.8, 0.985, np.linspace(300.0, 450.0, 8))
+    max_evals = 2000
+    results = compare_methods(objective, BOUNDS, 8, -1.0, max_evals)
+
+    assert [r.method for r in results] == list(METHODS)
+    for r in results:
+        per_problem = r.evals / 8
+        assert max_evals <= per_problem <= 1.1 * max_evals, r.method
+        assert r.solved == 0.0 and np.isnan(r.evals_to_tol)
+
+
+def test_compare_methods_solves_easy_problems():
+    objective, _ = pmax_objective(580.0, 0.95, 0.8, 0.985, np.full(4, 400.0))
+    results = compare_methods(objective, BOUNDS, 4, 0.5, 5000, methods=["ABC", "DE"])
+    for r in results:
+        assert r.solved == 1.0
+        assert r.evals_to_tol <= 5000
+        assert r.final_error <= 0.5
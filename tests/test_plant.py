@@ -0,0 +1,44 @@
+"""Plant-level Pmax from per-module conditions."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.model import ModuleSTC, TempCoeffs, compute_outputs
+from bifacial_pv.plant import PlantLayout, plant_pmax
+
+LAYOUT = PlantLayout(modules_per_string=4, strings_per_inverter=3, inverters=2)
+
+
+def test_uniform_conditions_have_no_mismatch():
+    r = plant_pmax(LAYOUT, 800.0, 45.0)
+    assert isinstance(r.Pmax, np.floating) and isinstance(r.Fmm, np.floating)
+    assert r.Fmm == 1.0
+    assert r.Pmax == r.Pmax_modules
+    assert r.clipped == 0.0
+    assert r.inverter_P.shape == (LAYOUT.inverters,)
+
+
+def test_uniform_plant_matches_single_point_pmax():
+    # Page-1 defaults, with the front-only irradiance of the single-point calculation (BG not applied)
+    stc, coeffs = ModuleSTC(), TempCoeffs()
+    layout = PlantLayout()
+    r = plant_pmax(layout, 800.0, 30.0, dirt=5.0, years=10, Fshade=0.95, stc=stc, coeffs=coeffs)
+    module = compute_outputs(800.0, 30.0, 5.0, 10, 1.0, 0.95, stc, coeffs).Pmax
+    assert r.Pmax_modules == pytest.approx(layout.n_modules * module, rel=1e-12)
+    assert r.Pmax == pytest.approx(r.Pmax_modules, rel=1e-12)
+
+
+def test_shaded_module_drags_its_string_down():
+    G = np.full(LAYOUT.n_modules, 800.0)
+    G[0] = 400.0
+    r = plant_pmax(LAYOUT, G, 45.0)
+    assert r.Fmm < 1.0
+    assert r.Pmax < r.Pmax_modules
+
+
+def test_inverter_limit_clips_and_batches_broadcast():
+    G = np.array([[800.0], [1000.0]])
+    r = plant_pmax(LAYOUT, G, 45.0, inverter_limit=1000.0)
+    assert r.Pmax.shape == (2,)
+    assert np.all(r.Pmax <= LAYOUT.inverters * 1000.0)
+    assert np.allclose(r.clipped, r.Pmax_modules - r.Pmax)
@@ -0,0 +1,77 @@
+"""Optimizer instrumentation (bifacial_pv.profiling)."""
+
+import numpy as np
+
+from bifacial_pv.colony import BOUNDS, abc_minimize_batch, abc_optimize, pmax_objective
+from bifacial_pv.profiling import NULL_STATS, PHASES, RunStats, profile_call
+
+P, BEES, CYCLES, LIMIT = 3, 20, 40, 3
+
+
+def counted_objective():
+    objective, _ = pmax_objective(580.0, 0.95, 0.8, 0.985, [400.0, 350.0, 420.0])
+    counts = {"calls": 0, "evals": 0}
+
+    def counted(X, p):
+        counts["calls"] += 1
+        counts["evals"] += len(p)
+        return objective(X, p)
+
+    return counted, counts
+
+
+def run(stats=None):
+    objective, counts = counted_objective()
+    return abc_minimize_batch(objective, BOUNDS, P, BEES, CYCLES, LIMIT, rng=11, stats=stats), counts
+
+
+def test_counts_match_the_engine():
+    stats = RunStats()
+    _, counts = run(stats)
+    summary = stats.summary()
+    assert summary["objective_calls"] == counts["calls"]
+    assert summary["objective_evals"] == counts["evals"]
+    # Initial colony + employed bees, plus the onlookers and scouts actually evaluated
+    onlookers, scouts = sum(stats.onlooker_trials), summary["scout_resets"]
+    assert counts["evals"] == P * BEES * (1 + CYCLES) + onlookers + scouts
+    assert summary["total_time"] > 0 and summary["evals_per_sec"] > 0
+    assert set(summary["phase_time"]) == set(PHASES)
+    assert all(t >= 0 for t in summary["phase_time"].values())
+
+
+def test_per_cycle_series():
+    stats = RunStats()
+    run(stats)
+    summary = stats.summary()
+    for key in ("employed_acceptance", "onlooker_acceptance", "scouts_per_cycle"):
+        assert len(summary[key]) == CYCLES, key
+    assert all(0.0 <= a <= 1.0 for a in summary["employed_acceptance"])
+    assert all(0.0 <= a <= 1.0 for a in summary["onlooker_acceptance"])
+    assert all(isinstance(s, int) and 0 <= s <= P * BEES for s in summary["scouts_per_cycle"])
+    assert stats.employed_trials == [P * BEES] * CYCLES
+    assert summary["scout_resets"] == sum(summary["scouts_per_cycle"]) > 0
+
+
+def test_stats_do_not_change_results():
+    plain, timed, null = (run(stats)[0] for stats in (None, RunStats(), NULL_STATS))
+    for a, b, c in zip(plain[:3], timed[:3], null[:3]):
+        np.testing.assert_array_equal(a, b)
+        np.testing.assert_array_equal(a, c)
+
+    args = (580.0, 0.95, 0.8, 0.985, 400.0, 10, 20, 3)
+    assert abc_optimize(*args, rng=2, stats=RunStats())[:3] == abc_optimize(*args, rng=2)[:3]
+
+
+def test_profile_call_reports():
+    args = (580.0, 0.95, 0.8, 0.985, 400.0, 10, 20, 3)
+    expected = abc_optimize(*args, rng=2)
+
+    result, report = profile_call(abc_optimize, *args, rng=2)
+    assert report == {} and result[:3] == expected[:3]
+
+    result, report = profile_call(abc_optimize, *args, cprofile=True, trace_memory=True, top=5, rng=2)
+    assert result[:3] == expected[:3]
+    assert set(report) == {"cprofile", "peak_mem_mb", "top_allocations"}
+    assert report["peak_mem_mb"] > 0
+    assert 0 < len(report["top_allocations"]) <= 5
+    assert "abc_minimize_batch" in report["cprofile"]
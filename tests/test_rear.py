@@ -0,0 +1,56 @@
+"""View-factor rear irradiance model (bifacial_pv.rear) against closed forms."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.rear import RowGeometry, bifacial_gain, rear_irradiance, solar_position, view_factors
+
+
+@pytest.mark.parametrize("tilt", [0.0, 25.0, 60.0, 90.0])
+def test_isolated_row_sky_view_factor(tilt):
+    # A lone row sees only sky and ground: F_sky = (1 ± cos tilt) / 2 for the front and rear faces
+    vf = view_factors(RowGeometry(tilt=tilt, rows=1))
+    cos_t = np.cos(np.radians(tilt))
+    assert vf.front_sky[0] == pytest.approx((1 + cos_t) / 2, abs=1e-6)
+    assert vf.rear_sky[0] == pytest.approx((1 - cos_t) / 2, abs=1e-6)
+    assert vf.rear_ground.sum() + vf.rear_open.sum() == pytest.approx((1 + cos_t) / 2, abs=1e-6)
+
+
+@pytest.mark.parametrize("dhi", [0.0, 150.0])
+def test_rear_irradiance_increases_with_albedo(dhi):
+    albedo = np.array([0.0, 0.1, 0.3, 0.6])
+    r = rear_irradiance(RowGeometry(), 40.0, 180.0, 800.0, dhi, albedo)
+    assert np.all(np.diff(r.G_rear, axis=0) > 0)
+    # The front face gains ground light too, but relatively less than the rear
+    assert np.all(np.diff(r.BG, axis=0) > 0)
+
+
+def test_bg_vanishes_without_albedo():
+    # Sun in front of the rows and no diffuse light: only ground reflection reaches the rear
+    albedo = np.array([0.2, 0.02, 0.002, 0.0])
+    r = rear_irradiance(RowGeometry(), 40.0, 180.0, 800.0, 0.0, albedo)
+    np.testing.assert_allclose(r.G_rear, r.G_rear[0] * (albedo / albedo[0])[:, None], rtol=1e-9)
+
+    BG = bifacial_gain(RowGeometry(), 40.0, 180.0, 800.0, 0.0, albedo)
+    assert np.all(np.diff(BG) < 0)
+    assert BG[-1] == 0.0
+
+
+def test_sun_below_horizon():
+    r = rear_irradiance(RowGeometry(), 95.0, 180.0, 800.0, 0.0, 0.3)
+    assert np.all(r.G_front == 0) and np.all(r.G_rear == 0) and np.all(r.BG == 0)
+
+
+def test_solar_position_reference():
+    # Reda & Andreas (2004) SPA example: Golden, CO, 2003-10-17 12:30:30 local (UTC−7)
+    times = np.array(["2003-10-17T19:30:30"], dtype="datetime64[s]")
+    zenith, azimuth = solar_position(times, 39.742476, -105.1786)
+    assert zenith[0] == pytest.approx(50.11162, abs=0.05)
+    assert azimuth[0] == pytest.approx(194.34024, abs=0.05)
+
+
+def test_solar_noon_at_june_solstice():
+    # Near solar noon at Greenwich the sun is due south at 90° − (52° − 23.44°) elevation
+    zenith, azimuth = solar_position(np.array(["2024-06-21T12:02"], dtype="datetime64[s]"), 52.0, 0.0)
+    assert zenith[0] == pytest.approx(52.0 - 23.44, abs=0.05)
+    assert azimuth[0] == pytest.approx(180.0, abs=0.5)
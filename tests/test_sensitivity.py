@@ -0,0 +1,114 @@
+"""Sensitivity and uncertainty sweeps (bifacial_pv.sensitivity)."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.model import (
+    ModuleSTC, TempCoeffs, aging_factor, cleaning_factor, electrical_outputs, irradiance_factor,
+    temperature_factors,
+)
+from bifacial_pv.sensitivity import (
+    RNG_BLOCK, grid_sweep, monte_carlo, nominal_output, normal, sobol, tornado, uniform,
+)
+
+NOMINAL = {
+    "G_front": 800.0, "Tcell": 30.0, "dirt": 5.0, "years": 10, "Fmm": 0.98, "Fshade": 0.95,
+    "alphasc": 0.045, "betaoc": -0.230, "alphamp": 0.045, "betamp": -0.280, "gamma": -0.280,
+}
+
+# Pmax is a product of one factor per input, so these act multiplicatively
+MULTIPLICATIVE = {
+    "G_front": uniform(600.0, 1000.0),
+    "dirt": uniform(0.0, 10.0),
+    "Fmm": uniform(0.95, 1.0),
+    "Fshade": normal(0.95, 0.02),
+}
+
+
+def test_nominal_is_the_single_point_pmax():
+    # Page-1 defaults; the Computation Tool's Pmax uses the front-only irradiance factor
+    stc, coeffs = ModuleSTC(), TempCoeffs()
+    Pmax = electrical_outputs(stc, temperature_factors(30.0, coeffs), irradiance_factor(800.0),
+                              cleaning_factor(5.0), 0.95, 0.98, aging_factor(10)).Pmax
+    assert nominal_output(NOMINAL, stc) == pytest.approx(Pmax, rel=1e-12)
+    with pytest.raises(ValueError, match="Unknown parameter"):
+        nominal_output({**NOMINAL, "BG": 0.15})
+
+
+def test_monte_carlo_percentiles_of_a_linear_output():
+    # Pmax ∝ G_front, so P90 sits at the 10th percentile of G_front
+    mc = monte_carlo(NOMINAL, {"G_front": uniform(600.0, 1000.0)}, samples=200_000)
+    per_watt = nominal_output(NOMINAL) / NOMINAL["G_front"]
+    for p, value in mc.percentiles.items():
+        G = 1000.0 - (int(p[1:]) / 100) * 400.0
+        assert value == pytest.approx(per_watt * G, rel=2e-3), p
+    assert mc.mean == pytest.approx(per_watt * 800.0, rel=2e-3)
+    assert mc.std == pytest.approx(per_watt * 400.0 / np.sqrt(12), rel=1e-2)
+    assert mc.min >= per_watt * 600.0 and mc.max <= per_watt * 1000.0
+    assert mc.histogram[0].sum() == 200_000
+
+
+def test_chunking_does_not_change_results():
+    whole = monte_carlo(NOMINAL, MULTIPLICATIVE, samples=50_000, seed=3)
+    chunked = monte_carlo(NOMINAL, MULTIPLICATIVE, samples=50_000, seed=3, chunk_size=RNG_BLOCK)
+    assert chunked.percentiles == whole.percentiles
+    assert (chunked.min, chunked.max) == (whole.min, whole.max)
+    np.testing.assert_array_equal(chunked.histogram[0], whole.histogram[0])
+    assert chunked.mean == pytest.approx(whole.mean, rel=1e-12)
+    assert chunked.std == pytest.approx(whole.std, rel=1e-9)
+
+    whole = sobol(NOMINAL, MULTIPLICATIVE, base_samples=20_000, seed=3)
+    chunked = sobol(NOMINAL, MULTIPLICATIVE, base_samples=20_000, seed=3, chunk_size=1)
+    np.testing.assert_allclose(chunked.first, whole.first, rtol=1e-9)
+    np.testing.assert_allclose(chunked.total, whole.total, rtol=1e-9)
+
+
+def test_sobol_indices_of_multiplicative_model():
+    # Wide ranges make the interactions visible. For independent factors x_i,
+    # Y = c·Π x_i has Var(Y)/c² = Π E[x_i²] − Π E[x_i]², and S_i = σ_i² Π_{j≠i} E[x_j]² / Var(Y)
+    uncertain = {"G_front": uniform(200.0, 1000.0), "Fmm": uniform(0.6, 1.0), "Fshade": uniform(0.3, 1.0)}
+    s = sobol(NOMINAL, uncertain, base_samples=200_000, seed=1)
+    assert s.samples == 200_000 * (len(uncertain) + 2)
+
+    mean = np.array([(u.a + u.b) / 2 for u in uncertain.values()])
+    var = np.array([(u.b - u.a) ** 2 / 12 for u in uncertain.values()])
+    total_var = np.prod(var + mean ** 2) - np.prod(mean ** 2)
+    expected = var * np.prod(mean ** 2) / mean ** 2 / total_var
+
+    assert expected.sum() < 0.95
+    np.testing.assert_allclose(s.first, expected, atol=0.02)
+    assert s.first.sum() <= 1.0
+    assert np.all(s.total >= s.first)
+
+
+def test_sobol_without_spread_is_zero():
+    s = sobol(NOMINAL, {"G_front": uniform(800.0, 800.0)}, base_samples=1000)
+    assert s.variance == 0.0
+    assert s.first.tolist() == [0.0] and s.total.tolist() == [0.0]
+
+
+def test_tornado_order_and_sign():
+    t = tornado(NOMINAL, MULTIPLICATIVE)
+    assert t.nominal == pytest.approx(nominal_output(NOMINAL))
+    assert np.all(np.diff(t.swing) <= 0)
+    assert t.names[0] == "G_front"
+
+    sign = dict(zip(t.names, np.sign(t.high - t.low)))
+    # More irradiance, mismatch factor or unshaded share raise Pmax; more dirt lowers it
+    assert sign == {"G_front": 1.0, "Fmm": 1.0, "Fshade": 1.0, "dirt": -1.0}
+    assert np.all((t.low - t.nominal) * (t.high - t.nominal) <= 0)
+
+
+def test_grid_sweep_matches_pointwise_evaluation():
+    axes = {"G_front": [200.0, 600.0, 1000.0], "Tcell": [10.0, 40.0]}
+    grid = grid_sweep(NOMINAL, axes, chunk_size=4)
+    assert grid.values.shape == (3, 2)
+    for i, G in enumerate(axes["G_front"]):
+        for j, T in enumerate(axes["Tcell"]):
+            expected = nominal_output({**NOMINAL, "G_front": G, "Tcell": T})
+            assert grid.values[i, j] == pytest.approx(expected)
+
+
+def test_unknown_parameter_is_rejected():
+    with pytest.raises(ValueError, match="Unknown parameter"):
+        tornado(NOMINAL, {"wind": uniform(0.0, 1.0)})
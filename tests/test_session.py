@@ -0,0 +1,174 @@
+"""Result summaries shared by the ABC and Results pages."""
+
+import dataclasses
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bifacial_pv.analytic import solve_closest
+from bifacial_pv.colony import abc_optimize
+from bifacial_pv.ensemble import abc_ensemble
+from bifacial_pv.model import (
+    ModuleSTC, Outputs, TempCoeffs, TempFactors,
+    aging_factor, cleaning_factor, electrical_outputs, irradiance_factor, temperature_factors,
+)
+from bifacial_pv.multi import fit_multi_batch
+from bifacial_pv.session import (
+    ABC_KEY, COMPUTE_KEY, RESULT_VERSION, AbcResult, ComputeResult,
+    abc_result_from_job, abc_result_from_run, fit_summary, get_result,
+)
+from bifacial_pv.space import FACTORS, fit_space_batch, search_space
+
+
+@pytest.mark.parametrize("free, names", [
+    (("dirt",), "dirt"),
+    (("BG", "Tcell"), "BG and Tcell"),
+    (("BG", "dirt", "Fmm", "Fshade"), "BG, dirt, Fmm, and Fshade"),
+])
+def test_fit_summary_lists_free_variables(free, names):
+    result = SimpleNamespace(free=free, weighted=False, solver="ABC")
+    assert fit_summary(result) == f"ABC tuned {names} to minimise |Pmax_calc − Pmax_measured|."
+
+
+def test_fit_summary_names_solver_and_objective():
+    result = SimpleNamespace(free=("BG",), weighted=True, solver="Analytic (closest to prior)")
+    assert fit_summary(result) == (
+        "Analytic (closest to prior) tuned BG to minimise the weighted relative error over all measured outputs."
+    )
+
+
+# ------------------ RESULT OBJECTS ------------------
+STC    = ModuleSTC(Pmax=550.0, Vmp=41.0, Imp=13.4, Voc=49.5, Isc=14.1)
+COEFFS = TempCoeffs(0.05, -0.25, 0.04, -0.30, -0.30)
+
+
+def compute_result(G_front=850.0, Tcell=35.0, dirt=3.0, years=5, Fmm=0.98, Fshade=0.96, BG=0.1):
+    # Built the way the Computation Tool builds it
+    Fg, Fclean, Fage = irradiance_factor(G_front), cleaning_factor(dirt), aging_factor(years)
+    Ftemp = temperature_factors(Tcell, COEFFS)
+    outputs = electrical_outputs(STC, Ftemp, Fg, Fclean, Fshade, Fmm, Fage)
+    return ComputeResult(
+        STC, COEFFS, G_front, BG, Tcell, dirt, years, Fmm, Fshade, float(Fg), float(Fclean), float(Fage),
+        TempFactors(*(float(f) for f in Ftemp)), Outputs(*(float(o) for o in outputs)),
+    )
+
+
+COMPUTE = compute_result()
+MEASURED = Outputs(Pmax=400.0, Vmp=39.5, Imp=10.1, Voc=47.9, Isc=10.8)
+PMAX_ARGS = (STC.Pmax, COMPUTE.Ftemp.Pmp, COMPUTE.Fg, COMPUTE.Fage, MEASURED.Pmax)
+OPTIONS = dict(solver="ABC", objective="|error|", seed=1, measured=MEASURED, max_cycles=60)
+
+
+def hand_outputs(BG, dirt, Fmm, Fshade, Tcell, G_front, Fage):
+    Ftemp = [1 + c / 100 * (Tcell - 25) for c in (COEFFS.alphasc, COEFFS.alphamp, COEFFS.betaoc,
+                                                  COEFFS.betamp, COEFFS.gamma)]
+    Fg, Fclean = G_front * (1 + BG) / 1000, (100 - dirt) / 100
+    return {
+        "Pmax": STC.Pmax * Ftemp[4] * Fg * Fclean * Fshade * Fmm * Fage,
+        "Isc":  STC.Isc * Ftemp[0] * Fg * Fclean * Fshade,
+        "Imp":  STC.Imp * Ftemp[1] * Fg * Fclean * Fshade,
+        "Voc":  STC.Voc * Ftemp[2],
+        "Vmp":  STC.Vmp * Ftemp[3],
+    }
+
+
+def check_view(result, Tcell, G_front, Fage):
+    BG, dirt, Fmm, Fshade = result.best_sol
+    calc = hand_outputs(BG, dirt, Fmm, Fshade, Tcell, G_front, Fage)
+    view = result.view
+
+    assert view.table["Parameter"] == ["Pmax (W)", "Isc (A)", "Imp (A)", "Voc (V)", "Vmp (V)"]
+    names = ["Pmax", "Isc", "Imp", "Voc", "Vmp"]
+    assert view.table["Measured"] == [getattr(MEASURED, n) for n in names]
+    np.testing.assert_allclose(view.table["Calculated"], [calc[n] for n in names], rtol=1e-12)
+    pct = [abs(calc[n] - getattr(MEASURED, n)) / getattr(MEASURED, n) * 100 for n in names]
+    np.testing.assert_allclose(view.table["Error (%)"], pct, rtol=1e-9)
+
+    assert result.best_pmax == pytest.approx(calc["Pmax"], rel=1e-12)
+    assert view.abs_error == pytest.approx(abs(calc["Pmax"] - 400.0), rel=1e-12)
+    assert view.pct_error == pytest.approx(abs(calc["Pmax"] - 400.0) / 4.0, rel=1e-12)
+    assert view.orig_error == pytest.approx(abs(COMPUTE.outputs.Pmax - 400.0), rel=1e-12)
+    assert view.orig_pct == pytest.approx(abs(COMPUTE.outputs.Pmax - 400.0) / 4.0, rel=1e-12)
+    assert view.G_total == pytest.approx(G_front * (1 + BG))
+    assert view.pmax_chart["Pmax (W)"] == [400.0, COMPUTE.outputs.Pmax, result.best_pmax]
+
+
+def test_single_and_analytic_results_use_the_compute_operating_point():
+    for kind, raw in (("single", abc_optimize(*PMAX_ARGS, 20, 60, 5, rng=1)),
+                      ("analytic", solve_closest(*PMAX_ARGS))):
+        result = abc_result_from_run(COMPUTE, kind, raw, **OPTIONS)
+        assert (result.Tcell, result.G_front, result.Fage) == (35.0, pytest.approx(850.0), COMPUTE.Fage)
+        assert not result.fitted_operating_point and result.free == FACTORS and not result.weighted
+        check_view(result, 35.0, 850.0, COMPUTE.Fage)
+
+    analytic = abc_result_from_run(COMPUTE, "analytic", solve_closest(*PMAX_ARGS), **OPTIONS)
+    assert (analytic.stop_reason, analytic.stop_cycle) == ("analytic", 0)
+
+
+def test_ensemble_result_takes_the_best_restart():
+    raw = abc_ensemble(*PMAX_ARGS, 20, 40, 5, restarts=3, seed=2, max_workers=1)
+    result = abc_result_from_run(COMPUTE, "ensemble", raw, **OPTIONS)
+    assert list(result.best_sol) == raw.best_sol
+    assert result.restart_errors == raw.errors.tolist()
+    assert (result.stop_reason, result.stop_cycle) == tuple(raw.stops[int(np.argmin(raw.errors))])
+    check_view(result, 35.0, 850.0, COMPUTE.Fage)
+
+
+def test_multi_result_uses_the_fitted_operating_point():
+    fit = fit_multi_batch([np.full(2, m) for m in MEASURED], 20, 60, 5, STC, COEFFS, fit_age=True, rng=3)
+    result = abc_result_from_run(COMPUTE, "multi", fit, fit_age=True, **OPTIONS)
+    best = int(np.argmin(fit.error))
+    BG, dirt, Fmm, Fshade, Tcell, G_front, Fage = fit.best_sol[best]
+    assert result.best_sol == (BG, dirt, Fmm, Fshade)
+    assert (result.Tcell, result.G_front, result.Fage) == (Tcell, G_front, Fage)
+    assert result.fitted_operating_point and result.fitted_age and result.weighted
+    assert len(result.restart_errors) == 2
+    check_view(result, Tcell, G_front, Fage)
+
+
+def test_space_result_keeps_pinned_values():
+    nominal = {"Tcell": COMPUTE.Tcell, "G_front": COMPUTE.Fg * 1000, "Fage": COMPUTE.Fage}
+    space = search_space(nominal, free=("BG", "dirt", "Tcell"), pinned={"Fmm": 0.97, "Fshade": 0.9})
+    fit = fit_space_batch(space, MEASURED.Pmax, 40, STC, COEFFS, options={"num_bees": 20}, rng=4)
+    result = abc_result_from_run(COMPUTE, "space", fit, free=space.free, weighted=False, **OPTIONS)
+    BG, dirt, _, _, Tcell, G_front, Fage = fit.best_sol[0]
+    assert result.best_sol == (BG, dirt, 0.97, 0.9)
+    assert result.free == ("BG", "dirt", "Tcell") and not result.fitted_age
+    assert result.fitted_operating_point and result.restart_errors is None
+    check_view(result, Tcell, G_front, Fage)
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError, match="Unknown run kind"):
+        abc_result_from_run(COMPUTE, "genetic", None, **OPTIONS)
+
+
+def test_result_from_job():
+    raw = abc_optimize(*PMAX_ARGS, 20, 60, 5, rng=1)
+    status = {"status": "running"}
+    manager = SimpleNamespace(
+        poll=lambda job_id: SimpleNamespace(status=status["status"]),
+        context=lambda job_id: {"kind": "single", "compute": COMPUTE, "options": OPTIONS},
+        result=lambda job_id: raw,
+    )
+    assert abc_result_from_job(manager, "job1") is None
+
+    status["status"] = "done"
+    result = abc_result_from_job(manager, "job1")
+    assert result.job_id == "job1"
+    assert result.best_sol == tuple(raw[0]) and result.error_history.tolist() == raw[2]
+
+
+def test_get_result_rejects_stale_versions():
+    result = abc_result_from_run(COMPUTE, "analytic", solve_closest(*PMAX_ARGS), **OPTIONS)
+    state = {ABC_KEY: result, COMPUTE_KEY: COMPUTE}
+    assert get_result(state, ABC_KEY, AbcResult) is result
+    assert get_result(state, COMPUTE_KEY, ComputeResult) is COMPUTE
+    assert get_result(state, COMPUTE_KEY, AbcResult) is None
+    assert get_result({}, ABC_KEY, AbcResult) is None
+
+    stale = dataclasses.replace(COMPUTE, version=RESULT_VERSION - 1)
+    assert get_result({COMPUTE_KEY: stale}, COMPUTE_KEY, ComputeResult) is None
+    stale = dataclasses.replace(result, version=RESULT_VERSION - 1)
+    assert get_result({ABC_KEY: stale}, ABC_KEY, AbcResult) is None
@@ -0,0 +1,90 @@
+"""Declarative search space (bifacial_pv.space)."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.colony import BOUNDS, pmax_objective
+from bifacial_pv.model import aging_factor, irradiance_factor, temperature_factors
+from bifacial_pv.space import (
+    DEFAULT_BOUNDS, FACTORS, VARIABLES, default_space, fit_space_batch, search_space, space_objective,
+)
+
+NOMINAL = {"BG": 0.15, "dirt": 5.0, "Fmm": 0.98, "Fshade": 0.95, "Tcell": 30.0, "G_front": 800.0,
+           "Fage": float(aging_factor(10))}
+
+
+def test_free_follow_variable_order_and_pins_win():
+    space = search_space(NOMINAL, free=("Tcell", "dirt", "BG", "Fmm"),
+                         pinned={"Fmm": 0.97, "G_front": 900.0})
+    assert space.free == ("BG", "dirt", "Tcell")
+    assert space.dim == 3
+    values = dict(zip(VARIABLES, space.values))
+    assert values["Fmm"] == 0.97 and values["G_front"] == 900.0
+    assert values["Fshade"] == NOMINAL["Fshade"] and values["Fage"] == NOMINAL["Fage"]
+
+
+def test_columns_and_expand():
+    space = search_space(NOMINAL, free=("dirt", "G_front"), pinned={"BG": 0.2})
+    X = np.array([[3.0, 700.0], [7.0, 1000.0]])
+    cols = space.columns(X)
+    assert cols["dirt"].tolist() == [3.0, 7.0] and cols["G_front"].tolist() == [700.0, 1000.0]
+    assert np.ndim(cols["BG"]) == 0 and cols["BG"] == 0.2
+
+    full = space.expand(X)
+    assert full.shape == (2, len(VARIABLES))
+    assert full[:, VARIABLES.index("G_front")].tolist() == [700.0, 1000.0]
+    assert np.all(full[:, VARIABLES.index("Tcell")] == NOMINAL["Tcell"])
+
+
+def test_bounds_override_defaults_in_variable_order():
+    space = search_space(NOMINAL, free=("Tcell", "dirt"), bounds={"dirt": (2, 8)})
+    np.testing.assert_array_equal(space.box, [[2.0, 8.0], DEFAULT_BOUNDS["Tcell"]])
+    np.testing.assert_array_equal(default_space(NOMINAL).box, BOUNDS)
+    assert default_space(NOMINAL, multi=True, fit_age=True).free == VARIABLES
+
+
+@pytest.mark.parametrize("low, high", [(8.0, 2.0), (5.0, 5.0)])
+def test_bounds_must_be_ordered(low, high):
+    with pytest.raises(ValueError, match="low < high"):
+        search_space(NOMINAL, free=("dirt",), bounds={"dirt": (low, high)})
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"free": ("BG", "wind")},
+    {"bounds": {"albedo": (0, 1)}},
+    {"pinned": {"Vmp": 40.0}},
+])
+def test_unknown_variables_are_rejected(kwargs):
+    with pytest.raises(ValueError, match="Unknown variable"):
+        search_space(NOMINAL, **kwargs)
+
+
+def test_space_needs_a_free_variable_and_values_for_the_rest():
+    with pytest.raises(ValueError, match="At least one variable"):
+        search_space(NOMINAL, free=("BG",), pinned={"BG": 0.1})
+    with pytest.raises(ValueError, match="Tcell"):
+        search_space({**NOMINAL, "Tcell": None}, free=FACTORS)
+
+
+def test_default_space_objective_matches_pmax_fit():
+    space = default_space(NOMINAL)
+    objective, P, rel_scale = space_objective(space, [400.0, 450.0])
+    assert P == 2 and rel_scale.tolist() == [400.0, 450.0]
+
+    reference, _ = pmax_objective(610.0, temperature_factors(NOMINAL["Tcell"]).Pmp,
+                                  irradiance_factor(NOMINAL["G_front"]), NOMINAL["Fage"], [400.0, 450.0])
+    X = np.random.default_rng(0).uniform(BOUNDS[:, 0], BOUNDS[:, 1], size=(50, 4))
+    p = np.arange(50) % 2
+    np.testing.assert_allclose(objective(X, p), reference(X, p), rtol=1e-12)
+
+
+def test_fit_keeps_pinned_values_and_stays_in_bounds():
+    space = search_space(NOMINAL, free=("BG", "dirt"), bounds={"BG": (0.05, 0.2)},
+                         pinned={"Fshade": 0.9})
+    fit = fit_space_batch(space, [380.0, 420.0], 60, options={"num_bees": 20, "limit": 5}, rng=0)
+    assert fit.best_sol.shape == (2, len(VARIABLES))
+    assert np.all(fit.best_sol[:, VARIABLES.index("Fshade")] == 0.9)
+    assert np.all(fit.best_sol[:, VARIABLES.index("Fmm")] == NOMINAL["Fmm"])
+    BG = fit.best_sol[:, VARIABLES.index("BG")]
+    assert np.all((BG >= 0.05) & (BG <= 0.2))
+    np.testing.assert_allclose(fit.outputs.Pmax, [380.0, 420.0], atol=0.5)
@@ -0,0 +1,94 @@
+"""Early-stopping rules of the colony (colony.EarlyStopping)."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.colony import BOUNDS, abc_optimize, abc_optimize_batch, pmax_objective
+from bifacial_pv.optimizers import METHODS, minimize_batch
+
+PROBLEM = (580.0, 0.95, 0.8, 0.985, 400.0)
+
+
+def run(max_cycles=200, **stopping):
+    return abc_optimize(*PROBLEM, 20, max_cycles, 5, rng=1, **stopping)
+
+
+def test_no_rules_runs_every_cycle():
+    _, _, history, stop = run(max_cycles=30)
+    assert stop == ("max_cycles", 30)
+    assert len(history) == 30
+
+
+def test_abs_tol():
+    _, pmax, history, stop = run(abs_tol=0.05)
+    assert stop.reason == "abs_tol"
+    assert 1 < stop.cycle < 200
+    assert len(history) == stop.cycle
+    # Stops on the first cycle that meets the tolerance
+    assert history[-1] <= 0.05 < min(history[:-1])
+    assert abs(pmax - PROBLEM[-1]) <= 0.05
+
+
+def test_rel_tol_is_relative_to_measured_pmax():
+    _, _, history, stop = run(rel_tol=1e-4)
+    assert stop.reason == "rel_tol"
+    assert 1 < stop.cycle < 200
+    assert history[-1] <= 1e-4 * PROBLEM[-1] < min(history[:-1])
+
+
+def test_stall_cycles():
+    # Any gain ≤ stall_tol counts as a stall, so a huge stall_tol stops after the first window
+    _, _, history, stop = run(stall_cycles=3, stall_tol=1e9)
+    assert stop == ("stalled", 4)
+    assert len(history) == 4
+
+
+def test_time_budget():
+    _, _, history, stop = run(time_budget=0.0)
+    assert stop == ("time_budget", 1)
+    assert len(history) == 1
+
+
+def test_abs_tol_checked_before_rel_tol():
+    _, _, _, stop = run(abs_tol=1e3, rel_tol=1.0)
+    assert stop == ("abs_tol", 1)
+
+
+def test_batch_reasons_and_padding():
+    # The second measurement is far outside the reachable range and never meets abs_tol
+    _, _, history, stop = abc_optimize_batch(580.0, 0.95, 0.8, 0.985, [400.0, 5000.0], 20, 50, 5,
+                                             rng=1, abs_tol=0.05)
+    assert stop.reason.tolist() == ["abs_tol", "max_cycles"]
+    assert stop.cycle[0] < 50 and stop.cycle[1] == 50
+    assert history.shape == (2, 50)
+    done = stop.cycle[0]
+    assert np.all(history[0, done:] == history[0, done - 1])
+
+
+@pytest.mark.parametrize("max_cycles", [0, -1])
+def test_max_cycles_below_one_is_rejected(max_cycles):
+    with pytest.raises(ValueError, match="max_cycles"):
+        abc_optimize(*PROBLEM, 20, max_cycles, 50)
+
+
+@pytest.mark.parametrize("method", list(METHODS))
+def test_every_backend_rejects_zero_cycles(method):
+    objective, _ = pmax_objective(*PROBLEM)
+    with pytest.raises(ValueError, match="max_cycles"):
+        minimize_batch(method, objective, BOUNDS, 1, 0, rng=0)
+
+
+@pytest.mark.parametrize("method", list(METHODS))
+def test_max_evals(method):
+    objective, _ = pmax_objective(*PROBLEM)
+    evals = []
+
+    def counted(X, p):
+        evals.append(len(p))
+        return objective(X, p)
+
+    _, _, history, stop = minimize_batch(method, counted, BOUNDS, 1, 10_000, rng=0, max_evals=500)
+    assert stop.reason.tolist() == ["max_evals"]
+    assert history.shape == (1, stop.cycle[0])
+    # Checked once per iteration, so the budget is overshot by less than one iteration
+    assert 500 <= sum(evals) < 500 + 2 * sum(evals) / stop.cycle[0] + 100
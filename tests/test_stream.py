@@ -0,0 +1,67 @@
+"""Warm-start streaming fits (stream.IncrementalFitter)."""
+
+import numpy as np
+import pytest
+
+from bifacial_pv.stream import IncrementalFitter
+
+N = 300
+FIXED = (580.0, 0.95, 0.8, 0.985)
+
+
+@pytest.fixture
+def measurements():
+    rng = np.random.default_rng(0)
+    first = rng.uniform(380, 460, N)
+    return first, first * rng.uniform(0.995, 1.005, N)
+
+
+def test_warm_start_beats_cold_start(measurements):
+    first, drifted = measurements
+    strings = np.arange(N)
+
+    fitter = IncrementalFitter(N, seed=1)
+    fitter.update(strings, first, *FIXED)
+    warm = fitter.update(strings, drifted, *FIXED)
+    cold = IncrementalFitter(N, seed=1).update(strings, drifted, *FIXED)
+
+    assert warm.warm.all() and not cold.warm.any()
+    assert warm.cycles.mean() < cold.cycles.mean() / 2
+    assert np.median(warm.error) <= np.median(cold.error)
+    assert np.mean(warm.error <= 1e-4 * drifted) >= np.mean(cold.error <= 1e-4 * drifted)
+
+
+def test_unchanged_measurement_keeps_previous_best(measurements):
+    first, _ = measurements
+    fitter = IncrementalFitter(N, seed=1)
+    before = fitter.update(np.arange(N), first, *FIXED)
+    again = fitter.update(np.arange(N), first, *FIXED)
+
+    kept = before.error <= 1e-4 * first
+    assert kept.any()
+    assert np.all(again.cycles[kept] == 0)
+    assert np.array_equal(again.best_sol[kept], before.best_sol[kept].astype(np.float32).astype(float))
+
+
+def test_reset_save_and_load(tmp_path, measurements):
+    first, _ = measurements
+    fitter = IncrementalFitter(N, seed=1)
+    fitter.update(np.arange(N), first, *FIXED)
+
+    path = tmp_path / "state.npz"
+    fitter.save(path)
+    loaded = IncrementalFitter.load(path, seed=2)
+    assert np.array_equal(loaded.best_sol, fitter.best_sol)
+    assert np.array_equal(loaded.updates, fitter.updates)
+
+    loaded.reset([0, 1])
+    fit = loaded.update([0, 1, 2], first[:3], *FIXED)
+    assert fit.warm.tolist() == [False, False, True]
+
+
+def test_invalid_strings_are_rejected():
+    fitter = IncrementalFitter(3)
+    with pytest.raises(ValueError, match="at most once"):
+        fitter.update([0, 0], 400.0, *FIXED)
+    with pytest.raises(ValueError, match="must lie in"):
+        fitter.update([3], 400.0, *FIXED)
@@ -0,0 +1,118 @@
+"""Streaming energy yield from CSV weather files (bifacial_pv.timeseries)."""
+
+import io
+
+import numpy as np
+import pytest
+
+from bifacial_pv.model import compute_outputs
+from bifacial_pv.timeseries import energy_yield, iter_weather_chunks
+
+
+def weather_csv(start, periods, freq, G, T=25.0, header="timestamp,G_front,Tcell"):
+    times = np.arange(np.datetime64(start, "m"), periods * freq, freq)[:periods]
+    G = np.broadcast_to(np.asarray(G, dtype=float), (periods,))
+    T = np.broadcast_to(np.asarray(T, dtype=float), (periods,))
+    lines = [header] + [f"{t},{g!r},{c!r}" for t, g, c in zip(times.astype(str), G.tolist(), T.tolist())]
+    return "\n".join(lines) + "\n"
+
+
+# Hourly, Jan 31 18:00 → Feb 1 05:00 with varying irradiance
+SPAN = weather_csv("2024-01-31T18:00", 12, np.timedelta64(60, "m"),
+                   G=np.linspace(100.0, 900.0, 12), T=np.linspace(20.0, 45.0, 12))
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 5, 7])
+def test_results_do_not_depend_on_chunk_size(chunk_rows):
+    one = energy_yield(io.StringIO(SPAN), dirt=2.0, years=3)
+    many = energy_yield(io.StringIO(SPAN), dirt=2.0, years=3, chunk_rows=chunk_rows)
+
+    assert many.rows == one.rows == 12
+    assert many.step_hours == one.step_hours == 1.0
+    assert many.energy_Wh == pytest.approx(one.energy_Wh, rel=1e-12)
+    assert many.monthly_Wh.keys() == one.monthly_Wh.keys()
+    for month in one.monthly_Wh:
+        assert many.monthly_Wh[month] == pytest.approx(one.monthly_Wh[month], rel=1e-12)
+    assert many.peak_power == one.peak_power
+    assert many.peak_time == one.peak_time
+
+
+def test_monthly_totals_across_chunk_boundaries():
+    G = np.linspace(100.0, 900.0, 12)
+    T = np.linspace(20.0, 45.0, 12)
+    pmax = compute_outputs(G, T, 0.0, 0, 1.0, 1.0).Pmax
+
+    # Chunks of 5 rows: the month changes inside the second chunk
+    result = energy_yield(io.StringIO(SPAN), chunk_rows=5)
+
+    assert list(result.monthly_Wh) == ["2024-01", "2024-02"]
+    assert result.monthly_Wh["2024-01"] == pytest.approx(pmax[:6].sum())
+    assert result.monthly_Wh["2024-02"] == pytest.approx(pmax[6:].sum())
+    assert result.energy_Wh == pytest.approx(pmax.sum())
+    assert result.peak_power == pytest.approx(pmax.max())
+    assert result.peak_time == np.datetime64("2024-02-01T05:00")
+
+
+@pytest.mark.parametrize("minutes, expected", [(1, 1 / 60), (15, 0.25), (60, 1.0)])
+def test_step_inferred_from_timestamps(minutes, expected):
+    text = weather_csv("2024-06-01T10:00", 4, np.timedelta64(minutes, "m"), G=800.0)
+    pmax = compute_outputs(800.0, 25.0, 0.0, 0, 1.0, 1.0).Pmax
+
+    result = energy_yield(io.StringIO(text))
+
+    assert result.step_hours == pytest.approx(expected)
+    assert result.energy_Wh == pytest.approx(4 * pmax * expected)
+
+
+def test_step_inferred_across_single_row_chunks():
+    text = weather_csv("2024-06-01T10:00", 3, np.timedelta64(15, "m"), G=800.0)
+    assert energy_yield(io.StringIO(text), chunk_rows=1).step_hours == pytest.approx(0.25)
+
+
+def test_explicit_step_overrides_timestamps():
+    text = weather_csv("2024-06-01T10:00", 1, np.timedelta64(60, "m"), G=800.0)
+    pmax = compute_outputs(800.0, 25.0, 0.0, 0, 1.0, 1.0).Pmax
+
+    result = energy_yield(io.StringIO(text), step_hours=0.5)
+
+    assert result.step_hours == 0.5
+    assert result.energy_Wh == pytest.approx(0.5 * pmax)
+
+
+def test_single_row_needs_explicit_step():
+    text = weather_csv("2024-06-01T10:00", 1, np.timedelta64(60, "m"), G=800.0)
+    with pytest.raises(ValueError, match="at least two rows"):
+        energy_yield(io.StringIO(text))
+
+
+def test_no_data_rows():
+    with pytest.raises(ValueError, match="no data rows"):
+        energy_yield(io.StringIO("timestamp,G_front,Tcell\n"), step_hours=1.0)
+
+
+def test_missing_columns_are_named():
+    text = weather_csv("2024-06-01T10:00", 3, np.timedelta64(60, "m"), G=800.0,
+                       header="time,G_front,T_module")
+    with pytest.raises(ValueError, match="missing column\\(s\\): timestamp, Tcell"):
+        energy_yield(io.StringIO(text))
+
+
+def test_custom_column_names():
+    text = weather_csv("2024-06-01T10:00", 3, np.timedelta64(60, "m"), G=800.0,
+                       header="time,G_front,T_module")
+    result = energy_yield(io.StringIO(text), time_col="time", T_col="T_module")
+    assert result.rows == 3
+
+
+def test_negative_irradiance_contributes_nothing():
+    text = weather_csv("2024-06-01T00:00", 3, np.timedelta64(60, "m"), G=[-5.0, 0.0, 800.0])
+    pmax = compute_outputs(800.0, 25.0, 0.0, 0, 1.0, 1.0).Pmax
+    assert energy_yield(io.StringIO(text)).energy_Wh == pytest.approx(pmax)
+
+
+def test_chunks_from_path(tmp_path):
+    path = tmp_path / "weather.csv"
+    path.write_text(SPAN)
+    chunks = list(iter_weather_chunks(path, chunk_rows=5))
+    assert [len(c.time) for c in chunks] == [5, 5, 2]
+    assert chunks[0].time.dtype == np.dtype("datetime64[m]")